@@ -0,0 +1,65 @@
+"""seller natural key
+
+Revision ID: 7c1d4e9a3b52
+Revises: 2e2602a82339
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d4e9a3b52'
+down_revision: Union[str, None] = '2e2602a82339'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sellers', sa.Column('seller_key', sa.String(), nullable=True))
+    op.add_column('sellers', sa.Column('profile_url', sa.String(), nullable=True))
+
+    # Ключ для вже збережених продавців - та сама формула, що й src.repository.sellers.seller_key
+    op.execute("""
+        UPDATE sellers
+        SET seller_key = 'h:' || md5(lower(btrim(coalesce(name, ''))) || '|' || lower(btrim(coalesce(location, ''))))
+    """)
+
+    # Дублікати: лишаємо найменший id, переносимо на нього продукти і телефон
+    op.execute("""
+        CREATE TEMPORARY TABLE seller_dedup ON COMMIT DROP AS
+        SELECT id, min(id) OVER (PARTITION BY seller_key) AS keep_id
+        FROM sellers
+    """)
+    op.execute("""
+        UPDATE products p
+        SET seller_id = d.keep_id
+        FROM seller_dedup d
+        WHERE p.seller_id = d.id AND d.id <> d.keep_id
+    """)
+    op.execute("""
+        UPDATE sellers s
+        SET phone_number = phones.phone_number
+        FROM (
+            SELECT d.keep_id, max(s2.phone_number) AS phone_number
+            FROM seller_dedup d JOIN sellers s2 ON s2.id = d.id
+            GROUP BY d.keep_id
+        ) phones
+        WHERE s.id = phones.keep_id AND s.phone_number IS NULL AND phones.phone_number IS NOT NULL
+    """)
+    op.execute("""
+        DELETE FROM sellers s
+        USING seller_dedup d
+        WHERE s.id = d.id AND d.id <> d.keep_id
+    """)
+
+    op.create_index(op.f('ix_sellers_seller_key'), 'sellers', ['seller_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sellers_seller_key'), table_name='sellers')
+    op.drop_column('sellers', 'profile_url')
+    op.drop_column('sellers', 'seller_key')
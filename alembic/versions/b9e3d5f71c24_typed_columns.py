@@ -0,0 +1,50 @@
+"""typed columns
+
+Revision ID: b9e3d5f71c24
+Revises: a4f2b8c61e07
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e3d5f71c24'
+down_revision: Union[str, None] = 'a4f2b8c61e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Нові колонки nullable - існуючі рядки заповнює python -m src.repository.backfill
+    op.add_column('products', sa.Column('price_amount', sa.Numeric(precision=14, scale=2), nullable=True))
+    op.add_column('products', sa.Column('price_currency', sa.String(length=3), nullable=True))
+    op.add_column('products', sa.Column('price_negotiable', sa.Boolean(), nullable=True))
+    op.add_column('products', sa.Column('views', sa.Integer(), nullable=True))
+    op.add_column('products', sa.Column('published_at', sa.DateTime(), nullable=True))
+    op.add_column('products', sa.Column('image_list', postgresql.ARRAY(sa.String()), nullable=True))
+    op.add_column('sellers', sa.Column('registered_at', sa.DateTime(), nullable=True))
+    op.add_column('sellers', sa.Column('last_active_at', sa.DateTime(), nullable=True))
+
+    op.create_index('ix_products_published_at', 'products', ['published_at'], unique=False)
+    op.create_index('ix_products_price_amount', 'products', ['price_amount'], unique=False)
+    op.create_index('ix_products_seller_id', 'products', ['seller_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_seller_id', table_name='products')
+    op.drop_index('ix_products_price_amount', table_name='products')
+    op.drop_index('ix_products_published_at', table_name='products')
+
+    op.drop_column('sellers', 'last_active_at')
+    op.drop_column('sellers', 'registered_at')
+    op.drop_column('products', 'image_list')
+    op.drop_column('products', 'published_at')
+    op.drop_column('products', 'views')
+    op.drop_column('products', 'price_negotiable')
+    op.drop_column('products', 'price_currency')
+    op.drop_column('products', 'price_amount')
@@ -0,0 +1,58 @@
+"""product observations
+
+Revision ID: d2a8f4c93e16
+Revises: b9e3d5f71c24
+Create Date: 2026-10-18 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8f4c93e16'
+down_revision: Union[str, None] = 'b9e3d5f71c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('product_observations',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('observed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('views', sa.Integer(), nullable=True),
+    sa.Column('price_amount', sa.Numeric(precision=14, scale=2), nullable=True),
+    sa.Column('price_currency', sa.String(length=3), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'observed_at'),
+    postgresql_partition_by='RANGE (observed_at)'
+    )
+    op.create_index('ix_product_observations_product_id_observed_at', 'product_observations',
+                    ['product_id', 'observed_at'], unique=False)
+    # Секція за замовчуванням - запис не впаде, якщо денна секція ще не створена
+    op.execute("CREATE TABLE product_observations_default PARTITION OF product_observations DEFAULT")
+
+    op.create_table('product_revisits',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('next_revisit_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('priority', sa.Float(), server_default='0', nullable=False),
+    sa.Column('first_observed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_observed_at', sa.DateTime(), nullable=True),
+    sa.Column('last_views', sa.Integer(), nullable=True),
+    sa.Column('views_per_hour', sa.Float(), nullable=True),
+    sa.Column('failures', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index('ix_product_revisits_next_revisit_at_priority', 'product_revisits',
+                    ['next_revisit_at', 'priority'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_revisits_next_revisit_at_priority', table_name='product_revisits')
+    op.drop_table('product_revisits')
+    op.drop_index('ix_product_observations_product_id_observed_at', table_name='product_observations')
+    op.drop_table('product_observations')
@@ -0,0 +1,32 @@
+"""seller phone resolution
+
+Revision ID: e7b1c5a92d38
+Revises: d2a8f4c93e16
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b1c5a92d38'
+down_revision: Union[str, None] = 'd2a8f4c93e16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sellers', sa.Column('phone_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('sellers', sa.Column('phone_next_check_at', sa.DateTime(), nullable=True))
+    # Черга етапу телефонів - лише продавці без номера
+    op.create_index('ix_sellers_phone_pending', 'sellers', ['phone_next_check_at'], unique=False,
+                    postgresql_where=sa.text('phone_number IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sellers_phone_pending', table_name='sellers')
+    op.drop_column('sellers', 'phone_next_check_at')
+    op.drop_column('sellers', 'phone_attempts')
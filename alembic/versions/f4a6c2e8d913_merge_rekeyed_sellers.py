@@ -0,0 +1,66 @@
+"""merge sellers split between hash and profile keys
+
+Irreversible: downgrade leaves the merged rows as they are, the dropped duplicates are not restored.
+
+Revision ID: f4a6c2e8d913
+Revises: e7b1c5a92d38
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a6c2e8d913'
+down_revision: Union[str, None] = 'e7b1c5a92d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Продавці, збережені до появи profile_url (ключ h:...), і їхні нові рядки з ключем olx:...
+    # Лишається старий рядок (його id уже в дампах і експортах), він отримує olx-ключ.
+    # Пари, де одному h-ключу відповідає кілька профілів, не зливаються - їх не розрізнити
+    op.execute("""
+        CREATE TEMPORARY TABLE seller_merge ON COMMIT DROP AS
+        SELECT h.id AS keep_id, min(o.id) AS drop_id
+        FROM sellers h
+        JOIN sellers o ON o.seller_key LIKE 'olx:%'
+            AND h.seller_key = 'h:' || md5(lower(btrim(coalesce(o.name, ''))) || '|'
+                                           || lower(btrim(coalesce(o.location, ''))))
+        WHERE h.seller_key LIKE 'h:%' AND h.profile_url IS NULL
+        GROUP BY h.id
+        HAVING count(*) = 1
+    """)
+    op.execute("""
+        CREATE TEMPORARY TABLE seller_merge_source ON COMMIT DROP AS
+        SELECT m.keep_id, o.seller_key, o.profile_url, o.phone_number
+        FROM seller_merge m JOIN sellers o ON o.id = m.drop_id
+    """)
+    op.execute("""
+        UPDATE products p
+        SET seller_id = m.keep_id
+        FROM seller_merge m
+        WHERE p.seller_id = m.drop_id
+    """)
+    op.execute("""
+        DELETE FROM sellers s
+        USING seller_merge m
+        WHERE s.id = m.drop_id
+    """)
+    op.execute("""
+        UPDATE sellers s
+        SET seller_key = src.seller_key,
+            profile_url = src.profile_url,
+            phone_number = coalesce(s.phone_number, src.phone_number),
+            updated_at = now()
+        FROM seller_merge_source src
+        WHERE s.id = src.keep_id
+    """)
+
+
+def downgrade() -> None:
+    # Незворотна міграція: злиті рядки не відновлюються, схема не змінювалась
+    pass
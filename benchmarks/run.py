@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+import psycopg2
+from dotenv import load_dotenv
+
+from benchmarks.server import FakeOlx, add_server_arguments, server_config
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+load_dotenv()
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Налаштування, які потрапляють у результат (щоб прогони з різними параметрами можна було порівнювати)
+RECORDED_SETTINGS = ("BROWSER_POOL_SIZE", "CONTEXTS_PER_BROWSER", "MAX_PAGES_PER_CONTEXT", "BLOCK_RESOURCES",
+                     "HTTP_FIELD_GROUPS", "LIST_CONCURRENCY", "CONCURRENCY_MIN", "CONCURRENCY_MAX",
+                     "CONCURRENCY_INITIAL", "WRITE_BATCH_SIZE", "DB_WRITERS", "DB_POOL_SIZE", "DB_MAX_OVERFLOW",
+                     "FRONTIER_CLAIM_BATCH", "ARCHIVE_PAGES")
+
+
+def _admin_connection():
+    """
+    Підключення до службової бази postgres (з тими ж POSTGRES_*, що й застосунок) для CREATE/DROP DATABASE.
+    """
+    connection = psycopg2.connect(dbname="postgres", user=os.getenv('POSTGRES_USER'),
+                                  password=os.getenv('POSTGRES_PASSWORD'), host=os.getenv('POSTGRES_DOMAIN'),
+                                  port=os.getenv('POSTGRES_PORT'))
+    connection.autocommit = True
+    return connection
+
+
+def create_database(name: str) -> None:
+    connection = _admin_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        connection.close()
+
+
+def drop_database(name: str) -> None:
+    connection = _admin_connection()
+    try:
+        with connection.cursor() as cursor:
+            # DROP DATABASE ... WITH (FORCE) з'явився лише в Postgres 13, а в docker-compose - 12
+            cursor.execute("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = %s", (name,))
+            cursor.execute(f'DROP DATABASE IF EXISTS "{name}"')
+    finally:
+        connection.close()
+
+
+def git_commit() -> dict:
+    def git(*args) -> str:
+        return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD") or None,
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def _self_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+async def sample_rss(peak: dict, interval: float = 0.5) -> None:
+    """
+    Пікове RSS: сам процес + усе дерево дочірніх (Playwright driver, браузери).
+    """
+    from src.services.browser_pool import _process_tree_rss_mb
+
+    while True:
+        rss = _self_rss_mb() + (_process_tree_rss_mb(os.getpid()) or 0.0)
+        peak["rss_mb"] = max(peak.get("rss_mb", 0.0), rss)
+        await asyncio.sleep(interval)
+
+
+def stage_report(durations: dict[str, list[float]], failures: dict[str, int]) -> dict:
+    def quantile(values: list[float], q: float) -> float:
+        return values[min(int(len(values) * q), len(values) - 1)]
+
+    report = {}
+    for stage, values in durations.items():
+        values = sorted(values)
+        report[stage] = {"n": len(values), "p50": round(quantile(values, 0.5), 4),
+                         "p95": round(quantile(values, 0.95), 4), "max": round(values[-1], 4),
+                         "total": round(sum(values), 3), "failures": failures.get(stage, 0)}
+    return report
+
+
+async def benchmark(args: argparse.Namespace, database: str) -> dict:
+    # Модулі src читають налаштування при імпорті, тому імпортуються лише після підготовки оточення
+    from src.db.session import engine
+    from src.services.pipeline import playwright_async_run
+
+    server = FakeOlx(server_config(args))
+    url = await server.start()
+    logger.info(f"Бенчмарк: стенд {url}, база {database}", extra={'custom_color': True})
+
+    peak = {}
+    sampler = asyncio.create_task(sample_rss(peak))
+    started_at = time.monotonic()
+    try:
+        # Без облікових даних: стенд не має логіну, сесія зберігає лише згоду на cookies
+        stats = await playwright_async_run(None, None, url)
+    finally:
+        elapsed = time.monotonic() - started_at
+        sampler.cancel()
+        await server.stop()
+        await engine.dispose()
+
+    summary = stats.summary
+    write_seconds = sum(summary.durations.get("db_write", ()))
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git": git_commit(),
+        "server": asdict(server.config),
+        "settings": {name: os.getenv(name) for name in RECORDED_SETTINGS},
+        "elapsed_sec": round(elapsed, 3),
+        "listings": {
+            "discovered": stats.links,
+            "claimed": stats.claimed,
+            "failed": stats.failed,
+            "saved": stats.saved,
+            "per_sec": round(stats.saved / elapsed, 3) if elapsed else 0.0,
+            "time_to_first_row_sec": round(stats.first_row_at - stats.started_at, 3) if stats.first_row_at else None,
+        },
+        "pages": dict(summary.pages),
+        "retries": dict(summary.retries),
+        "stages": stage_report(summary.durations, summary.failures),
+        "peak_rss_mb": round(peak.get("rss_mb", 0.0), 1),
+        "db": {
+            "rows": stats.saved,
+            "batches": len(summary.durations.get("db_write", ())),
+            "write_sec": round(write_seconds, 3),
+            "rows_per_write_sec": round(stats.saved / write_seconds, 1) if write_seconds else None,
+        },
+        "detail_source": server.detail_source,
+        "server_requests": server.requests,
+        "injected_errors": server.injected_errors,
+    }
+
+
+def main(args: argparse.Namespace) -> str:
+    database = f"olx_bench_{datetime.now():%Y%m%d_%H%M%S}"
+    os.environ.update({
+        "SQLALCHEMY_DATABASE_URL": f"postgresql+asyncpg://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
+                                   f"@{os.getenv('POSTGRES_DOMAIN')}:{os.getenv('POSTGRES_PORT')}/{database}",
+        "POSTGRES_DB_NAME": database,
+        "BROWSER_HEADLESS": "1",
+        "LIST_PAGES": str(args.pages),
+        "LIST_START_PATHS": "/uk/list/",
+        "METRICS_PORT": "0",
+        "SESSION_DIR": tempfile.mkdtemp(prefix="olx_bench_session_"),
+    })
+
+    create_database(database)
+    try:
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT_DIR, check=True)
+        result = asyncio.run(benchmark(args, database))
+    finally:
+        if args.keep_db:
+            logger.info(f"Бенчмарк: базу {database} збережено")
+        else:
+            drop_database(database)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"{datetime.now():%Y-%m-%d_%H-%M-%S}.json")
+    with open(path, "w", encoding="utf-8") as result_file:
+        json.dump(result, result_file, ensure_ascii=False, indent=2)
+
+    listings = result["listings"]
+    logger.info(f"Бенчмарк: {listings['saved']} оголошень за {result['elapsed_sec']} сек. "
+                f"({listings['per_sec']}/сек.), пік RSS {result['peak_rss_mb']} МБ, "
+                f"запис у БД {result['db']['rows_per_write_sec']} рядків/сек. -> {path}",
+                extra={'custom_color': True})
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк повного пайплайна на локальному стенді OLX "
+                                                 "і тимчасовій базі Postgres")
+    add_server_arguments(parser)
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="куди записати JSON з результатом")
+    parser.add_argument("--keep-db", action="store_true", help="не видаляти тимчасову базу після прогону")
+
+    main(parser.parse_args())
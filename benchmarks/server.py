@@ -0,0 +1,318 @@
+import argparse
+import asyncio
+import glob
+import os
+import random
+import re
+from dataclasses import dataclass
+from html import escape
+
+from aiohttp import web
+
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+# Збережені сторінки товарів OLX, спільні з тестами розбору (tests/fixtures/olx/detail_*.html)
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "olx")
+FIXTURE_SITE_ID_RE = re.compile(r'<span class="css-12hdxwj">ID:\s*\d+</span>')
+FIXTURE_PROFILE_RE = re.compile(r'href="/uk/list/user/[^"/]+/"')
+FIXTURE_VIEWS_RE = re.compile(r'<span data-testid="page-view-counter"[^>]*>.*?</span>', re.S)
+
+MONTHS = ("січня", "лютого", "березня", "квітня", "травня", "червня", "липня", "серпня", "вересня", "жовтня",
+          "листопада", "грудня")
+REGIONS = ("Київська область", "Львівська область", "Одеська область", "Харківська область")
+CITIES = ("Київ", "Львів", "Одеса", "Харків", "Біла Церква", "Бровари")
+
+COOKIES_HTML = """
+<div class="css-e661z2" id="cookies"><button data-cy="dismiss-cookies-overlay"
+    onclick="document.getElementById('cookies').remove()">Закрити</button></div>
+"""
+
+LIST_TEMPLATE = """<!DOCTYPE html>
+<html lang="uk"><head><meta charset="utf-8"><title>Оголошення - сторінка {page}</title></head>
+<body>{cookies}
+<div data-testid="listing-grid">{cards}</div>
+</body></html>
+"""
+
+CARD_TEMPLATE = """
+<div data-cy="l-card" id="{listing_id}"><div class="css-1sw7q4x">
+<a class="css-qo0cxu" href="{href}"><h6 class="css-16v5mdi">{title}</h6></a>
+<p data-testid="ad-price" class="css-10b0gli">{price}</p></div></div>
+"""
+
+# Лічильник переглядів і телефон, як і на OLX, приходять окремими XHR: лічильник - коли блок потрапляє у в'юпорт
+DETAIL_TEMPLATE = """<!DOCTYPE html>
+<html lang="uk"><head><meta charset="utf-8"><title>{title}</title></head>
+<body>{cookies}
+<div class="css-1oarkq2">
+  <span class="css-19yf5ek">{published}</span>
+  <h4 class="css-1kc83jo">{title}</h4>
+  <h3 class="css-90xrc0">{price}</h3>
+  <ul class="css-rn93um">
+    {attributes}
+    {courier}
+  </ul>
+  <div class="swiper-wrapper">{images}</div>
+  <div class="css-1o924a9">{description}</div>
+</div>
+<aside>
+  <a data-testid="user-profile-link" href="/uk/list/user/{seller_id}/">
+    <h4 class="css-1lcz6o7">{seller_name}</h4>
+  </a>
+  <p class="css-9pgvpt">{rating}</p>
+  <p class="css-23d1vy">На OLX з {registered}</p>
+  <span class="css-1p85e15">Онлайн в {online}</span>
+  <button class="css-72jcbl">Показати телефон</button>
+  <div id="phone"></div>
+  <div class="css-13l8eec"><p class="css-1cju8pu">{city}</p><p class="css-b5m1rv">{region}</p></div>
+</aside>
+<div style="height: 2400px"></div>
+<div class="css-txt9pr"><span class="css-12hdxwj">ID: {site_id}</span><span id="views"></span></div>
+<script>{scripts}</script>
+</body></html>
+"""
+
+# Перегляди і телефон для сторінок з фікстур - ті самі XHR, що й у синтетичному шаблоні
+XHR_SCRIPTS = """
+  function showPhone() {{
+    fetch('/api/v1/offers/{site_id}/limited-phones/').then(r => r.json()).then(data => {{
+      (document.getElementById('phone') || document.body.appendChild(Object.assign(document.createElement('div'),
+      {{id: 'phone'}}))).innerHTML =
+        '<a class="css-1dvqodz" href="tel:' + data.phones[0] + '">' + data.phones[0] + '</a>';
+    }});
+  }}
+  new IntersectionObserver((entries, observer) => {{
+    if (!entries.some(entry => entry.isIntersecting)) return;
+    observer.disconnect();
+    fetch('/api/v1/offers/{site_id}/page-views/').then(r => r.json()).then(data => {{
+      document.getElementById('views').innerHTML =
+        '<span data-testid="page-view-counter">Переглядів: ' + data.views + '</span>';
+    }});
+  }}).observe(document.getElementById('views'));
+  document.querySelector('button.css-72jcbl')?.addEventListener('click', showPhone);
+"""
+
+
+@dataclass
+class ServerConfig:
+    """
+    Параметри стенду: розмір каталогу, затримка (мс) і частка помилок/блокувань.
+    """
+    pages: int = 5
+    listings_per_page: int = 40
+    latency_ms: float = 150
+    jitter_ms: float = 100
+    error_rate: float = 0.0
+    block_rate: float = 0.0
+    seed: int = 42
+    fixtures_dir: str | None = FIXTURES_DIR
+
+
+class FakeOlx:
+    """
+    Локальна заміна OLX для бенчмарків: сторінки списку /uk/list/?page=N, сторінки товарів,
+    API переглядів і телефону. Сторінки товарів - збережені сторінки OLX з fixtures_dir (ті самі, що в тестах
+    розбору), тож зміна верстки, під яку оновлено фікстури, ламає і бенчмарк; ID, продавець і лічильник переглядів
+    підставляються для кожного оголошення. Без фікстур - синтетичний шаблон з селекторами FIELD_SPEC.
+    Сторінки списку завжди синтетичні: посилання в них ведуть на оголошення стенду.
+    Вміст детермінований (seed), затримка і помилки - випадкові для кожного запиту.
+    """
+
+    def __init__(self, config: ServerConfig | None = None):
+        self.config = config or ServerConfig()
+        self.random = random.Random(self.config.seed)
+        self.requests = 0
+        self.injected_errors = 0
+        self.fixtures = self.load_fixtures(self.config.fixtures_dir)
+        self.detail_source = "captured" if self.fixtures else "synthetic"
+        self.app = web.Application(middlewares=[self._latency_middleware])
+        self.app.add_routes([
+            web.get("/uk/list/", self.list_page),
+            web.get("/d/uk/obyavlenie/{slug}-ID{listing_id}.html", self.detail_page),
+            web.get("/api/v1/offers/{site_id}/page-views/", self.page_views),
+            web.get("/api/v1/offers/{site_id}/limited-phones/", self.phones),
+        ])
+        self._runner: web.AppRunner | None = None
+
+    @web.middleware
+    async def _latency_middleware(self, request: web.Request, handler):
+        self.requests += 1
+        config = self.config
+        await asyncio.sleep(max(0.0, config.latency_ms + self.random.uniform(-config.jitter_ms, config.jitter_ms))
+                            / 1000)
+
+        roll = self.random.random()
+        if roll < config.block_rate:
+            self.injected_errors += 1
+            raise web.HTTPForbidden(text="blocked")
+        if roll < config.block_rate + config.error_rate:
+            self.injected_errors += 1
+            raise web.HTTPServiceUnavailable(text="injected error")
+        return await handler(request)
+
+    @staticmethod
+    def load_fixtures(fixtures_dir: str | None) -> list[str]:
+        """
+        Збережені сторінки товарів (detail_*.html) з ID оголошення; сторінки знятих оголошень пропускаються.
+        """
+        if not fixtures_dir:
+            return []
+        fixtures = []
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, "detail_*.html"))):
+            with open(path, encoding="utf-8") as file:
+                html = file.read()
+            if FIXTURE_SITE_ID_RE.search(html):
+                fixtures.append(html)
+        if not fixtures:
+            logger.warning(f"Стенд OLX: у {fixtures_dir} немає сторінок товарів, синтетичний шаблон")
+        return fixtures
+
+    @staticmethod
+    def listing_id(page: int, index: int) -> str:
+        return f"B{page:03d}x{index:03d}"
+
+    @staticmethod
+    def site_id(listing_id: str) -> int:
+        return 800000000 + int(listing_id[1:4]) * 1000 + int(listing_id[5:])
+
+    @staticmethod
+    def _price(item_random: random.Random) -> str:
+        if item_random.random() < 0.1:
+            return "Договірна"
+        return f"{item_random.randint(1, 500) * 100:,} грн.".replace(",", " ")
+
+    async def list_page(self, request: web.Request) -> web.Response:
+        page = int(request.query.get("page", 1))
+        if page > self.config.pages:
+            return web.Response(text=LIST_TEMPLATE.format(page=page, cookies=COOKIES_HTML, cards=""),
+                                content_type="text/html")
+
+        cards = []
+        for index in range(self.config.listings_per_page):
+            listing_id = self.listing_id(page, index)
+            item_random = random.Random(listing_id)
+            cards.append(CARD_TEMPLATE.format(
+                listing_id=listing_id, title=f"Товар {listing_id}", price=self._price(item_random),
+                href=f"/d/uk/obyavlenie/tovar-{listing_id.lower()}-ID{listing_id}.html?reason=bench",
+            ))
+        return web.Response(text=LIST_TEMPLATE.format(page=page, cookies=COOKIES_HTML, cards="".join(cards)),
+                            content_type="text/html")
+
+    async def detail_page(self, request: web.Request) -> web.Response:
+        listing_id = request.match_info["listing_id"]
+        try:
+            site_id = self.site_id(listing_id)
+        except ValueError:
+            raise web.HTTPNotFound()
+
+        item_random = random.Random(listing_id)
+        seller_number = item_random.randint(1, max(1, self.config.pages * self.config.listings_per_page // 3))
+        if self.fixtures:
+            html = self._captured_detail(listing_id, site_id, seller_number)
+            return web.Response(text=html, content_type="text/html")
+
+        seller_random = random.Random(seller_number)
+        attributes = ["Приватна особа" if seller_number % 4 else "Бізнес",
+                      f"Стан: {item_random.choice(('Вживане', 'Нове'))}",
+                      f"Бренд: Бренд {item_random.randint(1, 30)}"]
+        html = DETAIL_TEMPLATE.format(
+            cookies=COOKIES_HTML,
+            title=escape(f"Товар {listing_id} для бенчмарку"),
+            price=self._price(item_random),
+            published=(f"Сьогодні о {item_random.randint(0, 23):02d}:{item_random.randint(0, 59):02d}"
+                       if item_random.random() < 0.5
+                       else f"{item_random.randint(1, 28)} {item_random.choice(MONTHS)} 2024 р."),
+            attributes="".join(f'<li class="css-1r0si1e"><p class="css-b5m1rv">{escape(text)}</p></li>'
+                               for text in attributes),
+            courier='<div data-testid="courier-btn">Купити з OLX Доставкою</div>' if item_random.random() < 0.3
+            else "",
+            images="".join(f'<div class="swiper-zoom-container"><img src="https://img.example/{listing_id}/{n}.jpg">'
+                           f'</div>' for n in range(item_random.randint(1, 8))),
+            description=escape(" ".join(f"Опис {listing_id}, рядок {n}." for n in range(item_random.randint(5, 40)))),
+            seller_id=f"bench{seller_number}",
+            seller_name=escape(f"Продавець {seller_number}"),
+            rating=f"{seller_random.randint(30, 50) / 10} / 5",
+            registered=f"{seller_random.choice(MONTHS)} {seller_random.randint(2012, 2024)} р.",
+            online=f"{seller_random.randint(0, 23):02d}:{seller_random.randint(0, 59):02d}",
+            city=seller_random.choice(CITIES),
+            region=seller_random.choice(REGIONS),
+            site_id=site_id,
+            scripts=XHR_SCRIPTS.format(site_id=site_id),
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    def _captured_detail(self, listing_id: str, site_id: int, seller_number: int) -> str:
+        """
+        Збережена сторінка з ID і продавцем стенду; лічильник переглядів, як і на OLX, приходить окремим XHR.
+        """
+        html = self.fixtures[int(listing_id[5:]) % len(self.fixtures)]
+        html = FIXTURE_VIEWS_RE.sub("", html)
+        html = FIXTURE_SITE_ID_RE.sub(f'<span class="css-12hdxwj">ID: {site_id}</span><span id="views"></span>',
+                                      html, count=1)
+        html = FIXTURE_PROFILE_RE.sub(f'href="/uk/list/user/bench{seller_number}/"', html)
+        return html.replace("</body>", f"<script>{XHR_SCRIPTS.format(site_id=site_id)}</script>\n</body>", 1)
+
+    async def page_views(self, request: web.Request) -> web.Response:
+        return web.json_response({"views": random.Random(request.match_info["site_id"]).randint(1, 50000)})
+
+    async def phones(self, request: web.Request) -> web.Response:
+        number = random.Random(request.match_info["site_id"]).randint(1000000, 9999999)
+        return web.json_response({"phones": [f"067 {number // 10000:03d} {number % 10000:04d}"]})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Запускає сервер у поточному event loop і повертає базовий URL (port=0 - вільний порт).
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = ServerConfig()
+    parser.add_argument("--pages", type=int, default=defaults.pages, help="сторінок списку")
+    parser.add_argument("--listings-per-page", type=int, default=defaults.listings_per_page,
+                        help="оголошень на сторінці списку")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="затримка відповіді (мс)")
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms, help="розкид затримки (мс)")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="частка відповідей 503")
+    parser.add_argument("--block-rate", type=float, default=defaults.block_rate, help="частка відповідей 403")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--fixtures", default=defaults.fixtures_dir,
+                        help="каталог збережених сторінок товарів (detail_*.html)")
+    parser.add_argument("--synthetic", action="store_true", help="синтетичні сторінки товарів замість фікстур")
+
+
+def server_config(args: argparse.Namespace) -> ServerConfig:
+    return ServerConfig(pages=args.pages, listings_per_page=args.listings_per_page, latency_ms=args.latency_ms,
+                        jitter_ms=args.jitter_ms, error_rate=args.error_rate, block_rate=args.block_rate,
+                        seed=args.seed, fixtures_dir=None if args.synthetic else args.fixtures)
+
+
+async def serve(config: ServerConfig, port: int) -> None:
+    server = FakeOlx(config)
+    url = await server.start(port=port)
+    logger.info(f"Стенд OLX: {url}/uk/list/, сторінки товарів: {server.detail_source}",
+                extra={'custom_color': True})
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальний стенд OLX для бенчмарків")
+    parser.add_argument("--port", type=int, default=8080)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(serve(server_config(args), args.port))
@@ -1,4 +1,5 @@
 import asyncio
+import os
 from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -6,7 +7,11 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from dotenv import dotenv_values
 
-from src.services.playwright_service import playwright_async_run
+from src.repository import frontier
+from src.services.coordinator import CrawlCoordinator
+from src.services.metrics import start_metrics_server
+from src.services.phone_resolver import PhoneResolver
+from src.services.revisit import RevisitScheduler
 from src.utils.dump_db import create_db_dump
 from src.utils.py_logger import get_logger
 
@@ -16,20 +21,53 @@ config = dotenv_values(".env")
 MAIN_LINK = "https://www.olx.ua"
 EMAIL_OLX = config.get("EMAIL_OLX")
 PASSWORD_OLX = config.get("PASSWORD_OLX")
+RUN_BUDGET = float(config.get("RUN_BUDGET") or 60)
+RUN_RESERVE = float(config.get("RUN_RESERVE") or 10)
+FRONTIER_DISCOVERY_THRESHOLD = int(config.get("FRONTIER_DISCOVERY_THRESHOLD") or 100)
+# Скільки днів зберігати в crawl_queue виконані і остаточно невдалі посилання
+CRAWL_QUEUE_DONE_DAYS = float(config.get("CRAWL_QUEUE_DONE_DAYS") or 7)
+CRAWL_QUEUE_FAILED_DAYS = float(config.get("CRAWL_QUEUE_FAILED_DAYS") or 30)
+# 0 - сторінки товарів обробляють окремі процеси worker.py, main.py лише наповнює чергу і робить дампи
+# (змінна оточення має пріоритет над .env, щоб docker-compose міг перемкнути режим)
+COORDINATOR_SCRAPES = os.getenv("COORDINATOR_SCRAPES", config.get("COORDINATOR_SCRAPES") or "1") == "1"
 
 
 async def scheduler_async():
     scheduler = AsyncIOScheduler()
+    coordinator = CrawlCoordinator(EMAIL_OLX, PASSWORD_OLX, MAIN_LINK, budget=RUN_BUDGET, reserve=RUN_RESERVE,
+                                   discovery_threshold=FRONTIER_DISCOVERY_THRESHOLD,
+                                   scrape_details=COORDINATOR_SCRAPES)
 
-    # Запуск після старту
-    scheduler.add_job(playwright_async_run,
-                      trigger='date',
-                      run_date=datetime.now() + timedelta(seconds=5),
-                      args=[EMAIL_OLX, PASSWORD_OLX, MAIN_LINK])
-    # повторюватися кожен день через 1 день
-    scheduler.add_job(playwright_async_run,
-                      trigger=IntervalTrigger(days=1, timezone="Europe/Kiev"),
-                      args=[EMAIL_OLX, PASSWORD_OLX, MAIN_LINK])
+    # Перший запуск через 5 сек. після старту, далі щохвилини.
+    # Накладання тіків відсікає coordinator (max_instances=2, щоб пропущений тік потрапив у його лічильник)
+    scheduler.add_job(coordinator.tick,
+                      trigger=IntervalTrigger(minutes=1, timezone="Europe/Kiev"),
+                      next_run_time=datetime.now() + timedelta(seconds=5),
+                      max_instances=2,
+                      coalesce=True)
+
+    # Повторні відвідування для часового ряду переглядів (product_observations)
+    revisit = RevisitScheduler(EMAIL_OLX, PASSWORD_OLX, MAIN_LINK)
+    if revisit.budget:
+        scheduler.add_job(revisit.tick,
+                          trigger=IntervalTrigger(minutes=1, timezone="Europe/Kiev"),
+                          next_run_time=datetime.now() + timedelta(seconds=30),
+                          max_instances=2,
+                          coalesce=True)
+
+    # Телефони продавців - окремим етапом у фоні, з обмеженням частоти
+    phone_resolver = PhoneResolver(EMAIL_OLX, PASSWORD_OLX, MAIN_LINK)
+    if phone_resolver.budget:
+        scheduler.add_job(phone_resolver.tick,
+                          trigger=IntervalTrigger(minutes=1, timezone="Europe/Kiev"),
+                          next_run_time=datetime.now() + timedelta(seconds=45),
+                          max_instances=2,
+                          coalesce=True)
+
+    # Очищення crawl_queue від старих виконаних/невдалих посилань о 04:00
+    scheduler.add_job(frontier.purge, CronTrigger(hour=4, minute=0, timezone="Europe/Kiev"),
+                      kwargs={"done_after": timedelta(days=CRAWL_QUEUE_DONE_DAYS),
+                              "failed_after": timedelta(days=CRAWL_QUEUE_FAILED_DAYS)})
 
     # Створення дампу бази о 12:00
     scheduler.add_job(create_db_dump, CronTrigger(hour=12, minute=0, timezone="Europe/Kiev"))
@@ -42,10 +80,14 @@ async def scheduler_async():
     except (KeyboardInterrupt, SystemExit):
         logger.info("Shutting down scheduler")
         scheduler.shutdown()
+    finally:
+        await revisit.close()
+        await phone_resolver.close()
 
 
 async def main():
     logger.info("Start program", extra={'custom_color': True})
+    start_metrics_server()
     await scheduler_async()
 
 
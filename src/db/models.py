@@ -1,6 +1,7 @@
-from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, JSON
+from sqlalchemy import (Column, Integer, BigInteger, String, Float, Boolean, ForeignKey, DateTime, JSON, Index, Numeric,
+                        PrimaryKeyConstraint, func)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -11,6 +12,8 @@ class Seller(Base):
     __tablename__ = 'sellers'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    seller_key = Column(String, unique=True, index=True, nullable=True)
+    profile_url = Column(String, nullable=True)
     name = Column(String, nullable=True)
     phone_number = Column(String, nullable=True)
     rating = Column(String, nullable=True)
@@ -18,11 +21,21 @@ class Seller(Base):
     last_active_date = Column(String, nullable=True)
     location = Column(String, nullable=True)
     region = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.now())
-    updated_at = Column(DateTime, default=datetime.now(), onupdate=datetime.now())
+    registered_at = Column(DateTime, nullable=True)
+    last_active_at = Column(DateTime, nullable=True)
+    # Етап телефонів: скільки разів номер не вдалося отримати і коли пробувати знову
+    phone_attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    phone_next_check_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=func.now())
+    # Годинник БД, як і в crawl_queue: updated_at - водяний знак інкрементальних дампів
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     products = relationship("Product", back_populates="seller")
 
+    __table_args__ = (
+        Index('ix_sellers_phone_pending', 'phone_next_check_at', postgresql_where=phone_number.is_(None)),
+    )
+
 
 class Product(Base):
     __tablename__ = 'products'
@@ -39,8 +52,82 @@ class Product(Base):
     image_urls = Column(String, nullable=True)
     product_url = Column(String, nullable=True)
     published_date = Column(String, nullable=True)
+    # Типізовані значення (src/services/normalize.py)
+    price_amount = Column(Numeric(14, 2), nullable=True)
+    price_currency = Column(String(3), nullable=True)
+    price_negotiable = Column(Boolean, nullable=True)
+    views = Column(Integer, nullable=True)
+    published_at = Column(DateTime, nullable=True)
+    image_list = Column(ARRAY(String), nullable=True)
     seller_id = Column(Integer, ForeignKey('sellers.id'), nullable=False)
-    created_at = Column(DateTime, default=datetime.now())
-    updated_at = Column(DateTime, default=datetime.now(), onupdate=datetime.now())
+    created_at = Column(DateTime, default=func.now())
+    # Годинник БД, як і в crawl_queue: updated_at - водяний знак інкрементальних дампів
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     seller = relationship("Seller", back_populates="products")
+
+    __table_args__ = (
+        Index('ix_products_published_at', 'published_at'),
+        Index('ix_products_price_amount', 'price_amount'),
+        Index('ix_products_seller_id', 'seller_id'),
+    )
+
+
+class CrawlTask(Base):
+    __tablename__ = 'crawl_queue'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String, unique=True, nullable=False)
+    listing_id = Column(String, nullable=True)
+    state = Column(String, nullable=False, default='pending', server_default='pending')
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    next_attempt_at = Column(DateTime, nullable=False, server_default=func.now())
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('ix_crawl_queue_state_next_attempt_at', 'state', 'next_attempt_at'),
+    )
+
+
+class ProductObservation(Base):
+    """
+    Часовий ряд переглядів і ціни. Таблиця секціонована за днями (RANGE по observed_at),
+    секції створює src/repository/observations.py:ensure_partitions.
+    """
+    __tablename__ = 'product_observations'
+
+    id = Column(BigInteger, autoincrement=True, nullable=False)
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    observed_at = Column(DateTime, nullable=False, server_default=func.now())
+    views = Column(Integer, nullable=True)
+    price_amount = Column(Numeric(14, 2), nullable=True)
+    price_currency = Column(String(3), nullable=True)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('id', 'observed_at'),
+        Index('ix_product_observations_product_id_observed_at', 'product_id', 'observed_at'),
+        {'postgresql_partition_by': 'RANGE (observed_at)'},
+    )
+
+
+class ProductRevisit(Base):
+    """
+    Розклад повторних відвідувань: пріоритет і час наступного перегляду для кожного продукту.
+    """
+    __tablename__ = 'product_revisits'
+
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    next_revisit_at = Column(DateTime, nullable=False, server_default=func.now())
+    priority = Column(Float, nullable=False, default=0, server_default='0')
+    first_observed_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_observed_at = Column(DateTime, nullable=True)
+    last_views = Column(Integer, nullable=True)
+    views_per_hour = Column(Float, nullable=True)
+    failures = Column(Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        Index('ix_product_revisits_next_revisit_at_priority', 'next_revisit_at', 'priority'),
+    )
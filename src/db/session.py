@@ -2,8 +2,11 @@ import os
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from src.services.metrics import DB_POOL, DB_POOL_TIMEOUTS
+from src.services.normalize import KYIV_TZ
 from src.utils.py_logger import get_logger
 
 logger = get_logger(__name__)
@@ -11,30 +14,68 @@ load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL")
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=False)
+# Пул з'єднань одного процесу: постійні + тимчасові понад них, очікування вільного (сек.),
+# перевідкриття старих з'єднань (сек.) і перевірка з'єднання перед видачею
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# Кеш підготовлених запитів asyncpg на з'єднання (0 - вимкнено, потрібно для pgbouncer у режимі transaction)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500))
+
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    echo=False,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        # Один годинник для всього: now()/localtimestamp БД у київському часі, як і published_at з сайту
+        "server_settings": {"application_name": "olx_scraper", "timezone": KYIV_TZ.key},
+    },
+)
 SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession,
                                   expire_on_commit=False)
 
+# Стан пулу рахується в момент запиту /metrics
+DB_POOL.labels("size").set_function(lambda: engine.pool.size())
+DB_POOL.labels("checked_out").set_function(lambda: engine.pool.checkedout())
+DB_POOL.labels("checked_in").set_function(lambda: engine.pool.checkedin())
+DB_POOL.labels("overflow").set_function(lambda: max(engine.pool.overflow(), 0))
+
+
+def pool_status() -> dict:
+    pool = engine.pool
+    return {"size": pool.size(), "checked_out": pool.checkedout(), "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0)}
+
 
 # Фабрика сесій
 async def get_db() -> AsyncSession:
-    async with SessionLocal() as session:
-        try:
-            yield session
-        except Exception as err:
-            logger.error(f"ERROR session DB: {err}")
-            await session.rollback()
-        finally:
-            await session.close()
+    async with get_db_context() as session:
+        yield session
 
 
 @asynccontextmanager
 async def get_db_context() -> AsyncSession:
+    """
+    Коротка сесія на одну одиницю роботи (пакет, claim, тік): з'єднання береться з пулу лише на час транзакції.
+    Сесії не спільні між задачами, тож помилка однієї транзакції не зачіпає інші: вона відкочується
+    і прокидається викликачу.
+    """
     async with SessionLocal() as session:
         try:
             yield session
         except Exception as err:
-            logger.error(f"ERROR session DB: {err}")
+            if isinstance(err, PoolTimeoutError):
+                DB_POOL_TIMEOUTS.inc()
+                logger.error(f"ERROR session DB: пул вичерпано {pool_status()}: {err}")
+            else:
+                logger.error(f"ERROR session DB: {err}")
             await session.rollback()
-        finally:
-            await session.close()
\ No newline at end of file
+            raise
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from sqlalchemy import or_, select, update
+
+from src.db.models import Product, Seller
+from src.db.session import get_db_context
+from src.services.normalize import normalize_product, normalize_seller
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+async def _backfill_table(model, columns: tuple, pending, normalize, batch_size: int) -> int:
+    """
+    Проходить таблицю пакетами за id (keyset) і записує типізовані значення одним bulk UPDATE на пакет.
+    Відносні дати ("Сьогодні о 12:30") розбираються відносно created_at рядка, а не поточного часу.
+    """
+    total, last_id = 0, 0
+    while True:
+        async with get_db_context() as db:
+            rows = (await db.execute(
+                select(model.id, model.created_at, *columns)
+                .where(model.id > last_id, pending)
+                .order_by(model.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                return total
+
+            values = [{"id": row.id, **normalize(row._asdict(), row.created_at)} for row in rows]
+            await db.execute(update(model), values)
+            await db.commit()
+
+        total += len(rows)
+        last_id = rows[-1].id
+        logger.info(f"Backfill {model.__tablename__}: оброблено {total}")
+
+
+async def backfill_typed_columns(batch_size: int = BACKFILL_BATCH_SIZE) -> None:
+    """
+    Заповнює типізовані колонки для рядків, збережених до їх появи (міграція b9e3d5f71c24).
+    Повторний запуск безпечний: беруться лише рядки з порожніми типізованими колонками.
+    """
+    start_time = time.time()
+
+    products = await _backfill_table(
+        Product,
+        (Product.price, Product.views_count, Product.published_date, Product.image_urls),
+        or_(Product.published_at.is_(None), Product.price_amount.is_(None), Product.views.is_(None)),
+        lambda row, now: normalize_product({"price": row["price"], "views_count": row["views_count"],
+                                            "date_published": row["published_date"],
+                                            "images": row["image_urls"]}, now),
+        batch_size,
+    )
+    sellers = await _backfill_table(
+        Seller,
+        (Seller.registered_date, Seller.last_active_date),
+        or_(Seller.registered_at.is_(None), Seller.last_active_at.is_(None)),
+        normalize_seller,
+        batch_size,
+    )
+
+    logger.info(f"Backfill завершено: продуктів {products}, продавців {sellers} "
+                f"за {time.time() - start_time:.2f} сек.", extra={'custom_color': True})
+
+
+if __name__ == '__main__':
+    asyncio.run(backfill_typed_columns())
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+from sqlalchemy import case, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.db.models import CrawlTask
+from src.db.session import get_db_context
+from src.repository.known_ids import listing_id_from_url
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+
+async def enqueue(urls: list[str]) -> int:
+    """
+    Додає посилання у crawl_queue; вже відомі (в будь-якому стані) ігноруються. Повертає кількість нових.
+    """
+    if not urls:
+        return 0
+
+    rows = [{"url": url, "listing_id": listing_id_from_url(url)} for url in dict.fromkeys(urls)]
+    async with get_db_context() as db:
+        inserted = await db.scalars(
+            pg_insert(CrawlTask).values(rows).on_conflict_do_nothing(index_elements=[CrawlTask.url])
+            .returning(CrawlTask.id)
+        )
+        count = len(inserted.all())
+        await db.commit()
+    return count
+
+
+async def claim(batch_size: int) -> list[str]:
+    """
+    Забирає до batch_size готових посилань (SELECT ... FOR UPDATE SKIP LOCKED), переводить їх у in_progress.
+    Паралельні воркери (і процеси) ніколи не отримають одне посилання двічі.
+    """
+    ready = (
+        select(CrawlTask.id)
+        .where(CrawlTask.state == PENDING, CrawlTask.next_attempt_at <= func.now())
+        .order_by(CrawlTask.next_attempt_at, CrawlTask.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    async with get_db_context() as db:
+        urls = await db.scalars(
+            update(CrawlTask)
+            .where(CrawlTask.id.in_(ready.scalar_subquery()))
+            .values(state=IN_PROGRESS, attempts=CrawlTask.attempts + 1, locked_at=func.now())
+            .returning(CrawlTask.url)
+        )
+        urls = urls.all()
+        await db.commit()
+    return urls
+
+
+async def mark_done(urls: list[str]) -> None:
+    if not urls:
+        return
+    async with get_db_context() as db:
+        await db.execute(
+            update(CrawlTask).where(CrawlTask.url.in_(urls))
+            .values(state=DONE, locked_at=None, last_error=None)
+        )
+        await db.commit()
+
+
+async def mark_failed(urls: list[str], error: str | None = None, max_attempts: int = 5,
+                      backoff: timedelta = timedelta(minutes=1)) -> None:
+    """
+    Повертає посилання в pending з експоненційною затримкою (backoff * 2^(attempts-1))
+    або переводить у failed після max_attempts спроб.
+    """
+    if not urls:
+        return
+    async with get_db_context() as db:
+        await db.execute(
+            update(CrawlTask).where(CrawlTask.url.in_(urls))
+            .values(
+                state=case((CrawlTask.attempts >= max_attempts, FAILED), else_=PENDING),
+                next_attempt_at=func.now() + backoff * func.power(2, CrawlTask.attempts - 1),
+                locked_at=None,
+                last_error=error,
+            )
+        )
+        await db.commit()
+
+
+async def release(urls: list[str]) -> None:
+    """
+    Повертає взяті, але не оброблені посилання в pending без штрафу за спробу.
+    """
+    if not urls:
+        return
+    async with get_db_context() as db:
+        await db.execute(
+            update(CrawlTask).where(CrawlTask.url.in_(urls), CrawlTask.state == IN_PROGRESS)
+            .values(state=PENDING, attempts=CrawlTask.attempts - 1, locked_at=None)
+        )
+        await db.commit()
+
+
+async def requeue_stale(lease: timedelta) -> int:
+    """
+    Відновлення після падіння: in_progress довше за lease повертаються в pending.
+    """
+    async with get_db_context() as db:
+        result = await db.execute(
+            update(CrawlTask)
+            .where(CrawlTask.state == IN_PROGRESS, CrawlTask.locked_at < func.now() - lease)
+            .values(state=PENDING, locked_at=None)
+        )
+        await db.commit()
+
+    if result.rowcount:
+        logger.warning(f"Frontier: повернуто в чергу завислих посилань: {result.rowcount}")
+    return result.rowcount
+
+
+async def pending_count() -> int:
+    async with get_db_context() as db:
+        return await db.scalar(select(func.count(CrawlTask.id)).where(CrawlTask.state == PENDING))
+
+
+async def purge(done_after: timedelta, failed_after: timedelta, batch_size: int = 10000) -> int:
+    """
+    Видаляє виконані посилання, старші за done_after, і остаточно невдалі, старші за failed_after
+    (за updated_at), пакетами по batch_size, щоб не тримати довгих блокувань.
+    Повторно знайдене видалене посилання відсіює KnownIds ще до crawl_queue.
+    """
+    expired = or_(
+        (CrawlTask.state == DONE) & (CrawlTask.updated_at < func.now() - done_after),
+        (CrawlTask.state == FAILED) & (CrawlTask.updated_at < func.now() - failed_after),
+    )
+    total = 0
+    while True:
+        async with get_db_context() as db:
+            result = await db.execute(
+                delete(CrawlTask).where(CrawlTask.id.in_(select(CrawlTask.id).where(expired).limit(batch_size)))
+            )
+            await db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            break
+
+    if total:
+        logger.info(f"Frontier: видалено старих посилань з crawl_queue: {total}")
+    return total
@@ -0,0 +1,128 @@
+import hashlib
+import math
+import os
+import re
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Product
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+load_dotenv()
+
+# Після цієї кількості записів індекс переходить з set на Bloom filter
+BLOOM_THRESHOLD = int(os.getenv("KNOWN_IDS_BLOOM_THRESHOLD", 1_000_000))
+BLOOM_ERROR_RATE = float(os.getenv("KNOWN_IDS_BLOOM_ERROR_RATE", 0.001))
+# refresh перечитує і стільки останніх id до last_id: рядок, чия транзакція закомітилась пізніше,
+# може мати менший id, ніж уже прочитані рядки інших записувачів
+REFRESH_OVERLAP = int(os.getenv("KNOWN_IDS_REFRESH_OVERLAP", 1000))
+
+LISTING_ID_RE = re.compile(r"-ID([0-9A-Za-z]+)\.html")
+
+
+def listing_id_from_url(url: str | None) -> str | None:
+    """
+    Витягує ID оголошення з посилання картки (".../title-IDabc12.html?reason=...").
+    Якщо ID в посиланні немає, ключем стає шлях без query-параметрів.
+    """
+    if not url:
+        return None
+
+    path = urlsplit(url).path
+    match = LISTING_ID_RE.search(path)
+    return match.group(1) if match else path.rstrip("/") or None
+
+
+class BloomFilter:
+    """
+    Простий Bloom filter для великих таблиць (double hashing на blake2b).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class KnownIds:
+    """
+    Індекс ID оголошень, які вже є в таблиці products.
+    Один на процес: повністю завантажується один раз, далі refresh дочитує лише нові рядки
+    (id > last_id - overlap), а записані в прогоні оголошення додаються одразу після запису.
+    """
+
+    def __init__(self, overlap: int = REFRESH_OVERLAP):
+        self._index: set | BloomFilter = set()
+        self.last_id: int | None = None
+        self.overlap = overlap
+
+    async def load(self, db: AsyncSession) -> "KnownIds":
+        total = await db.scalar(select(func.count(Product.id)))
+
+        if total > BLOOM_THRESHOLD:
+            self._index = BloomFilter(capacity=total * 2)
+        else:
+            self._index = set()
+        self.last_id = 0
+
+        await self._read(db, select(Product.id, Product.product_url))
+
+        logger.info(f"KnownIds: завантажено {total} оголошень ({type(self._index).__name__})")
+        return self
+
+    async def refresh(self, db: AsyncSession) -> "KnownIds":
+        """
+        Дочитує оголошення, додані після попереднього завантаження (зокрема іншими процесами).
+        Останні overlap id перечитуються: так не губляться рядки, закомічені із запізненням.
+        Перше звернення і перехід set -> Bloom filter - повне завантаження.
+        """
+        if self.last_id is None or (isinstance(self._index, set) and len(self._index) > BLOOM_THRESHOLD):
+            return await self.load(db)
+
+        added = await self._read(db, select(Product.id, Product.product_url)
+                                 .where(Product.id > self.last_id - self.overlap))
+        if added:
+            logger.info(f"KnownIds: дочитано {added} нових оголошень")
+        return self
+
+    async def _read(self, db: AsyncSession, query) -> int:
+        """
+        Додає рядки запиту в індекс і повертає кількість ID, яких у ньому ще не було.
+        """
+        rows = await db.stream(query.execution_options(yield_per=10_000))
+        count = 0
+        async for product_id, url in rows:
+            if url not in self:
+                self.add(url)
+                count += 1
+            self.last_id = max(self.last_id, product_id)
+        return count
+
+    def add(self, url: str | None) -> None:
+        listing_id = listing_id_from_url(url)
+        if listing_id:
+            self._index.add(listing_id)
+
+    def __contains__(self, url: str | None) -> bool:
+        listing_id = listing_id_from_url(url)
+        return listing_id is not None and listing_id in self._index
+
+
+# Індекс процесу: координатор і воркери не перечитують таблицю products на кожному прогоні
+known_ids = KnownIds()
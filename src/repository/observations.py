@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.db.models import Product, ProductObservation, ProductRevisit
+from src.db.session import get_db_context
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+PARTITION_PREFIX = 'product_observations_'
+
+
+@dataclass
+class DueRevisit:
+    product_id: int
+    url: str
+    published_at: datetime | None
+    first_observed_at: datetime
+    last_observed_at: datetime | None
+    last_views: int | None
+    views_per_hour: float | None
+    failures: int
+
+
+async def db_now() -> datetime:
+    """
+    Поточний час БД (localtimestamp): той самий годинник, що й server_default/now() у колонках і запитах розкладу.
+    """
+    async with get_db_context() as db:
+        return await db.scalar(select(func.localtimestamp()))
+
+
+async def ensure_partitions(days_ahead: int = 2, today: date | None = None) -> list[str]:
+    """
+    Створює денні секції product_observations на сьогодні (за годинником БД) і days_ahead днів уперед
+    (IF NOT EXISTS). Повертає назви секцій, які вдалося підготувати.
+    """
+    today = today or (await db_now()).date()
+    ready = []
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        name = f"{PARTITION_PREFIX}{day:%Y%m%d}"
+        async with get_db_context() as db:
+            try:
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF product_observations "
+                    f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+                await db.commit()
+                ready.append(name)
+            except Exception as e:
+                await db.rollback()
+                logger.warning(f"Observations: не вдалося створити секцію {name}: {e}")
+    return ready
+
+
+async def seed_revisits(after_id: int, max_age: timedelta, limit: int = 5000) -> int:
+    """
+    Ставить у розклад до limit продуктів з id > after_id, опублікованих не раніше max_age тому,
+    і записує для них перше спостереження (значення, збережені при першому скрапінгу).
+    Повертає найбільший id продукту, який побачено (новий after_id).
+    """
+    candidates = (
+        select(Product.id, Product.views, Product.price_amount, Product.price_currency,
+               (func.coalesce(Product.published_at, func.now()) > func.now() - max_age).label("fresh"))
+        .where(Product.id > after_id)
+        .order_by(Product.id)
+        .limit(limit)
+    )
+    async with get_db_context() as db:
+        rows = (await db.execute(candidates)).all()
+        fresh = [row for row in rows if row.fresh]
+        if fresh:
+            await db.execute(
+                pg_insert(ProductRevisit)
+                .values([{"product_id": row.id, "last_views": row.views, "last_observed_at": func.now()}
+                         for row in fresh])
+                .on_conflict_do_nothing(index_elements=[ProductRevisit.product_id])
+            )
+            await db.execute(insert(ProductObservation.__table__), [
+                {"product_id": row.id, "views": row.views, "price_amount": row.price_amount,
+                 "price_currency": row.price_currency}
+                for row in fresh
+            ])
+            await db.commit()
+            logger.info(f"Revisit: додано в розклад продуктів: {len(fresh)}")
+    return rows[-1].id if rows else after_id
+
+
+async def last_seeded_id() -> int:
+    async with get_db_context() as db:
+        return await db.scalar(select(func.max(ProductRevisit.product_id))) or 0
+
+
+async def claim_due(limit: int, lease: timedelta) -> list[DueRevisit]:
+    """
+    Забирає до limit продуктів, яким настав час повторного відвідування, у порядку пріоритету.
+    next_revisit_at зсувається на lease, тож інші процеси їх не візьмуть (FOR UPDATE SKIP LOCKED).
+    """
+    due = (
+        select(ProductRevisit.product_id)
+        .where(ProductRevisit.next_revisit_at <= func.now())
+        .order_by(ProductRevisit.priority.desc(), ProductRevisit.next_revisit_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    revisits, products = ProductRevisit.__table__, Product.__table__
+    async with get_db_context() as db:
+        rows = (await db.execute(
+            update(revisits)
+            .where(revisits.c.product_id.in_(due.scalar_subquery()), products.c.id == revisits.c.product_id)
+            .values(next_revisit_at=func.now() + lease)
+            .returning(revisits.c.product_id, products.c.product_url, products.c.published_at,
+                       revisits.c.first_observed_at, revisits.c.last_observed_at,
+                       revisits.c.last_views, revisits.c.views_per_hour, revisits.c.failures)
+        )).all()
+        await db.commit()
+    return [DueRevisit(product_id=row[0], url=row[1], published_at=row[2], first_observed_at=row[3],
+                       last_observed_at=row[4], last_views=row[5], views_per_hour=row[6], failures=row[7])
+            for row in rows if row[1]]
+
+
+async def record_observations(observations: list[dict], schedule: list[dict]) -> None:
+    """
+    Записує спостереження і новий розклад однією транзакцією.
+    schedule - значення ProductRevisit за первинним ключем product_id.
+    """
+    async with get_db_context() as db:
+        if observations:
+            await db.execute(insert(ProductObservation.__table__), observations)
+        if schedule:
+            await db.execute(update(ProductRevisit), schedule)
+        await db.commit()
+
+
+async def drop_revisits(product_ids: list[int]) -> None:
+    if not product_ids:
+        return
+    async with get_db_context() as db:
+        await db.execute(delete(ProductRevisit).where(ProductRevisit.product_id.in_(product_ids)))
+        await db.commit()
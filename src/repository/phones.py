@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+from sqlalchemy import bindparam, func, or_, select, update
+
+from src.db.models import Product, Seller
+from src.db.session import get_db_context
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PendingPhone:
+    seller_id: int
+    seller_key: str
+    url: str | None
+    attempts: int
+
+
+class PhoneCache:
+    """
+    sellers.id -> телефон в межах процесу. Номер, уже відкритий на сайті, не відкривається повторно,
+    навіть якщо запис у БД не вдався і продавець знову потрапив у чергу після lease.
+    Ключ - id, а не seller_key: ключ продавця змінюється на olx:..., коли з'являється profile_url.
+    """
+
+    def __init__(self):
+        self._phones: dict[int, str] = {}
+
+    def get(self, seller_id: int) -> str | None:
+        return self._phones.get(seller_id)
+
+    def update(self, phones: dict[int, str]) -> None:
+        self._phones.update(phones)
+
+    def __len__(self) -> int:
+        return len(self._phones)
+
+
+phone_cache = PhoneCache()
+
+
+async def claim_pending(limit: int, lease: timedelta, max_attempts: int) -> list[PendingPhone]:
+    """
+    Забирає до limit продавців без телефону (спершу нові), для яких настав час спроби.
+    phone_next_check_at зсувається на lease, тож інші процеси їх не візьмуть (FOR UPDATE SKIP LOCKED).
+    Для кожного повертається посилання на його останнє оголошення - кнопка телефону є лише там.
+    """
+    pending = (
+        select(Seller.id)
+        .where(Seller.phone_number.is_(None), Seller.phone_attempts < max_attempts,
+               or_(Seller.phone_next_check_at.is_(None), Seller.phone_next_check_at <= func.now()))
+        .order_by(Seller.id.desc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    sellers, products = Seller.__table__, Product.__table__
+    latest_url = (
+        select(products.c.product_url)
+        .where(products.c.seller_id == sellers.c.id)
+        .order_by(products.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    async with get_db_context() as db:
+        rows = (await db.execute(
+            update(sellers)
+            .where(sellers.c.id.in_(pending.scalar_subquery()))
+            # updated_at - водяний знак інкрементальних дампів, службові колонки його не зсувають
+            .values(phone_next_check_at=func.now() + lease, updated_at=sellers.c.updated_at)
+            .returning(sellers.c.id, sellers.c.seller_key, latest_url, sellers.c.phone_attempts)
+        )).all()
+        await db.commit()
+    return [PendingPhone(seller_id=row[0], seller_key=row[1], url=row[2], attempts=row[3]) for row in rows]
+
+
+async def save_phones(found: dict[int, str], missing: list[int], retry: timedelta) -> None:
+    """
+    Записує знайдені номери за sellers.id; для missing (кнопки немає або номер не показали)
+    збільшує лічильник спроб і відкладає наступну на retry.
+    """
+    sellers = Seller.__table__
+    async with get_db_context() as db:
+        if found:
+            await db.execute(
+                update(sellers)
+                .where(sellers.c.id == bindparam("b_id"), sellers.c.phone_number.is_(None))
+                .values(phone_number=bindparam("b_phone"), updated_at=func.now()),
+                [{"b_id": seller_id, "b_phone": phone} for seller_id, phone in sorted(found.items())],
+            )
+        if missing:
+            await db.execute(
+                update(sellers)
+                .where(sellers.c.id.in_(sorted(missing)))
+                .values(phone_attempts=sellers.c.phone_attempts + 1, phone_next_check_at=func.now() + retry,
+                        updated_at=sellers.c.updated_at)
+            )
+        await db.commit()
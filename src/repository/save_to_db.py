@@ -1,52 +1,200 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, SQLAlchemyError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.models import Seller, Product
+from src.db.models import Product
+from src.db.session import get_db_context
+from src.repository.sellers import seller_cache, seller_key, upsert_sellers
+from src.services.normalize import normalize_product, normalize_seller
 from src.utils.py_logger import get_logger
 
 logger = get_logger(__name__)
 
-async def save_data_to_db(data: dict, db: AsyncSession):
+
+def _seller_values(data: dict, now: datetime | None = None) -> dict:
+    return {
+        "name": data['seller'].get('name', None),
+        "profile_url": data['seller'].get('profile_url', None),
+        "phone_number": data['seller'].get('phone_number', None),
+        "rating": data['seller'].get('rating', None),
+        "registered_date": data['seller'].get('registered_date', None),
+        "last_active_date": data['seller'].get('last_active_date', None),
+        "location": data['seller'].get('location', None),
+        "region": data['seller'].get('region', None),
+        **normalize_seller(data['seller'], now),
+    }
+
+
+def _product_values(data: dict, seller_id: int | None, now: datetime | None = None) -> dict:
+    return {
+        "title": data['product'].get('title', None),
+        "price": data['product'].get('price', None),
+        "type": data['product'].get('type_item', None),
+        "is_olx_delivery": data['product'].get('olx_delivery', None),
+        "info": data['product'].get('info', None),
+        "site_id": data['product'].get('site_id', None),
+        "views_count": data['product'].get('views_count', None),
+        "description": data['product'].get('description', None),
+        "image_urls": data['product'].get('images', None),
+        "product_url": data['product'].get('link', None),
+        "published_date": data['product'].get('date_published', None),
+        "seller_id": seller_id,
+        **normalize_product(data['product'], now),
+    }
+
+
+async def save_data_to_db(data: dict, db: AsyncSession) -> bool:
     """
-    Зберігає дані продавця та продукту в базу даних.
+    Зберігає дані продавця та продукту в базу даних. Повертає True, якщо запис успішний.
     """
     try:
+        key = seller_key(data['seller'])
+        sellers = {key: _seller_values(data)}
+        seller_ids = await upsert_sellers(db, sellers)
 
-        seller_data = {
-            "name": data['seller'].get('name', None),
-            "phone_number": data['seller'].get('phone_number', None),
-            "rating": data['seller'].get('rating', None),
-            "registered_date": data['seller'].get('registered_date', None),
-            "last_active_date": data['seller'].get('last_active_date', None),
-            "location": data['seller'].get('location', None),
-            "region": data['seller'].get('region', None),
-        }
-
-
-        seller = Seller(**seller_data)
-        db.add(seller)
-        await db.flush()
-
-        product_data = {
-            "title": data['product'].get('title', None),
-            "price": data['product'].get('price', None),
-            "type": data['product'].get('type_item', None),
-            "is_olx_delivery": data['product'].get('olx_delivery', None),
-            "info": data['product'].get('info', None),
-            "site_id": data['product'].get('site_id', None),
-            "views_count": data['product'].get('views_count', None),
-            "description": data['product'].get('description', None),
-            "image_urls": data['product'].get('images', None),
-            "product_url": data['product'].get('link', None),
-            "published_date": data['product'].get('date_published', None),
-            "seller_id": seller.id,
-        }
-
-
-        product = Product(**product_data)
+        product = Product(**_product_values(data, seller_ids[key]))
         db.add(product)
 
         await db.commit()
+        seller_cache.update(seller_ids, sellers)
         logger.info(f"Дані успішно збережено!", extra={'custom_color': True})
+        return True
     except Exception as e:
         await db.rollback()
         logger.error(f"Помилка при записі в БД: {e}")
+        return False
+
+
+@dataclass
+class BatchResult:
+    """
+    Результат пакетного запису: saved - записані, duplicates - вже були в products (або повторилися в пакеті),
+    invalid - записи без site_id, failed - записи, які БД не прийняла навіть поодинці.
+    """
+    saved: list[dict] = field(default_factory=list)
+    duplicates: list[dict] = field(default_factory=list)
+    invalid: list[dict] = field(default_factory=list)
+    failed: list[dict] = field(default_factory=list)
+
+
+def _row_error(error: Exception) -> bool:
+    """
+    Помилка одного запису (обмеження, тип, значення), а не з'єднання: решту пакета можна записати.
+    """
+    if isinstance(error, DBAPIError):
+        return not error.connection_invalidated and isinstance(error, (IntegrityError, DataError))
+    return not isinstance(error, (SQLAlchemyError, OSError))
+
+
+async def _insert(db: AsyncSession, fresh: list[dict]) -> tuple[set[str], dict[str, int], dict[str, dict]]:
+    """
+    Повертає site_id вставлених продуктів, sellers.id і значення продавців (для seller_cache після commit).
+    """
+    keys = [seller_key(data['seller']) for data in fresh]
+    sellers = {key: _seller_values(data) for key, data in zip(keys, fresh)}
+    seller_ids = await upsert_sellers(db, sellers)
+
+    inserted = set(await db.scalars(
+        pg_insert(Product)
+        .values([_product_values(data, seller_ids[key]) for data, key in zip(fresh, keys)])
+        .on_conflict_do_nothing(index_elements=[Product.site_id])
+        .returning(Product.site_id)
+    ))
+    return inserted, seller_ids, sellers
+
+
+async def _insert_one_by_one(fresh: list[dict], result: BatchResult) -> set[str]:
+    """
+    Запасний шлях після падіння пакета: кожен запис у власному SAVEPOINT, тож один поганий рядок
+    не скасовує решту. Помилка з'єднання зупиняє запис - прокидається викликачу.
+    """
+    inserted, seller_ids, sellers = set(), {}, {}
+    async with get_db_context() as db:
+        for data in fresh:
+            try:
+                async with db.begin_nested():
+                    row_inserted, row_seller_ids, row_sellers = await _insert(db, [data])
+            except Exception as e:
+                if not _row_error(e):
+                    raise
+                logger.error(f"Запис {data['product']['site_id']} відхилено БД: {e}")
+                result.failed.append(data)
+                continue
+            inserted |= row_inserted
+            seller_ids.update(row_seller_ids)
+            sellers.update(row_sellers)
+        await db.commit()
+    seller_cache.update(seller_ids, sellers)
+    return inserted
+
+
+async def bulk_save_data_to_db(batch: list[dict]) -> BatchResult | None:
+    """
+    Записує пакет продавців і продуктів однією транзакцією у власній сесії.
+    Продавці зводяться до одного рядка за seller_key (upsert), дублікати продуктів за site_id
+    відкидаються (INSERT ... ON CONFLICT DO NOTHING), записи без site_id рахуються окремо як invalid.
+    Якщо пакет не записався, записи пишуться поодинці (SAVEPOINT на кожен) і в failed потрапляють лише ті,
+    що не записалися самі. None - БД недоступна, не записано нічого.
+    """
+    start_time = time.time()
+    result = BatchResult()
+
+    unique = {}
+    for data in batch:
+        site_id = data.get('product', {}).get('site_id')
+        if not site_id:
+            result.invalid.append(data)
+        elif site_id in unique:
+            result.duplicates.append(data)
+        else:
+            unique[site_id] = data
+
+    if result.invalid:
+        logger.warning(f"Пакет: записів без site_id: {len(result.invalid)}")
+    if not unique:
+        return result
+
+    try:
+        async with get_db_context() as db:
+            existing = set(await db.scalars(select(Product.site_id).where(Product.site_id.in_(unique))))
+            # Сортування за site_id - однаковий порядок блокувань у паралельних db_writer
+            fresh = [data for site_id, data in sorted(unique.items()) if site_id not in existing]
+            result.duplicates += [data for site_id, data in unique.items() if site_id in existing]
+
+            if not fresh:
+                logger.info(f"Пакет: 0 записано, відхилено дублікатів: {len(result.duplicates)}")
+                return result
+
+            try:
+                inserted, seller_ids, sellers = await _insert(db, fresh)
+                await db.commit()
+                seller_cache.update(seller_ids, sellers)
+            except Exception as e:
+                if not _row_error(e):
+                    raise
+                await db.rollback()
+                logger.warning(f"Пакет з {len(fresh)} записів не записано ({e}), записуємо поодинці")
+                inserted = await _insert_one_by_one(fresh, result)
+
+    except Exception as e:
+        logger.error(f"Помилка при пакетному записі в БД ({len(batch)} записів): {e}")
+        return None
+
+    failed = {id(data) for data in result.failed}
+    for data in fresh:
+        if data['product']['site_id'] in inserted:
+            result.saved.append(data)
+        elif id(data) not in failed:
+            result.duplicates.append(data)
+
+    elapsed = time.time() - start_time
+    logger.info(f"Пакет: записано {len(result.saved)} за {elapsed:.2f} сек. "
+                f"({len(result.saved) / elapsed:.1f} рядків/сек.), відхилено дублікатів: {len(result.duplicates)}, "
+                f"без site_id: {len(result.invalid)}, не прийнято БД: {len(result.failed)}",
+                extra={'custom_color': True})
+    return result
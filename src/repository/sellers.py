@@ -0,0 +1,132 @@
+import hashlib
+import re
+
+from sqlalchemy import bindparam, case, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Seller
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_ID_RE = re.compile(r"/user/([^/?#]+)")
+
+# Колонки, які upsert оновлює для вже відомого продавця (порожні нові значення не затирають наявні)
+REFRESHED_COLUMNS = ("name", "profile_url", "rating", "registered_date", "last_active_date", "location", "region",
+                     "registered_at", "last_active_at")
+
+
+def seller_key(seller: dict) -> str:
+    """
+    Стабільний ключ продавця: ID профілю OLX, а якщо його немає - md5 від нормалізованих імені та локації.
+    Формула хешу збігається з міграцією, яка прибирала дублікати.
+    """
+    match = PROFILE_ID_RE.search(seller.get('profile_url') or "")
+    if match:
+        return f"olx:{match.group(1)}"
+    return hash_key(seller)
+
+
+def hash_key(seller: dict) -> str:
+    """
+    Запасний ключ за іменем і локацією: ним ключовані всі продавці, збережені до появи profile_url.
+    """
+    name = (seller.get('name') or "").strip().lower()
+    location = (seller.get('location') or "").strip().lower()
+    return "h:" + hashlib.md5(f"{name}|{location}".encode()).hexdigest()
+
+
+class SellerCache:
+    """
+    Кеш seller_key -> sellers.id в межах процесу, щоб повторні продавці не йшли в БД.
+    Разом з id зберігається відбиток записаних значень: продавець зі зміненими даними (рейтинг, "онлайн")
+    знову проходить через upsert.
+    """
+
+    def __init__(self):
+        self._ids: dict[str, tuple[int, int]] = {}
+
+    @staticmethod
+    def fingerprint(values: dict) -> int:
+        return hash(tuple(sorted(values.items())))
+
+    def get(self, key: str, values: dict) -> int | None:
+        cached = self._ids.get(key)
+        if cached is None or cached[1] != self.fingerprint(values):
+            return None
+        return cached[0]
+
+    def update(self, ids: dict[str, int], sellers: dict[str, dict]) -> None:
+        self._ids.update({key: (seller_id, self.fingerprint(sellers[key])) for key, seller_id in ids.items()})
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+seller_cache = SellerCache()
+
+
+async def rekey_sellers(db: AsyncSession, sellers: dict[str, dict]) -> None:
+    """
+    Продавці з ID профілю, які вже є в БД під запасним ключем h:... (збережені без profile_url),
+    отримують ключ olx:... на місці - той самий рядок і id, а не другий рядок поруч.
+    Рядок не переключається, якщо продавець з цим olx-ключем уже існує.
+    """
+    rows = [{"b_old": hash_key(values), "b_new": key, "b_profile": values.get("profile_url")}
+            for key, values in sorted(sellers.items()) if key.startswith("olx:")]
+    if not rows:
+        return
+
+    table = Seller.__table__
+    existing = table.alias("existing")
+    await db.execute(
+        update(table)
+        .where(table.c.seller_key == bindparam("b_old"), table.c.profile_url.is_(None),
+               ~exists(select(existing.c.id).where(existing.c.seller_key == bindparam("b_new"))))
+        # updated_at - водяний знак інкрементальних дампів: ключ змінився, рядок має потрапити в дамп
+        .values(seller_key=bindparam("b_new"), profile_url=bindparam("b_profile"), updated_at=func.now()),
+        rows,
+    )
+
+
+def upsert_statement(rows: list[dict]):
+    """
+    INSERT ... ON CONFLICT (seller_key) DO UPDATE ... RETURNING seller_key, id.
+    Відомий продавець отримує свіжі REFRESHED_COLUMNS (coalesce: порожнє нове значення не затирає наявне),
+    телефон заповнюється, лише якщо його ще не було.
+    """
+    stmt = pg_insert(Seller).values(rows)
+    values = {column: func.coalesce(getattr(stmt.excluded, column), getattr(Seller, column))
+              for column in REFRESHED_COLUMNS}
+    values["phone_number"] = func.coalesce(Seller.phone_number, stmt.excluded.phone_number)
+    return stmt.on_conflict_do_update(
+        index_elements=[Seller.seller_key],
+        set_={
+            **values,
+            # ON CONFLICT не застосовує onupdate; updated_at змінюється лише разом з даними,
+            # щоб інкрементальні дампи не переписували незмінних продавців
+            "updated_at": case(
+                (or_(*(getattr(Seller, column).is_distinct_from(value) for column, value in values.items())),
+                 func.now()),
+                else_=Seller.updated_at,
+            ),
+        },
+    ).returning(Seller.seller_key, Seller.id)
+
+
+async def upsert_sellers(db: AsyncSession, sellers: dict[str, dict]) -> dict[str, int]:
+    """
+    Повертає sellers.id для кожного ключа. Продавці, яких немає в кеші або чиї дані змінилися,
+    записуються одним upsert_statement. Кеш не оновлюється тут - лише після commit (див. seller_cache.update).
+    """
+    ids = {key: seller_id for key, values in sellers.items()
+           if (seller_id := seller_cache.get(key, values)) is not None}
+    # Сортування за ключем - однаковий порядок блокувань у паралельних транзакціях
+    missing = [{**values, "seller_key": key} for key, values in sorted(sellers.items()) if key not in ids]
+
+    if missing:
+        await rekey_sellers(db, {row["seller_key"]: row for row in missing})
+        ids.update({key: seller_id for key, seller_id in await db.execute(upsert_statement(missing))})
+
+    return ids
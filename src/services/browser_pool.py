@@ -0,0 +1,215 @@
+import asyncio
+import os
+import random
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from playwright.async_api import Browser, BrowserContext, Page, Playwright
+
+from src.services.browser_session import SessionManager
+from src.services.metrics import ACTIVE_BROWSERS, ACTIVE_PAGES, span
+from src.services.load_profile import LoadProfile, PageTraffic, install_request_blocking
+from src.utils.info import USER_AGENTS
+from src.utils.py_logger import get_logger
+from src.utils.waits import PAGE_ACTION_TIMEOUT, PAGE_NAVIGATION_TIMEOUT
+
+logger = get_logger(__name__)
+
+# Маскування navigator.webdriver
+WEBDRIVER_MASK_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+"""
+
+
+@dataclass
+class _ContextSlot:
+    """
+    Слот пулу: браузер, до якого прив'язаний контекст, і сам контекст.
+    """
+    browser: Browser
+    context: BrowserContext | None = None
+    pages_served: int = 0
+
+
+def _process_tree_rss_mb(root_pid: int) -> float | None:
+    """
+    Сумарний RSS (МБ) усіх дочірніх процесів (Playwright driver + браузери). Працює лише на Linux.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    rss_pages = {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as stat_file:
+                fields = stat_file.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(pid))
+            rss_pages[int(pid)] = int(fields[21])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total, stack = 0, list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Пул браузерів, які запускаються один раз на прогін.
+    Видає ізольовані BrowserContext/Page через async checkout і перестворює контекст
+    після заданої кількості сторінок або при перевищенні порогу пам'яті.
+    Кожен контекст отримує блокування запитів з load_profile і storage_state сесії (логін, згода на cookies).
+    """
+
+    def __init__(self, playwright: Playwright, size: int = 2, contexts_per_browser: int = 2,
+                 headless: bool = False, max_pages_per_context: int = 20, max_memory_mb: float | None = None,
+                 load_profile: LoadProfile = LoadProfile(), session: SessionManager | None = None,
+                 action_timeout: float = PAGE_ACTION_TIMEOUT, navigation_timeout: float = PAGE_NAVIGATION_TIMEOUT):
+        self.playwright = playwright
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.headless = headless
+        self.max_pages_per_context = max_pages_per_context
+        self.max_memory_mb = max_memory_mb
+        self.load_profile = load_profile
+        self.session = session
+        self.action_timeout = action_timeout
+        self.navigation_timeout = navigation_timeout
+        self.browsers: list[Browser] = []
+        self._idle: asyncio.Queue[_ContextSlot] = asyncio.Queue()
+        self._slots: list[_ContextSlot] = []
+        self._traffic: dict[Page, PageTraffic] = {}
+
+    @property
+    def capacity(self) -> int:
+        """
+        Скільки сторінок пул може видати одночасно (по одній на контекст).
+        """
+        return self.size * self.contexts_per_browser
+
+    async def start(self) -> "BrowserPool":
+        """
+        Запускає N браузерів і готує слоти для контекстів.
+        """
+        firefox = self.playwright.firefox
+        with span("browser_launch"):
+            self.browsers = list(await asyncio.gather(
+                *(firefox.launch(headless=self.headless) for _ in range(self.size))
+            ))
+        ACTIVE_BROWSERS.inc(len(self.browsers))
+
+        if self.session:
+            await self.session.start(self.browsers[0])
+
+        for browser in self.browsers:
+            for _ in range(self.contexts_per_browser):
+                slot = _ContextSlot(browser=browser)
+                self._slots.append(slot)
+                self._idle.put_nowait(slot)
+
+        logger.info(f"BrowserPool: запущено браузерів: {len(self.browsers)}, слотів: {len(self._slots)}")
+        return self
+
+    async def close(self) -> None:
+        """
+        Закриває всі контексти та браузери пулу.
+        """
+        if self.session:
+            await self.session.close()
+        for slot in self._slots:
+            await self._close_context(slot)
+        await asyncio.gather(*(browser.close() for browser in self.browsers), return_exceptions=True)
+        ACTIVE_BROWSERS.dec(len(self.browsers))
+        self.browsers.clear()
+        self._slots.clear()
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _context_options(self) -> dict:
+        """
+        Параметри для нового BrowserContext.
+        """
+        options = {"user_agent": random.choice(USER_AGENTS)}
+        if self.session:
+            options.update(self.session.context_options())
+        return options
+
+    async def _new_context(self, slot: _ContextSlot) -> BrowserContext:
+        with span("browser_setup"):
+            context = await slot.browser.new_context(**self._context_options())
+            # Жодне очікування на сторінках пулу не триває стандартні 30 сек.
+            context.set_default_timeout(self.action_timeout)
+            context.set_default_navigation_timeout(self.navigation_timeout)
+            await context.add_init_script(WEBDRIVER_MASK_SCRIPT)
+            await install_request_blocking(context, self.load_profile)
+        return context
+
+    @staticmethod
+    async def _close_context(slot: _ContextSlot) -> None:
+        if slot.context:
+            try:
+                await slot.context.close()
+            except Exception as e:
+                logger.warning(f"BrowserPool: не вдалося закрити контекст: {e}")
+        slot.context = None
+        slot.pages_served = 0
+
+    def _over_memory_limit(self) -> bool:
+        if not self.max_memory_mb:
+            return False
+        rss_mb = _process_tree_rss_mb(os.getpid())
+        return rss_mb is not None and rss_mb > self.max_memory_mb
+
+    async def _release(self, slot: _ContextSlot, broken: bool) -> None:
+        slot.pages_served += 1
+        if broken or slot.pages_served >= self.max_pages_per_context or self._over_memory_limit():
+            logger.debug(f"BrowserPool: перестворення контексту після {slot.pages_served} сторінок")
+            await self._close_context(slot)
+
+    async def goto(self, page: Page, url: str):
+        """
+        Перехід за посиланням з wait_until профілю; час завантаження і трафік потрапляють у звіт сторінки.
+        """
+        traffic = self._traffic.get(page)
+        if traffic is None:
+            return await page.goto(url, wait_until=self.load_profile.wait_until)
+        return await traffic.goto(url, self.load_profile.wait_until)
+
+    @asynccontextmanager
+    async def page(self) -> Page:
+        """
+        Позичає сторінку з пулу. Після виходу сторінка закривається, а слот повертається в пул.
+        """
+        slot = await self._idle.get()
+        page = None
+        broken = False
+
+        try:
+            if slot.context is None:
+                slot.context = await self._new_context(slot)
+            page = await slot.context.new_page()
+            ACTIVE_PAGES.inc()
+            self._traffic[page] = PageTraffic(page)
+            yield page
+        except Exception:
+            broken = page is None
+            raise
+        finally:
+            if page:
+                ACTIVE_PAGES.dec()
+                self._traffic.pop(page).report()
+                try:
+                    await page.close()
+                except Exception:
+                    broken = True
+            await self._release(slot, broken)
+            self._idle.put_nowait(slot)
@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+
+from dotenv import load_dotenv
+from playwright.async_api import Browser, Page, TimeoutError as PlaywrightTimeoutError
+
+from src.services.metrics import span
+from src.utils.info import USER_AGENTS
+from src.utils.py_logger import get_logger
+from src.utils.waits import PAGE_NAVIGATION_TIMEOUT
+
+logger = get_logger(__name__)
+load_dotenv()
+
+# 1 - логін один раз і спільний storage_state (cookies, localStorage) для всіх контекстів пулу
+SESSION_ENABLED = os.getenv("SESSION_ENABLED", "1") == "1"
+SESSION_DIR = os.getenv("SESSION_DIR", os.path.join(os.getcwd(), 'sessions'))
+# Максимальний вік стану (год.) і за скільки хвилин до закінчення auth-cookies оновлювати його у фоні
+SESSION_MAX_AGE = float(os.getenv("SESSION_MAX_AGE", 12))
+SESSION_REFRESH_MARGIN = float(os.getenv("SESSION_REFRESH_MARGIN", 30))
+SESSION_CHECK_INTERVAL = float(os.getenv("SESSION_CHECK_INTERVAL", 60))
+SESSION_AUTH_COOKIES = tuple(name.strip() for name in os.getenv("SESSION_AUTH_COOKIES", "access_token,refresh_token")
+                             .split(",") if name.strip())
+# Після невдалого оновлення стану (логіну) наступна спроба - через SESSION_LOGIN_BACKOFF хв.,
+# пауза подвоюється з кожною невдачею поспіль до SESSION_LOGIN_MAX_BACKOFF хв.
+SESSION_LOGIN_BACKOFF = float(os.getenv("SESSION_LOGIN_BACKOFF", 5))
+SESSION_LOGIN_MAX_BACKOFF = float(os.getenv("SESSION_LOGIN_MAX_BACKOFF", 360))
+
+COOKIES_BUTTON_SELECTOR = 'div.css-e661z2 > button[data-cy="dismiss-cookies-overlay"]'
+MYOLX_LINK_SELECTOR = 'div.css-zs6l2q > a[data-cy="myolx-link"]'
+LOGIN_SUBMIT_SELECTOR = 'button[data-testid="login-submit-button"]'
+
+
+async def dismiss_cookies(page: Page, timeout: float = 5000) -> bool:
+    """
+    Закриває вікно згоди на cookies, якщо воно з'явилося за timeout (мс). Повертає True, якщо кнопку натиснуто.
+    """
+    # timeout=0 у Playwright означає "без обмеження"
+    if timeout <= 0:
+        return False
+    try:
+        with span("cookies"):
+            button = await page.wait_for_selector(COOKIES_BUTTON_SELECTOR, timeout=timeout)
+            await button.click()
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+class SessionManager:
+    """
+    Стан сесії OLX, спільний для всіх контекстів BrowserPool (і для процесів worker.py - через файл).
+    Логін і закриття вікна cookies виконуються один раз в окремому контексті, результат (storage_state)
+    зберігається на диск і підставляється в кожен новий контекст пулу.
+    Без облікових даних зберігається лише згода на cookies.
+    Фонова задача оновлює стан до закінчення auth-cookies або SESSION_MAX_AGE; invalidate() - примусово.
+    Невдалі оновлення записуються поруч зі станом (<account>.failures.json, спільно для всіх процесів):
+    до кінця експоненційної паузи нові спроби логіну не робляться.
+    """
+
+    def __init__(self, email: str | None, password: str | None, link: str, state_dir: str = SESSION_DIR,
+                 max_age: float = SESSION_MAX_AGE, refresh_margin: float = SESSION_REFRESH_MARGIN,
+                 check_interval: float = SESSION_CHECK_INTERVAL, backoff: float = SESSION_LOGIN_BACKOFF,
+                 max_backoff: float = SESSION_LOGIN_MAX_BACKOFF):
+        self.email = email
+        self.password = password
+        self.link = link
+        self.max_age = max_age * 3600
+        self.refresh_margin = refresh_margin * 60
+        self.check_interval = check_interval
+        self.backoff = backoff * 60
+        self.max_backoff = max_backoff * 60
+        account = hashlib.sha1(email.encode()).hexdigest()[:12] if email else "anonymous"
+        self.path = os.path.join(state_dir, f"{account}.json")
+        self.failures_path = os.path.join(state_dir, f"{account}.failures.json")
+        self.state: dict | None = None
+        self._mtime: float | None = None
+        self._invalid = False
+        self._browser: Browser | None = None
+        self._lock = asyncio.Lock()
+        self._refresher: asyncio.Task | None = None
+        self._pending: asyncio.Task | None = None
+        os.makedirs(state_dir, exist_ok=True)
+
+    @property
+    def authenticated(self) -> bool:
+        return bool(self.email and self.password)
+
+    def _load(self) -> None:
+        """
+        Перечитує файл стану, якщо його оновив інший процес.
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as state_file:
+                self.state = json.load(state_file)
+            self._mtime = mtime
+            self._invalid = False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Сесія: не вдалося прочитати {self.path}: {e}")
+
+    def _save(self, state: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            json.dump(state, tmp_file)
+        os.replace(tmp_path, self.path)
+        self.state = state
+        self._mtime = os.path.getmtime(self.path)
+        self._invalid = False
+
+    def _failures(self) -> tuple[int, float]:
+        """
+        Кількість невдалих оновлень поспіль і момент (unix time), до якого нові спроби не робляться.
+        """
+        try:
+            with open(self.failures_path, encoding="utf-8") as failures_file:
+                data = json.load(failures_file)
+            return int(data["failures"]), float(data["retry_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, 0.0
+
+    def _record_failure(self) -> None:
+        failures = self._failures()[0] + 1
+        delay = min(self.max_backoff, self.backoff * 2 ** (failures - 1))
+        try:
+            with open(self.failures_path, "w", encoding="utf-8") as failures_file:
+                json.dump({"failures": failures, "retry_at": time.time() + delay}, failures_file)
+        except OSError as e:
+            logger.warning(f"Сесія: не вдалося записати {self.failures_path}: {e}")
+        logger.warning(f"Сесія: невдала спроба №{failures} поспіль, наступна через {delay / 60:.0f} хв.",
+                       extra={'custom_color': True})
+
+    def _clear_failures(self) -> None:
+        try:
+            os.remove(self.failures_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Сесія: не вдалося видалити {self.failures_path}: {e}")
+
+    def expires_at(self) -> float | None:
+        """
+        Момент (unix time), після якого стан вважається простроченим: SESSION_MAX_AGE від збереження
+        або найраніше закінчення auth-cookies.
+        """
+        if self.state is None or self._mtime is None:
+            return None
+        deadline = self._mtime + self.max_age
+        for cookie in self.state.get("cookies", ()):
+            if cookie.get("name") in SESSION_AUTH_COOKIES and cookie.get("expires", -1) > 0:
+                deadline = min(deadline, cookie["expires"])
+        return deadline
+
+    def needs_refresh(self) -> bool:
+        self._load()
+        # Після невдалого логіну - пауза, інакше кожен старт пулу і кожна перевірка логінилися б знову
+        if time.time() < self._failures()[1]:
+            return False
+        if self._invalid:
+            return True
+        expires_at = self.expires_at()
+        return expires_at is None or expires_at - self.refresh_margin <= time.time()
+
+    def context_options(self) -> dict:
+        """
+        Параметри для BrowserContext: storage_state, якщо стан уже є.
+        """
+        self._load()
+        return {"storage_state": self.state} if self.state else {}
+
+    def invalidate(self) -> None:
+        """
+        Стан більше не дійсний (наприклад, OLX попросив увійти) - оновити у фоні, не чекаючи закінчення строку.
+        """
+        self._invalid = True
+        if self._refresher and not self._lock.locked():
+            self._pending = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> None:
+        """
+        Створює новий стан в окремому контексті. Поки він створюється, пул працює зі старим.
+        """
+        async with self._lock:
+            # Поки чекали на lock, стан міг оновити інший виклик або інший процес, а пул - закритися
+            if self._browser is None or not self.needs_refresh():
+                return
+            start_time = time.monotonic()
+            context = await self._browser.new_context(user_agent=random.choice(USER_AGENTS))
+            context.set_default_timeout(PAGE_NAVIGATION_TIMEOUT)
+            try:
+                page = await context.new_page()
+                with span("session_login"):
+                    await page.goto(self.link, wait_until="domcontentloaded")
+                    await dismiss_cookies(page)
+                    if self.authenticated:
+                        if self.state is None:
+                            # Хоча б згода на cookies: якщо логін не вдасться, наступні прогони не чекатимуть на нього.
+                            # Стан одразу прострочений, тож логін повториться у фоні
+                            self._save(await context.storage_state())
+                            os.utime(self.path, (0, 0))
+                            self._mtime = 0.0
+                        await self._login(page)
+                self._save(await context.storage_state())
+                self._clear_failures()
+                logger.info(f"Сесія: стан оновлено за {time.monotonic() - start_time:.2f} сек. "
+                            f"({'з логіном' if self.authenticated else 'лише cookies'})",
+                            extra={'custom_color': True})
+            except Exception as e:
+                logger.error(f"Сесія: не вдалося оновити стан: {e}")
+                self._record_failure()
+            finally:
+                await context.close()
+
+    async def _login(self, page: Page) -> None:
+        """
+        Авторизація: усі очікування - на елементи і перехід, без фіксованих пауз.
+        """
+        await page.click(MYOLX_LINK_SELECTOR)
+        await page.fill("input[name='username']", self.email)
+        await page.fill("input[name='password']", self.password)
+        await page.click(LOGIN_SUBMIT_SELECTOR)
+        # Після успішного входу форма зникає (перехід назад на сайт)
+        await page.wait_for_selector(LOGIN_SUBMIT_SELECTOR, state="detached", timeout=30000)
+        await page.wait_for_load_state("domcontentloaded")
+        logger.info(f"{self.email} ==> Авторизація пройшла успішно!", extra={'custom_color': True})
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if self.needs_refresh():
+                await self.refresh()
+
+    async def start(self, browser: Browser) -> "SessionManager":
+        """
+        Готує стан до першої сторінки пулу і запускає фонове оновлення.
+        Чекає лише коли збереженого стану ще немає; прострочений стан використовується, поки оновлюється у фоні.
+        """
+        self._browser = browser
+        self._load()
+        if self.state is None:
+            await self.refresh()
+        elif self.needs_refresh():
+            self._pending = asyncio.create_task(self.refresh())
+        self._refresher = asyncio.create_task(self._refresh_loop())
+        return self
+
+    async def close(self) -> None:
+        if self._refresher:
+            self._refresher.cancel()
+            self._refresher = None
+        # Оновлення, що вже йде, має завершитися до закриття браузера
+        async with self._lock:
+            self._browser = None
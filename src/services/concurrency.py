@@ -0,0 +1,135 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from src.services.metrics import CONCURRENCY_LIMIT
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+# Результати, які означають, що сайт почав нас обмежувати
+THROTTLE_OUTCOMES = {"timeout", "blocked"}
+
+
+class AdaptiveLimiter:
+    """
+    AIMD-обмежувач кількості одночасних воркерів.
+    Ліміт зростає на 1 після кожного "здорового" вікна (p95 і частка помилок у нормі)
+    і множиться на decrease_factor при таймаутах/блокуваннях (429/403/captcha) або поганому вікні.
+    """
+
+    def __init__(self, min_limit: int = 1, max_limit: int = 10, initial: int = 3, window: int = 20,
+                 target_p95: float = 10.0, max_error_rate: float = 0.2, decrease_factor: float = 0.5,
+                 cooldown: float = 10.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial, max_limit))
+        CONCURRENCY_LIMIT.set(self.limit)
+        self.window = window
+        self.target_p95 = target_p95
+        self.max_error_rate = max_error_rate
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+
+        self.active = 0
+        self._samples: deque[tuple[float, bool]] = deque(maxlen=window)
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Чекає, поки кількість активних воркерів стане меншою за поточний ліміт.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.active -= 1
+                self._condition.notify_all()
+
+    def p95(self) -> float | None:
+        if not self._samples:
+            return None
+        latencies = sorted(latency for latency, _ in self._samples)
+        return latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+
+    def error_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def _set_limit(self, limit: int, reason: str) -> None:
+        limit = max(self.min_limit, min(limit, self.max_limit))
+        if limit != self.limit:
+            logger.info(f"AdaptiveLimiter: {self.limit} -> {limit} ({reason})")
+            self.limit = limit
+            CONCURRENCY_LIMIT.set(limit)
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._samples.clear()
+        self._set_limit(int(self.limit * self.decrease_factor), reason)
+
+    async def record(self, latency: float, outcome: str) -> None:
+        """
+        Фіксує результат однієї спроби: ok або клас помилки з resilience (timeout | blocked | navigation | ...).
+        """
+        if outcome in THROTTLE_OUTCOMES:
+            self._decrease(outcome)
+        else:
+            self._samples.append((latency, outcome == "ok"))
+
+            if len(self._samples) >= self.window:
+                p95, error_rate = self.p95(), self.error_rate()
+                if p95 > self.target_p95 or error_rate > self.max_error_rate:
+                    self._decrease(f"p95={p95:.1f}s, errors={error_rate:.0%}")
+                elif time.monotonic() - self._last_decrease >= self.cooldown:
+                    self._samples.clear()
+                    self._set_limit(self.limit + 1, f"p95={p95:.1f}s, errors={error_rate:.0%}")
+
+        async with self._condition:
+            self._condition.notify_all()
+
+    def snapshot(self) -> dict:
+        p95 = self.p95()
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "p95": round(p95, 2) if p95 is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+        }
+
+
+class TokenBucket:
+    """
+    Обмеження частоти: rate дозволів за секунду з запасом не більше capacity (короткий сплеск).
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Чекає на вільний дозвіл. Очікувачі обслуговуються по черзі.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
@@ -0,0 +1,87 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from datetime import timedelta
+
+from src.repository import frontier
+from src.services.pipeline import new_limiter, playwright_async_run
+from src.utils.py_logger import get_logger, run_id_var
+
+logger = get_logger(__name__)
+
+
+class CrawlCoordinator:
+    """
+    Координує щохвилинні прогони: не допускає накладання, повертає в чергу завислі посилання з crawl_queue
+    і передає high-water mark (ID оголошень попереднього проходу) для інкрементального обходу.
+    Якщо в crawl_queue накопичилось більше discovery_threshold посилань (наприклад, після перезапуску),
+    тік лише дообробляє чергу, не обходячи сторінки списку.
+    scrape_details=False - координатор лише наповнює crawl_queue, сторінки товарів обробляють процеси worker.py.
+    Обмежувач паралельності живе весь час роботи координатора: AIMD-ліміт не скидається на кожному тіку.
+    """
+
+    def __init__(self, email, password, link, budget: float = 60, reserve: float = 10, history: int = 60,
+                 discovery_threshold: int = 100, lease: timedelta = timedelta(minutes=10),
+                 scrape_details: bool = True):
+        self.email = email
+        self.password = password
+        self.link = link
+        self.budget = budget
+        self.reserve = reserve
+        self.discovery_threshold = discovery_threshold
+        self.lease = lease
+        self.scrape_details = scrape_details
+        self.limiter = new_limiter()
+        self.high_water: set[str] = set()
+        self.durations: deque[float] = deque(maxlen=history)
+        self.skipped_ticks = 0
+        self._lock = asyncio.Lock()
+
+    def p95(self) -> float | None:
+        if not self.durations:
+            return None
+        durations = sorted(self.durations)
+        return durations[min(int(len(durations) * 0.95), len(durations) - 1)]
+
+    async def tick(self) -> None:
+        """
+        Один тік планувальника. Якщо попередній прогін ще триває - тік пропускається (coalesce).
+        """
+        if self._lock.locked():
+            self.skipped_ticks += 1
+            logger.warning(f"Попередній прогін ще триває, тік пропущено (всього пропущено: {self.skipped_ticks})")
+            return
+
+        async with self._lock:
+            start_time = time.monotonic()
+            run_id_var.set(uuid.uuid4().hex[:12])
+            leftover = 0
+
+            try:
+                await frontier.requeue_stale(self.lease)
+                backlog = await frontier.pending_count()
+                discover = backlog < self.discovery_threshold or not self.scrape_details
+                if not discover:
+                    logger.info(f"У crawl_queue {backlog} посилань - лише дообробка черги без обходу списку")
+
+                stats = await playwright_async_run(
+                    self.email, self.password, self.link,
+                    discover=discover,
+                    scrape_details=self.scrape_details,
+                    high_water=self.high_water,
+                    deadline=start_time + self.budget - self.reserve,
+                    limiter=self.limiter,
+                )
+                leftover = len(stats.leftover)
+                self.high_water = stats.seen_ids or self.high_water
+            except Exception as e:
+                logger.error(f"Прогін завершився з помилкою: {e}", exc_info=True)
+
+            duration = time.monotonic() - start_time
+            self.durations.append(duration)
+
+            within = "в межах" if duration <= self.budget else "ПОЗА межами"
+            logger.info(f"Прогін: {duration:.2f} сек. ({within} бюджету {self.budget:.0f} сек.), "
+                        f"p95 за останні {len(self.durations)}: {self.p95():.2f} сек., "
+                        f"повернуто в чергу на наступний тік: {leftover}", extra={'custom_color': True})
@@ -0,0 +1,212 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from playwright.async_api import Page
+from selectolax.lexbor import LexborHTMLParser
+
+from src.utils.py_logger import get_logger
+from src.utils.waits import LAZY_WAIT_TIMEOUT, PageBudget, wait_for_lazy
+
+logger = get_logger(__name__)
+
+
+def to_digits(value: str | None) -> str | None:
+    """
+    Залишає перше число з тексту ("ID: 123" -> "123", "Переглядів: 1 234" -> "1234").
+    """
+    match = re.search(r'\d[\d\s\u00a0\u202f]*', value or "")
+    return re.sub(r'\D', '', match.group()) if match else None
+
+
+def join_images(urls: list | None) -> str:
+    return ", ".join(src for src in urls or () if src)
+
+
+def parse_attributes(items: list | None) -> dict:
+    """
+    Перший елемент списку - тип товару, решта - пари "Ключ: значення".
+    """
+    texts = [text.strip() for text in items or () if text]
+    info = {}
+    for text in texts[1:]:
+        if ":" in text:
+            key, value = map(str.strip, text.split(":", 1))
+            info[key] = value
+    return {"type_item": texts[0] if texts else None, "info": info}
+
+
+def yes_no(exists: bool | None) -> str:
+    return "YES" if exists else "NO"
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    Опис одного поля: куди записати, звідки взяти і як обробити.
+
+    kind: text | attr | text_all | attr_all | exists
+    lazy: поле підвантажується при скролі, тому при відсутності чекаємо його через wait_for_lazy.
+    anchor: елемент поруч з lazy-полем, до якого прокрутити одразу; xhr: частина URL запиту з даними поля.
+    expand: post повертає dict, який розгортається в групу замість одного поля.
+    """
+    group: str
+    name: str
+    selector: str
+    kind: str = "text"
+    attr: str | None = None
+    post: Callable[[Any], Any] | None = None
+    lazy: bool = False
+    expand: bool = False
+    anchor: str | None = None
+    xhr: str | None = None
+
+
+FIELD_SPEC: tuple[Field, ...] = (
+    # Продавець
+    Field("seller", "name", 'h4[class="css-1lcz6o7"]'),
+    Field("seller", "profile_url", 'a[data-testid="user-profile-link"]', kind="attr", attr="href"),
+    Field("seller", "rating", 'p[class="css-9pgvpt"]'),
+    Field("seller", "registered_date", 'p[class="css-23d1vy"]'),
+    Field("seller", "last_active_date", 'span[class="css-1p85e15"]'),
+    Field("seller", "location", 'p[class="css-1cju8pu"]'),
+    Field("seller", "region", 'div.css-13l8eec p.css-b5m1rv'),
+    # Товар
+    Field("product", "date_published", 'span[class="css-19yf5ek"]'),
+    Field("product", "title", 'h4[class="css-1kc83jo"]'),
+    Field("product", "price", 'h3[class="css-90xrc0"]'),
+    Field("product", "description", 'div[class="css-1o924a9"]'),
+    Field("product", "site_id", 'span[class="css-12hdxwj"]', post=to_digits),
+    Field("product", "views_count", 'span[data-testid="page-view-counter"]', post=to_digits, lazy=True,
+          anchor='span[class="css-12hdxwj"]', xhr="/page-views/"),
+    Field("product", "images", 'div.swiper-wrapper div.swiper-zoom-container img', kind="attr_all", attr="src",
+          post=join_images),
+    Field("product", "attributes", 'ul.css-rn93um > li.css-1r0si1e > p.css-b5m1rv', kind="text_all",
+          post=parse_attributes, expand=True),
+    Field("product", "olx_delivery", 'ul.css-rn93um > div[data-testid="courier-btn"]', kind="exists", post=yes_no),
+)
+
+# Поля, які є на кожній сторінці товару
+REQUIRED_FIELDS = {("product", "title"), ("product", "site_id")}
+
+# Всі поля за один виклик page.evaluate
+_EXTRACT_JS = """
+(specs) => specs.map(([selector, kind, attr]) => {
+    if (kind === 'exists') return document.querySelector(selector) !== null;
+    if (kind === 'text_all') return Array.from(document.querySelectorAll(selector), el => el.textContent);
+    if (kind === 'attr_all') return Array.from(document.querySelectorAll(selector), el => el.getAttribute(attr));
+    const el = document.querySelector(selector);
+    if (!el) return null;
+    return kind === 'attr' ? el.getAttribute(attr) : el.textContent;
+})
+"""
+
+
+def build_record(raw_values: list, spec: tuple[Field, ...] = FIELD_SPEC) -> dict:
+    """
+    Перетворює сирі значення (в порядку spec) на структурований запис {"seller": {...}, "product": {...}}.
+    """
+    record = {}
+    for field, value in zip(spec, raw_values):
+        if isinstance(value, str):
+            value = value.strip()
+        if field.post:
+            value = field.post(value)
+
+        group = record.setdefault(field.group, {})
+        if field.expand:
+            group.update(value)
+        else:
+            group[field.name] = value
+    return record
+
+
+def split_spec(groups: set[str], spec: tuple[Field, ...] = FIELD_SPEC) -> tuple[tuple[Field, ...], tuple[Field, ...]]:
+    """
+    Ділить spec на поля для HTTP-рушія (групи з groups, крім lazy) і поля, які потребують браузера.
+    """
+    http_spec = tuple(f for f in spec if f.group in groups and not f.lazy)
+    browser_spec = tuple(f for f in spec if f not in http_spec)
+    return http_spec, browser_spec
+
+
+def missing_fields(record: dict | None, spec: tuple[Field, ...] = FIELD_SPEC) -> list[str]:
+    """
+    Обов'язкові поля зі spec, яких немає в записі: без них сторінка вважається не відрендереною.
+    """
+    return [f"{field.group}.{field.name}" for field in spec if (field.group, field.name) in REQUIRED_FIELDS
+            and not (record or {}).get(field.group, {}).get(field.name)]
+
+
+def extract_record_from_html(html: str, spec: tuple[Field, ...] = FIELD_SPEC) -> dict:
+    """
+    Ті самі поля зі spec, але з готового HTML (без браузера).
+    """
+    tree = LexborHTMLParser(html)
+    raw_values = []
+
+    for field in spec:
+        if field.kind == "exists":
+            raw_values.append(tree.css_first(field.selector) is not None)
+        elif field.kind == "text_all":
+            raw_values.append([node.text() for node in tree.css(field.selector)])
+        elif field.kind == "attr_all":
+            raw_values.append([node.attributes.get(field.attr) for node in tree.css(field.selector)])
+        else:
+            node = tree.css_first(field.selector)
+            if node is None:
+                raw_values.append(None)
+            else:
+                raw_values.append(node.attributes.get(field.attr) if field.kind == "attr" else node.text())
+
+    return build_record(raw_values, spec)
+
+
+async def _raw_value_fallback(page: Page, field: Field, budget: PageBudget | None = None):
+    """
+    Повільний шлях: одне поле через окремі запити Playwright.
+    """
+    if field.kind == "exists":
+        return await page.query_selector(field.selector) is not None
+
+    if field.kind in ("text_all", "attr_all"):
+        elements = await page.query_selector_all(field.selector)
+        if field.kind == "text_all":
+            return [await el.text_content() for el in elements]
+        return [await el.get_attribute(field.attr) for el in elements]
+
+    if field.lazy:
+        timeout = budget.timeout(LAZY_WAIT_TIMEOUT) if budget else LAZY_WAIT_TIMEOUT
+        element = await wait_for_lazy(page, field.selector, field.anchor, field.xhr, timeout)
+    else:
+        element = await page.query_selector(field.selector)
+    if not element:
+        return None
+    return await element.get_attribute(field.attr) if field.kind == "attr" else await element.text_content()
+
+
+async def extract_record(page: Page, spec: tuple[Field, ...] = FIELD_SPEC, budget: PageBudget | None = None) -> dict:
+    """
+    Витягує всі поля зі spec за один roundtrip. Відсутні lazy-поля та помилки evaluate
+    обробляються запасним шляхом по одному полю; очікування lazy-полів обмежене залишком budget.
+    """
+    try:
+        raw_values = await page.evaluate(_EXTRACT_JS, [[f.selector, f.kind, f.attr] for f in spec])
+    except Exception as e:
+        logger.warning(f"Single-roundtrip extraction failed, fallback per field: {e}")
+        raw_values = [None] * len(spec)
+        for index, field in enumerate(spec):
+            try:
+                raw_values[index] = await _raw_value_fallback(page, field, budget)
+            except Exception as err:
+                logger.error(f"Error extracting '{field.name}' from selector '{field.selector}': {err}")
+        return build_record(raw_values, spec)
+
+    for index, field in enumerate(spec):
+        if field.lazy and raw_values[index] is None:
+            try:
+                raw_values[index] = await _raw_value_fallback(page, field, budget)
+            except Exception as e:
+                logger.error(f"Error extracting '{field.name}' from selector '{field.selector}': {e}")
+
+    return build_record(raw_values, spec)
@@ -0,0 +1,54 @@
+import random
+
+import aiohttp
+
+from src.services.extraction import FIELD_SPEC, Field, extract_record_from_html
+from src.services.metrics import span
+from src.utils.info import USER_AGENTS
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class HttpScraper:
+    """
+    Рушій скрапінгу без браузера: aiohttp з пулом з'єднань і keep-alive + selectolax.
+    Повертає дані у тому ж форматі, що й PlaywrightAsyncRunner.data.
+    """
+
+    def __init__(self, limit: int = 20, keepalive_timeout: float = 30, timeout: float = 15):
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "HttpScraper":
+        connector = aiohttp.TCPConnector(limit=self.limit, keepalive_timeout=self.keepalive_timeout)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": random.choice(USER_AGENTS), "Accept-Language": "uk-UA,uk;q=0.9"},
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self.session:
+            await self.session.close()
+
+    async def fetch_html(self, url: str) -> str:
+        async with self.session.get(url) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def fetch_record(self, url: str, spec: tuple[Field, ...] = FIELD_SPEC) -> dict | None:
+        """
+        Завантажує сторінку товару і витягує поля зі spec.
+        """
+        try:
+            with span("http_fetch"):
+                html = await self.fetch_html(url)
+            with span("http_extract"):
+                return extract_record_from_html(html, spec)
+        except Exception as e:
+            logger.error(f"HTTP: помилка при завантаженні {url}: {e}")
+            return None
@@ -0,0 +1,125 @@
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Page, Request, Route
+
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "criteo.com",
+    "criteo.net",
+    "adnxs.com",
+    "rubiconproject.com",
+    "pubmatic.com",
+    "onetrust.com",
+    "cookielaw.org",
+    "ninjacat.io",
+    "braze.com",
+)
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """
+    Профіль завантаження сторінок: які запити переривати і до якої події чекати в goto.
+    """
+    blocked_resource_types: frozenset[str] = DEFAULT_BLOCKED_RESOURCE_TYPES
+    blocked_domains: tuple[str, ...] = DEFAULT_BLOCKED_DOMAINS
+    wait_until: str = "domcontentloaded"
+
+    def is_blocked(self, request: Request) -> bool:
+        if request.resource_type in self.blocked_resource_types:
+            return True
+        host = urlsplit(request.url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains)
+
+
+# Повне завантаження без блокувань - як було до профілів
+FULL_PROFILE = LoadProfile(blocked_resource_types=frozenset(), blocked_domains=(), wait_until="load")
+
+
+@dataclass
+class TrafficStats:
+    """
+    Трафік і час завантаження сторінок за прогін.
+    """
+    pages: int = 0
+    bytes: int = 0
+    blocked: int = 0
+    load_time: float = 0.0
+    started_at: float = field(default_factory=time.time)
+
+    def reset(self) -> None:
+        self.pages = self.bytes = self.blocked = 0
+        self.load_time = 0.0
+        self.started_at = time.time()
+
+    def summary(self) -> str:
+        pages = self.pages or 1
+        return (f"сторінок: {self.pages}, трафік: {self.bytes / 1024 / 1024:.1f} МБ "
+                f"({self.bytes / pages / 1024:.0f} КБ/стор.), заблоковано запитів: {self.blocked}, "
+                f"середній час завантаження: {self.load_time / pages:.2f} сек.")
+
+
+traffic_stats = TrafficStats()
+
+
+async def install_request_blocking(context: BrowserContext, profile: LoadProfile) -> None:
+    """
+    Перериває запити до зображень, медіа, шрифтів, аналітики та реклами на рівні контексту.
+    """
+    if not profile.blocked_resource_types and not profile.blocked_domains:
+        return
+
+    async def handle(route: Route) -> None:
+        if profile.is_blocked(route.request):
+            traffic_stats.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
+
+
+class PageTraffic:
+    """
+    Рахує байти, отримані сторінкою (заголовки + тіло відповіді), і час goto.
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.bytes = 0
+        self.load_time = 0.0
+        page.on("requestfinished", self._on_request_finished)
+
+    async def _on_request_finished(self, request: Request) -> None:
+        try:
+            sizes = await request.sizes()
+            self.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:
+            pass
+
+    async def goto(self, url: str, wait_until: str):
+        start_time = time.monotonic()
+        response = await self.page.goto(url, wait_until=wait_until)
+        self.load_time = time.monotonic() - start_time
+        return response
+
+    def report(self) -> None:
+        traffic_stats.pages += 1
+        traffic_stats.bytes += self.bytes
+        traffic_stats.load_time += self.load_time
+        logger.debug(f"{self.page.url}: {self.bytes / 1024:.0f} КБ, завантаження {self.load_time:.2f} сек.")
@@ -0,0 +1,140 @@
+import os
+import time
+from collections import Counter as StageCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+load_dotenv()
+
+# Порт /metrics (0 - вимкнено); процеси worker.py займають наступні порти
+METRICS_PORT = int(os.getenv("METRICS_PORT", 8001))
+
+STAGE_SECONDS = Histogram(
+    "olx_stage_seconds", "Тривалість етапів скрапінгу", ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 34, 60),
+)
+STAGE_FAILURES = Counter("olx_stage_failures_total", "Помилки за етапами", ["stage"])
+PAGES = Counter("olx_product_pages_total", "Оброблені сторінки товарів за результатом", ["outcome"])
+QUEUE_DEPTH = Gauge("olx_queue_depth", "Кількість елементів у чергах конвеєра", ["queue"])
+ACTIVE_BROWSERS = Gauge("olx_active_browsers", "Запущені браузери")
+ACTIVE_PAGES = Gauge("olx_active_pages", "Відкриті сторінки пулу")
+CONCURRENCY_LIMIT = Gauge("olx_concurrency_limit", "Поточний ліміт паралельності AdaptiveLimiter")
+RETRIES = Counter("olx_retries_total", "Повтори спроб за класом помилки", ["error"])
+DB_POOL = Gauge("olx_db_pool_connections", "З'єднання пулу БД: size, checked_out, checked_in, overflow", ["state"])
+DB_POOL_TIMEOUTS = Counter("olx_db_pool_timeouts_total", "Очікування вільного з'єднання довше DB_POOL_TIMEOUT")
+CIRCUIT_STATE = Gauge("olx_circuit_state", "Запобіжник: 0 - закритий, 1 - пауза, 2 - пробна спроба")
+
+
+class RunSummary:
+    """
+    Тривалості і помилки етапів за один прогін - для підсумку в лог.
+    Поточний підсумок - у run_summary_var: його бачать лише задачі, запущені прогоном (start_run_summary),
+    тож фонові етапи (повторні відвідування, телефони) не потрапляють у підсумок скрапінгу.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.started_at = time.monotonic()
+        self.durations: dict[str, list[float]] = {}
+        self.failures: StageCounter[str] = StageCounter()
+        self.pages: StageCounter[str] = StageCounter()
+        self.retries: StageCounter[str] = StageCounter()
+
+    def add(self, stage: str, duration: float, failed: bool) -> None:
+        self.durations.setdefault(stage, []).append(duration)
+        if failed:
+            self.failures[stage] += 1
+
+    @staticmethod
+    def _quantile(values: list[float], q: float) -> float:
+        return values[min(int(len(values) * q), len(values) - 1)]
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started_at
+        pages = sum(self.pages.values())
+        lines = [f"сторінок товарів: {pages} ({pages / elapsed if elapsed else 0:.2f}/сек.), "
+                 f"результати: {dict(self.pages)}, повтори: {dict(self.retries)}"]
+        for stage, durations in sorted(self.durations.items(), key=lambda item: -sum(item[1])):
+            values = sorted(durations)
+            lines.append(f"{stage:<16} n={len(values):<5} p50={self._quantile(values, 0.5):.3f} "
+                         f"p95={self._quantile(values, 0.95):.3f} max={values[-1]:.3f} "
+                         f"сума={sum(values):.2f} сек. помилок={self.failures[stage]}")
+        return "\n".join(lines)
+
+    def log(self) -> None:
+        logger.info(f"Підсумок етапів прогону:\n{self.summary()}", extra={'custom_color': True})
+
+
+run_summary_var: ContextVar[RunSummary | None] = ContextVar("run_summary", default=None)
+
+
+def start_run_summary() -> RunSummary:
+    """
+    Новий підсумок для поточного прогону і задач, які він створить далі.
+    """
+    summary = RunSummary()
+    run_summary_var.set(summary)
+    return summary
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Вимірює тривалість блоку (у т.ч. з await усередині): гістограма olx_stage_seconds + підсумок прогону.
+    Виняток, що вийшов з блоку, рахується як помилка етапу і прокидається далі.
+    """
+    start_time = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        STAGE_FAILURES.labels(stage).inc()
+        raise
+    finally:
+        duration = time.perf_counter() - start_time
+        STAGE_SECONDS.labels(stage).observe(duration)
+        if summary := run_summary_var.get():
+            summary.add(stage, duration, failed)
+
+
+def record_failure(stage: str) -> None:
+    """
+    Помилка етапу, яка не вийшла винятком зі span (функція повернула None).
+    """
+    STAGE_FAILURES.labels(stage).inc()
+    if summary := run_summary_var.get():
+        summary.failures[stage] += 1
+
+
+def record_page(outcome: str) -> None:
+    PAGES.labels(outcome).inc()
+    if summary := run_summary_var.get():
+        summary.pages[outcome] += 1
+
+
+def record_retry(error: str) -> None:
+    RETRIES.labels(error).inc()
+    if summary := run_summary_var.get():
+        summary.retries[error] += 1
+
+
+def start_metrics_server(port: int = METRICS_PORT) -> None:
+    """
+    Піднімає /metrics у фоновому потоці. port=0 вимикає ендпоінт.
+    """
+    if not port:
+        return
+    try:
+        start_http_server(port)
+        logger.info(f"Метрики Prometheus: http://localhost:{port}/metrics")
+    except OSError as e:
+        logger.warning(f"Не вдалося запустити /metrics на порту {port}: {e}")
@@ -0,0 +1,174 @@
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from zoneinfo import ZoneInfo
+
+KYIV_TZ = ZoneInfo("Europe/Kiev")
+
+# Основи назв місяців (укр. і рос.) - підходять і для називного, і для родового відмінка
+MONTH_STEMS = (
+    (1, ("січ", "янв")),
+    (2, ("лют", "фев")),
+    (3, ("берез", "март", "мар")),
+    (4, ("квіт", "апр")),
+    (5, ("трав", "ма")),
+    (6, ("черв", "июн")),
+    (7, ("лип", "июл")),
+    (8, ("серп", "авг")),
+    (9, ("верес", "сен")),
+    (10, ("жовт", "окт")),
+    (11, ("листоп", "ноя")),
+    (12, ("груд", "дек")),
+)
+
+CURRENCIES = {
+    "грн": "UAH",
+    "₴": "UAH",
+    "$": "USD",
+    "у.о": "USD",
+    "€": "EUR",
+}
+
+NEGOTIABLE_MARKERS = ("договірна", "договорная")
+FREE_MARKERS = ("безкоштовно", "бесплатно", "віддам безкоштовно")
+
+_NUMBER_RE = re.compile(r"\d[\d\s  ]*(?:[.,]\d+)?")
+_TIME_RE = re.compile(r"(\d{1,2}):(\d{2})")
+_DATE_RE = re.compile(r"(?:(\d{1,2})\s+)?([^\W\d_]+)\.?\s+(\d{4})")
+_YEAR_RE = re.compile(r"\b(\d{4})\b")
+_AGO_RE = re.compile(r"(\d+)\s*(хв|мин|год|час|дн|ден|тиж|нед)\w*\.?\s+(?:тому|назад)")
+_AGO_UNITS = {
+    "хв": "minutes", "мин": "minutes",
+    "год": "hours", "час": "hours",
+    "дн": "days", "ден": "days",
+    "тиж": "weeks", "нед": "weeks",
+}
+
+
+def kyiv_now() -> datetime:
+    """
+    Поточний час за Києвом без tzinfo (у БД всі DateTime зберігаються як локальний час).
+    """
+    return datetime.now(KYIV_TZ).replace(tzinfo=None)
+
+
+def parse_int(value: str | None) -> int | None:
+    """
+    Ціле число з тексту з урахуванням розділювачів тисяч ("Переглядів: 1 234" -> 1234).
+    """
+    match = _NUMBER_RE.search(value or "")
+    if not match:
+        return None
+    digits = re.sub(r"\D", "", match.group().split(",")[0].split(".")[0])
+    return int(digits) if digits else None
+
+
+def parse_price(value: str | None) -> tuple[Decimal | None, str | None, bool]:
+    """
+    Розбирає ціну OLX: "12 500 грн.Договірна" -> (Decimal("12500"), "UAH", True).
+    "Безкоштовно" -> (0, None, False); "Обмін" та порожнє значення -> (None, None, False).
+    """
+    text = (value or "").lower()
+    negotiable = any(marker in text for marker in NEGOTIABLE_MARKERS)
+
+    if any(marker in text for marker in FREE_MARKERS):
+        return Decimal(0), None, negotiable
+
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None, None, negotiable
+
+    number = re.sub(r"[\s  ]", "", match.group()).replace(",", ".")
+    try:
+        amount = Decimal(number)
+    except InvalidOperation:
+        return None, None, negotiable
+
+    currency = next((code for marker, code in CURRENCIES.items() if marker in text), None)
+    return amount, currency, negotiable
+
+
+def _month(word: str) -> int | None:
+    word = word.lower()
+    for month, stems in MONTH_STEMS:
+        if any(word.startswith(stem) for stem in stems):
+            return month
+    return None
+
+
+def _with_time(day: datetime, text: str) -> datetime:
+    match = _TIME_RE.search(text)
+    if not match:
+        return day
+    return day.replace(hour=int(match.group(1)), minute=int(match.group(2)))
+
+
+def parse_olx_date(value: str | None, now: datetime | None = None) -> datetime | None:
+    """
+    Дата з тексту OLX у локальному часі Києва:
+    "Сьогодні о 12:30", "Вчора о 08:05", "5 хв тому", "17 жовтня 2024 р.", "На OLX з лютий 2019 р.",
+    "Онлайн в 10:15". Для дат без дня береться перше число місяця (або 1 січня, якщо є лише рік).
+    now - момент, відносно якого розбираються "сьогодні/вчора/... тому" (для бекфілу - час запису рядка).
+    """
+    text = (value or "").strip().lower()
+    if not text:
+        return None
+
+    now = now or kyiv_now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if "сьогодні" in text or "сегодня" in text:
+        return _with_time(today, text)
+    if "вчора" in text or "вчера" in text:
+        return _with_time(today - timedelta(days=1), text)
+
+    match = _AGO_RE.search(text)
+    if match:
+        return now - timedelta(**{_AGO_UNITS[match.group(2)]: int(match.group(1))})
+
+    for match in _DATE_RE.finditer(text):
+        month = _month(match.group(2))
+        if month:
+            day = int(match.group(1) or 1)
+            try:
+                return _with_time(datetime(int(match.group(3)), month, day), text)
+            except ValueError:
+                return None
+
+    match = _YEAR_RE.search(text)
+    if match:
+        return datetime(int(match.group(1)), 1, 1)
+
+    # "Онлайн в 10:15" - лише час, отже сьогодні
+    if _TIME_RE.search(text):
+        return _with_time(today, text)
+    return None
+
+
+def split_images(value: str | None) -> list[str]:
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+
+def normalize_seller(seller: dict, now: datetime | None = None) -> dict:
+    """
+    Типізовані колонки продавця з сирих рядків, які повертає extraction.
+    """
+    return {
+        "registered_at": parse_olx_date(seller.get("registered_date"), now),
+        "last_active_at": parse_olx_date(seller.get("last_active_date"), now),
+    }
+
+
+def normalize_product(product: dict, now: datetime | None = None) -> dict:
+    """
+    Типізовані колонки продукту з сирих рядків, які повертає extraction.
+    """
+    amount, currency, negotiable = parse_price(product.get("price"))
+    return {
+        "price_amount": amount,
+        "price_currency": currency,
+        "price_negotiable": negotiable,
+        "views": parse_int(product.get("views_count")),
+        "published_at": parse_olx_date(product.get("date_published"), now),
+        "image_list": split_images(product.get("images")),
+    }
@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Iterator
+
+from dotenv import load_dotenv
+
+from src.services.normalize import kyiv_now
+from src.utils.py_logger import get_logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = get_logger(__name__)
+load_dotenv()
+
+# 1 - зберігати HTML кожної сторінки товару в архів для повторного розбору без мережі
+ARCHIVE_PAGES = os.getenv("ARCHIVE_PAGES", "0") == "1"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.getcwd(), 'archive'))
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """
+    Рядок індексу: яка сторінка (site_id, url), коли завантажена і де лежить її HTML (sha256 вмісту).
+    """
+    site_id: str
+    url: str
+    fetched_at: str
+    sha256: str
+    ext: str
+
+
+class PageArchive:
+    """
+    Append-only архів сирих сторінок товарів.
+    HTML зберігається стисненим (zstd або gzip) за адресою вмісту: objects/<sha[:2]>/<sha>.<ext>,
+    тож однакові сторінки займають місце один раз. Індекс - денні JSON lines файли index/YYYY-MM-DD.jsonl
+    (site_id, url, час завантаження, sha256); запис рядка одним O_APPEND write безпечний для кількох процесів.
+    """
+
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = root
+        self.ext = "zst" if zstandard is not None else "gz"
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "index"), exist_ok=True)
+
+    def _object_path(self, sha256: str, ext: str) -> str:
+        return os.path.join(self.root, "objects", sha256[:2], f"{sha256}.{ext}")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.ext == "zst":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(data: bytes, ext: str) -> bytes:
+        if ext == "zst":
+            if zstandard is None:
+                raise RuntimeError("Для читання .zst потрібен пакет zstandard")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def put(self, site_id: str, url: str, html: str, fetched_at: datetime | None = None) -> ArchiveEntry:
+        """
+        Зберігає HTML (якщо такого вмісту ще немає) і дописує рядок в індекс. Синхронний - викликати через to_thread.
+        """
+        data = html.encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha256, self.ext)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Атомарний запис: тимчасовий файл у тому ж каталозі + rename
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(self._compress(data))
+            os.replace(tmp_path, path)
+
+        fetched_at = fetched_at or kyiv_now()
+        entry = ArchiveEntry(site_id=str(site_id), url=url, fetched_at=fetched_at.isoformat(), sha256=sha256,
+                             ext=self.ext)
+        line = (json.dumps(asdict(entry), ensure_ascii=False) + "\n").encode("utf-8")
+        index_path = os.path.join(self.root, "index", f"{fetched_at:%Y-%m-%d}.jsonl")
+        fd = os.open(index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return entry
+
+    def read(self, entry: ArchiveEntry) -> str:
+        with open(self._object_path(entry.sha256, entry.ext), "rb") as object_file:
+            return self._decompress(object_file.read(), entry.ext).decode("utf-8")
+
+    def entries(self, since: str | None = None) -> Iterator[ArchiveEntry]:
+        """
+        Усі рядки індексу в порядку часу завантаження; since (YYYY-MM-DD) - пропускає старші денні файли.
+        """
+        index_dir = os.path.join(self.root, "index")
+        for name in sorted(os.listdir(index_dir)):
+            if not name.endswith(".jsonl") or (since and name[:10] < since):
+                continue
+            with open(os.path.join(index_dir, name), encoding="utf-8") as index_file:
+                for line in index_file:
+                    try:
+                        yield ArchiveEntry(**json.loads(line))
+                    except (ValueError, TypeError):
+                        logger.warning(f"Архів: пошкоджений рядок індексу в {name}")
+
+    def latest(self, since: str | None = None) -> dict[str, ArchiveEntry]:
+        """
+        Останнє завантаження для кожного site_id.
+        """
+        latest = {}
+        for entry in self.entries(since):
+            current = latest.get(entry.site_id)
+            if current is None or entry.fetched_at >= current.fetched_at:
+                latest[entry.site_id] = entry
+        return latest
+
+    def history(self, site_id: str) -> list[ArchiveEntry]:
+        return [entry for entry in self.entries() if entry.site_id == str(site_id)]
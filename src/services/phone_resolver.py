@@ -0,0 +1,188 @@
+import asyncio
+import os
+import time
+from contextlib import AsyncExitStack
+from datetime import timedelta
+
+from dotenv import load_dotenv
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from src.repository import phones
+from src.repository.phones import PendingPhone, phone_cache
+from src.services.browser_pool import BrowserPool
+from src.services.browser_session import COOKIES_BUTTON_SELECTOR, SessionManager
+from src.services.concurrency import TokenBucket
+from src.services.metrics import record_failure, span
+from src.services.pipeline import BROWSER_HEADLESS, LOAD_PROFILE
+from src.services.resilience import BLOCKED_STATUSES
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+load_dotenv()
+
+# Продавців за тік (0 - етап вимкнено), паралельні сторінки і час на тік (сек.)
+PHONE_BUDGET = int(os.getenv("PHONE_BUDGET", 30))
+PHONE_CONCURRENCY = int(os.getenv("PHONE_CONCURRENCY", 2))
+PHONE_TIME_BUDGET = float(os.getenv("PHONE_TIME_BUDGET", 50))
+# Частота відкриття телефонів: не більше PHONE_RATE за хвилину, сплеск до PHONE_BURST
+PHONE_RATE = float(os.getenv("PHONE_RATE", 20))
+PHONE_BURST = float(os.getenv("PHONE_BURST", 3))
+# Спроб до відмови і пауза між ними (год.) для продавців, чий номер не показали
+PHONE_MAX_ATTEMPTS = int(os.getenv("PHONE_MAX_ATTEMPTS", 3))
+PHONE_RETRY_INTERVAL = float(os.getenv("PHONE_RETRY_INTERVAL", 24))
+
+PHONE_BUTTON_SELECTOR = 'button.css-72jcbl'
+PHONE_LINK_SELECTOR = 'a.css-1dvqodz'
+LOGIN_FORM_SELECTOR = "input[name='username']"
+
+
+class PhoneResolver:
+    """
+    Окремий етап отримання телефонів: основний скрапінг зберігає оголошення без кліку по кнопці телефону,
+    а цей етап у фоні бере продавців без номера (sellers.phone_number IS NULL) і відкриває номер на сторінці
+    їхнього останнього оголошення. Свій пул з одного браузера з авторизованою сесією (SessionManager),
+    частота кліків обмежена TokenBucket. Результат записується в sellers за id.
+    Пул і сесія запускаються при першій потребі і живуть між тіками (логін - раз на SESSION_MAX_AGE, а не
+    щохвилини); після помилки тіку перезапускаються, при зупинці застосунку їх закриває close().
+    """
+
+    def __init__(self, email, password, link, budget: int = PHONE_BUDGET, concurrency: int = PHONE_CONCURRENCY,
+                 time_budget: float = PHONE_TIME_BUDGET, rate: float = PHONE_RATE, burst: float = PHONE_BURST,
+                 max_attempts: int = PHONE_MAX_ATTEMPTS, retry: timedelta = timedelta(hours=PHONE_RETRY_INTERVAL),
+                 lease: timedelta = timedelta(minutes=5)):
+        self.email = email
+        self.password = password
+        self.link = link
+        self.budget = budget
+        self.concurrency = concurrency
+        self.time_budget = time_budget
+        self.max_attempts = max_attempts
+        self.retry = retry
+        self.lease = lease
+        self.bucket = TokenBucket(rate / 60, burst)
+        self._lock = asyncio.Lock()
+        self._stack: AsyncExitStack | None = None
+        self._pool: BrowserPool | None = None
+        self._session: SessionManager | None = None
+
+    async def tick(self) -> None:
+        if self._lock.locked():
+            logger.warning("Phones: попередній тік ще триває, пропускаємо")
+            return
+
+        async with self._lock:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.error(f"Phones: тік завершився з помилкою: {e}", exc_info=True)
+                await self._close()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close()
+
+    async def _close(self) -> None:
+        if self._stack:
+            stack, self._stack, self._pool, self._session = self._stack, None, None, None
+            try:
+                await stack.aclose()
+            except Exception as e:
+                logger.warning(f"Phones: помилка при закритті браузера: {e}")
+
+    async def _browser(self) -> tuple[BrowserPool, SessionManager]:
+        """
+        Пул браузера з сесією, спільний для всіх тіків.
+        """
+        if self._stack is None:
+            stack = AsyncExitStack()
+            session = SessionManager(self.email, self.password, self.link)
+            try:
+                playwright = await stack.enter_async_context(async_playwright())
+                self._pool = await stack.enter_async_context(
+                    BrowserPool(playwright, size=1, contexts_per_browser=self.concurrency,
+                                headless=BROWSER_HEADLESS, load_profile=LOAD_PROFILE, session=session))
+            except BaseException:
+                self._pool = None
+                await stack.aclose()
+                raise
+            self._stack, self._session = stack, session
+        return self._pool, self._session
+
+    async def _tick(self) -> None:
+        start_time = time.monotonic()
+        pending = await phones.claim_pending(self.budget, self.lease, self.max_attempts)
+        if not pending:
+            return
+
+        found = {item.seller_id: phone_cache.get(item.seller_id) for item in pending
+                 if phone_cache.get(item.seller_id)}
+        missing = [item.seller_id for item in pending if not item.url and item.seller_id not in found]
+        to_reveal = [item for item in pending if item.url and item.seller_id not in found]
+
+        if to_reveal:
+            deadline = start_time + self.time_budget
+            semaphore = asyncio.Semaphore(self.concurrency)
+            pool, session = await self._browser()
+            blocked = asyncio.Event()
+            results = await asyncio.gather(*(self._resolve(item, pool, session, semaphore, deadline, blocked)
+                                              for item in to_reveal))
+
+            for item, phone in zip(to_reveal, results):
+                if phone:
+                    found[item.seller_id] = phone
+                elif phone == "":
+                    missing.append(item.seller_id)
+                # None - не встигли або сайт обмежив доступ: продавець повернеться в чергу після lease
+
+        phone_cache.update(found)
+        await phones.save_phones(found, missing, self.retry)
+        logger.info(f"Phones: знайдено {len(found)}, без номера {len(missing)} з {len(pending)} "
+                    f"за {time.monotonic() - start_time:.2f} сек.", extra={'custom_color': True})
+
+    async def _resolve(self, item: PendingPhone, pool: BrowserPool, session: SessionManager,
+                       semaphore: asyncio.Semaphore, deadline: float, blocked: asyncio.Event) -> str | None:
+        """
+        Номер продавця; "" - номера на сторінці немає; None - спробувати пізніше.
+        """
+        async with semaphore:
+            if blocked.is_set() or time.monotonic() >= deadline:
+                return None
+            await self.bucket.acquire()
+            if blocked.is_set() or time.monotonic() >= deadline:
+                return None
+
+            try:
+                async with pool.page() as page:
+                    response = await pool.goto(page, item.url)
+                    if (response and response.status in BLOCKED_STATUSES) or "captcha" in page.url.lower():
+                        logger.warning(f"Phones: доступ обмежено ({response.status if response else None}), "
+                                       f"зупиняємо тік")
+                        blocked.set()
+                        return None
+                    if response and response.status == 404:
+                        return ""
+
+                    button = await page.query_selector(COOKIES_BUTTON_SELECTOR)
+                    if button:
+                        await button.click()
+
+                    try:
+                        phone_button = await page.wait_for_selector(PHONE_BUTTON_SELECTOR, timeout=5000)
+                    except PlaywrightTimeoutError:
+                        return ""
+
+                    with span("phone_reveal"):
+                        await phone_button.click()
+                        try:
+                            phone_link = await page.wait_for_selector(PHONE_LINK_SELECTOR, timeout=3000)
+                        except PlaywrightTimeoutError:
+                            if await page.query_selector(LOGIN_FORM_SELECTOR) or "login" in page.url:
+                                logger.warning("Phones: сайт просить увійти - оновлюємо сесію")
+                                session.invalidate()
+                                return None
+                            return ""
+                        return (await phone_link.text_content() or "").strip()
+            except Exception as e:
+                record_failure("phone_reveal")
+                logger.error(f"Phones: помилка для {item.url}: {e}")
+                return None
@@ -0,0 +1,417 @@
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from playwright.async_api import async_playwright
+
+from src.db.session import get_db_context, pool_status
+from src.repository import frontier
+from src.repository.known_ids import KnownIds, known_ids as process_known_ids
+from src.repository.save_to_db import bulk_save_data_to_db
+from src.services.browser_pool import BrowserPool
+from src.services.browser_session import SESSION_ENABLED, SessionManager
+from src.services.concurrency import AdaptiveLimiter
+from src.services.extraction import split_spec
+from src.services.http_service import HttpScraper
+from src.services.metrics import QUEUE_DEPTH, RunSummary, record_failure, span, start_run_summary
+from src.services.load_profile import DEFAULT_BLOCKED_DOMAINS, FULL_PROFILE, LoadProfile, traffic_stats
+from src.services.playwright_service import PlaywrightAsyncRunner, fetch_product_data
+from src.services.resilience import DeadlineExceededError, circuit_breaker
+from src.utils.py_logger import get_logger, run_id_var
+
+logger = get_logger(__name__)
+load_dotenv()
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 2))
+CONTEXTS_PER_BROWSER = int(os.getenv("CONTEXTS_PER_BROWSER", 2))
+MAX_PAGES_PER_CONTEXT = int(os.getenv("MAX_PAGES_PER_CONTEXT", 20))
+MAX_BROWSER_MEMORY_MB = float(os.getenv("MAX_BROWSER_MEMORY_MB", 0)) or None
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "0") == "1"
+
+# Профіль завантаження: BLOCK_RESOURCES=0 вимикає блокування, BLOCKED_DOMAINS доповнює список доменів
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "1") == "1"
+BLOCKED_DOMAINS = tuple(domain.strip() for domain in os.getenv("BLOCKED_DOMAINS", "").split(",") if domain.strip())
+LOAD_PROFILE = (LoadProfile(blocked_domains=DEFAULT_BLOCKED_DOMAINS + BLOCKED_DOMAINS)
+                if BLOCK_RESOURCES else FULL_PROFILE)
+
+LIST_PAGES = int(os.getenv("LIST_PAGES", 5))
+LIST_START_PATHS = tuple(path.strip() for path in os.getenv("LIST_START_PATHS", "/uk/list/").split(",") if path.strip())
+LIST_CONCURRENCY = int(os.getenv("LIST_CONCURRENCY", 5))
+# Сторінок однієї категорії, що відкриваються одночасно: після high-water mark решта не відкривається
+LIST_WAVE_SIZE = int(os.getenv("LIST_WAVE_SIZE", 2))
+
+CONCURRENCY_MIN = int(os.getenv("CONCURRENCY_MIN", 1))
+CONCURRENCY_MAX = int(os.getenv("CONCURRENCY_MAX", 8))
+CONCURRENCY_INITIAL = int(os.getenv("CONCURRENCY_INITIAL", 3))
+CONCURRENCY_TARGET_P95 = float(os.getenv("CONCURRENCY_TARGET_P95", 10))
+CONCURRENCY_MAX_ERROR_RATE = float(os.getenv("CONCURRENCY_MAX_ERROR_RATE", 0.2))
+LINK_QUEUE_SIZE = int(os.getenv("LINK_QUEUE_SIZE", 50))
+RESULT_QUEUE_SIZE = int(os.getenv("RESULT_QUEUE_SIZE", 50))
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", 20))
+WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", 5))
+# Паралельні db_writer: кожен пакет пишеться у власній сесії і транзакції
+DB_WRITERS = int(os.getenv("DB_WRITERS", 2))
+
+# crawl_queue: розмір пакета claim/enqueue, пауза між порожніми claim, кількість спроб
+FRONTIER_CLAIM_BATCH = int(os.getenv("FRONTIER_CLAIM_BATCH", 20))
+FRONTIER_POLL_INTERVAL = float(os.getenv("FRONTIER_POLL_INTERVAL", 1))
+FRONTIER_MAX_ATTEMPTS = int(os.getenv("FRONTIER_MAX_ATTEMPTS", 5))
+WORKER_IDLE_SLEEP = float(os.getenv("WORKER_IDLE_SLEEP", 2))
+
+# Групи полів (seller, product), які беруться через HTTP-рушій замість браузера
+HTTP_FIELD_GROUPS = {group.strip() for group in os.getenv("HTTP_FIELD_GROUPS", "").split(",") if group.strip()}
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", 20))
+
+# Маркер завершення для черг
+_STOP = None
+
+
+@dataclass
+class PipelineStats:
+    """
+    Лічильники одного прогону пайплайна.
+    """
+    started_at: float = field(default_factory=time.time)
+    links: int = 0
+    skipped: int = 0
+    claimed: int = 0
+    scraped: int = 0
+    failed: int = 0
+    saved: int = 0
+    # Результати без site_id і записи, які БД не прийняла (повернуті в crawl_queue)
+    invalid: int = 0
+    rejected: int = 0
+    first_row_at: float | None = None
+    leftover: list[str] = field(default_factory=list)
+    seen_ids: set[str] = field(default_factory=set)
+    summary: RunSummary | None = None
+
+    @property
+    def skip_rate(self) -> float:
+        seen = self.links + self.skipped
+        return self.skipped / seen if seen else 0.0
+
+
+async def link_producer(email, password, link, pool: BrowserPool, discovered_queue: asyncio.Queue,
+                        known_ids: KnownIds, stats: PipelineStats, high_water: set[str] | None) -> None:
+    """
+    Етап 1: обходить сторінки списку і передає нові посилання далі одразу після розбору кожної сторінки.
+    Маркер завершення - лише після успішного обходу: при помилці етапи скасовує run_pipeline.
+    """
+    runner = PlaywrightAsyncRunner(email, password, link)
+    await runner.main_get_pages(pool, queue=discovered_queue, known_ids=known_ids, pages=LIST_PAGES,
+                                start_paths=LIST_START_PATHS, concurrency=LIST_CONCURRENCY,
+                                high_water=high_water, wave_size=LIST_WAVE_SIZE)
+    stats.skipped = runner.skipped
+    stats.seen_ids = runner.seen_ids
+    await discovered_queue.put(_STOP)
+
+
+async def frontier_enqueuer(discovered_queue: asyncio.Queue, discovery_done: asyncio.Event,
+                            stats: PipelineStats) -> None:
+    """
+    Етап 1б: записує знайдені посилання в crawl_queue пакетами.
+    discovery_done встановлюється і при помилці - frontier_feeder не чекатиме нових посилань до deadline.
+    """
+    batch = []
+    finished = False
+
+    try:
+        while not finished:
+            href = await discovered_queue.get()
+            if href is _STOP:
+                finished = True
+            else:
+                batch.append(href)
+
+            if batch and (finished or discovered_queue.empty() or len(batch) >= FRONTIER_CLAIM_BATCH):
+                stats.links += await frontier.enqueue(batch)
+                batch = []
+    finally:
+        discovery_done.set()
+
+
+async def frontier_feeder(link_queue: asyncio.Queue, workers: int, discovery_done: asyncio.Event,
+                          stats: PipelineStats, deadline: float | None) -> None:
+    """
+    Етап 2а: забирає готові посилання з crawl_queue (FOR UPDATE SKIP LOCKED) і передає воркерам.
+    Завершується, коли пошук закінчено і черга порожня, або після deadline.
+    """
+    while deadline is None or time.monotonic() < deadline:
+        urls = await frontier.claim(FRONTIER_CLAIM_BATCH)
+        stats.claimed += len(urls)
+
+        for href in urls:
+            await link_queue.put(href)
+
+        if not urls:
+            if discovery_done.is_set():
+                break
+            try:
+                await asyncio.wait_for(discovery_done.wait(), timeout=FRONTIER_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    for _ in range(workers):
+        await link_queue.put(_STOP)
+
+
+async def product_worker(email, password, link, pool: BrowserPool, limiter: AdaptiveLimiter,
+                         http: HttpScraper | None, link_queue: asyncio.Queue, result_queue: asyncio.Queue,
+                         stats: PipelineStats, deadline: float | None) -> None:
+    """
+    Етап 2б: забирає посилання з черги і скрапить сторінку товару (одночасно не більше limiter.limit воркерів).
+    Після deadline нові сторінки не відкриваються - посилання повертаються в crawl_queue для наступного прогону,
+    так само як і посилання, повтор якого (або пауза запобіжника) не вклався в deadline.
+    """
+    http_spec, _ = split_spec(HTTP_FIELD_GROUPS)
+
+    while (product_link := await link_queue.get()) is not _STOP:
+        if deadline is not None and time.monotonic() >= deadline:
+            stats.leftover.append(product_link)
+            continue
+
+        try:
+            data = await fetch_product_data(email, password, product_link, link, pool, limiter, http, http_spec,
+                                            deadline)
+        except DeadlineExceededError:
+            stats.leftover.append(product_link)
+            continue
+        if data:
+            stats.scraped += 1
+            await result_queue.put((product_link, data))
+        else:
+            stats.failed += 1
+            await _settle(frontier.mark_failed, [product_link], error="scrape failed",
+                          max_attempts=FRONTIER_MAX_ATTEMPTS)
+
+
+async def _settle(action, urls: list[str], **kwargs) -> None:
+    """
+    Оновлення стану crawl_queue не зупиняє конвеєр: якщо запис не вдався,
+    посилання залишаються in_progress і повертаються в чергу через requeue_stale.
+    """
+    try:
+        await action(urls, **kwargs)
+    except Exception as e:
+        logger.error(f"Frontier: не вдалося виконати {action.__name__} для {len(urls)} посилань: {e}")
+
+
+async def _write_batch(batch: list[tuple[str, dict]], known_ids: KnownIds, stats: PipelineStats) -> None:
+    hrefs = [href for href, _ in batch]
+    with span("db_write"):
+        result = await bulk_save_data_to_db([data for _, data in batch])
+
+    if result is None:
+        record_failure("db_write")
+        await _settle(frontier.mark_failed, hrefs, error="db write failed", max_attempts=FRONTIER_MAX_ATTEMPTS)
+        return
+
+    # Відхилені дублікати вже є в products - для черги вони теж виконані.
+    # Записи без site_id і ті, що БД не прийняла, повертаються в чергу кожен окремо
+    href_of = {id(data): href for href, data in batch}
+    invalid = [href_of[id(data)] for data in result.invalid]
+    rejected = [href_of[id(data)] for data in result.failed]
+    await _settle(frontier.mark_done, [href_of[id(data)] for data in result.saved + result.duplicates])
+    await _settle(frontier.mark_failed, invalid, error="no site_id", max_attempts=FRONTIER_MAX_ATTEMPTS)
+    await _settle(frontier.mark_failed, rejected, error="db rejected record", max_attempts=FRONTIER_MAX_ATTEMPTS)
+    if result.failed:
+        record_failure("db_write")
+
+    for data in result.saved:
+        known_ids.add(data['product'].get('link'))
+    saved = result.saved
+    stats.saved += len(saved)
+    stats.invalid += len(invalid)
+    stats.rejected += len(rejected)
+
+    if saved and stats.first_row_at is None:
+        stats.first_row_at = time.time()
+        logger.info(f"Перший запис у БД через {stats.first_row_at - stats.started_at:.2f} сек.")
+
+
+async def db_writer(result_queue: asyncio.Queue, known_ids: KnownIds, stats: PipelineStats,
+                    batch_size: int = WRITE_BATCH_SIZE, flush_interval: float = WRITE_FLUSH_INTERVAL) -> None:
+    """
+    Етап 3: збирає результати в пакети (за розміром або часом) і записує їх у БД.
+    Кілька db_writer читають одну чергу; кожен пакет - окрема сесія, тож записи йдуть паралельно
+    через різні з'єднання пулу.
+    """
+    batch = []
+    deadline = None
+    finished = False
+
+    while not finished:
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            item = await asyncio.wait_for(result_queue.get(), timeout=timeout)
+            if item is _STOP:
+                finished = True
+            else:
+                batch.append(item)
+                deadline = deadline or time.monotonic() + flush_interval
+        except asyncio.TimeoutError:
+            pass
+
+        if batch and (finished or len(batch) >= batch_size or time.monotonic() >= deadline):
+            await _write_batch(batch, known_ids, stats)
+            batch = []
+            deadline = None
+
+
+async def queue_monitor(queues: dict[str, asyncio.Queue], interval: float = 1.0) -> None:
+    """
+    Періодично оновлює gauge olx_queue_depth для черг конвеєра (поки задачу не скасують).
+    """
+    try:
+        while True:
+            for name, queue in queues.items():
+                QUEUE_DEPTH.labels(name).set(queue.qsize())
+            await asyncio.sleep(interval)
+    finally:
+        for name in queues:
+            QUEUE_DEPTH.labels(name).set(0)
+
+
+def new_limiter(capacity: int = BROWSER_POOL_SIZE * CONTEXTS_PER_BROWSER) -> AdaptiveLimiter:
+    """
+    Ліміт воркерів не більший за кількість слотів пулу (capacity): зайві воркери лише чекали б на сторінку.
+    Обмежувач створюється один раз на процес, щоб AIMD-ліміт переходив з прогону в прогін.
+    """
+    max_limit = CONCURRENCY_MAX
+    if capacity < max_limit:
+        logger.info(f"CONCURRENCY_MAX={CONCURRENCY_MAX} більше за слоти пулу браузерів, обмежено до {capacity}")
+        max_limit = capacity
+    return AdaptiveLimiter(min_limit=min(CONCURRENCY_MIN, max_limit), max_limit=max_limit,
+                           initial=CONCURRENCY_INITIAL, target_p95=CONCURRENCY_TARGET_P95,
+                           max_error_rate=CONCURRENCY_MAX_ERROR_RATE)
+
+
+async def run_pipeline(email, password, link, pool: BrowserPool, http: HttpScraper | None = None,
+                       limiter: AdaptiveLimiter | None = None, discover: bool = True, scrape_details: bool = True,
+                       high_water: set[str] | None = None, deadline: float | None = None,
+                       known_ids: KnownIds | None = None) -> PipelineStats:
+    """
+    Запускає всі етапи: пошук посилань -> crawl_queue -> пул воркерів -> запис у БД.
+    Обмежені черги дають backpressure, а crawl_queue у Postgres зберігає роботу між прогонами і після падінь.
+    Воркерів запускається limiter.max_limit, а скільки з них працює одночасно - вирішує limiter.
+    discover=False - лише дообробка crawl_queue, без обходу сторінок списку.
+    scrape_details=False - лише обхід списку і запис у crawl_queue (сторінки товарів обробляють процеси worker.py).
+    deadline (time.monotonic) - після нього сторінки товарів не відкриваються.
+    known_ids=None - індекс процесу, дочитаний лише новими рядками products.
+    Тривалості етапів збираються в окремий для кожного прогону stats.summary.
+    Етапи працюють в одній TaskGroup: помилка будь-якого з них скасовує решту (інакше вони зависли б
+    на черзі без споживача), результати, що вже в черзі, дописуються, а прогін завершується цією помилкою.
+    """
+    stats = PipelineStats(summary=start_run_summary())
+    limiter = limiter or new_limiter(pool.capacity)
+    workers = limiter.max_limit if scrape_details else 0
+
+    if known_ids is None:
+        known_ids = process_known_ids
+        async with get_db_context() as db:
+            await known_ids.refresh(db)
+
+    discovered_queue = asyncio.Queue(maxsize=LINK_QUEUE_SIZE)
+    link_queue = asyncio.Queue(maxsize=LINK_QUEUE_SIZE)
+    result_queue = asyncio.Queue(maxsize=RESULT_QUEUE_SIZE)
+    discovery_done = asyncio.Event()
+
+    stages = []
+    if discover:
+        stages += [link_producer(email, password, link, pool, discovered_queue, known_ids, stats, high_water),
+                   frontier_enqueuer(discovered_queue, discovery_done, stats)]
+    else:
+        discovery_done.set()
+    if scrape_details:
+        stages.append(frontier_feeder(link_queue, workers, discovery_done, stats, deadline))
+
+    writers = [asyncio.create_task(db_writer(result_queue, known_ids, stats)) for _ in range(max(DB_WRITERS, 1))]
+    monitor = asyncio.create_task(queue_monitor({"discovered": discovered_queue, "links": link_queue,
+                                                 "results": result_queue}))
+    try:
+        async with asyncio.TaskGroup() as group:
+            for stage in stages:
+                group.create_task(stage)
+            for _ in range(workers):
+                group.create_task(product_worker(email, password, link, pool, limiter, http, link_queue,
+                                                 result_queue, stats, deadline))
+    except ExceptionGroup as errors:
+        # Викликачі (координатор, воркер) очікують звичайний виняток
+        raise errors.exceptions[0]
+    finally:
+        for _ in writers:
+            await result_queue.put(_STOP)
+        await asyncio.gather(*writers)
+        monitor.cancel()
+        await _settle(frontier.release, stats.leftover)
+
+    logger.info(f"Паралельність наприкінці прогону: {limiter.snapshot()}, запобіжник: {circuit_breaker.snapshot()}")
+
+    return stats
+
+
+def new_session(email, password, link) -> SessionManager | None:
+    return SessionManager(email, password, link) if SESSION_ENABLED else None
+
+
+def new_browser_pool(playwright, session: SessionManager | None = None) -> BrowserPool:
+    return BrowserPool(playwright, size=BROWSER_POOL_SIZE, contexts_per_browser=CONTEXTS_PER_BROWSER,
+                       headless=BROWSER_HEADLESS, max_pages_per_context=MAX_PAGES_PER_CONTEXT,
+                       max_memory_mb=MAX_BROWSER_MEMORY_MB, load_profile=LOAD_PROFILE, session=session)
+
+
+async def playwright_async_run(email, password, link, discover: bool = True, scrape_details: bool = True,
+                               high_water: set[str] | None = None, deadline: float | None = None,
+                               limiter: AdaptiveLimiter | None = None) -> PipelineStats:
+    async with (async_playwright() as playwright,
+                new_browser_pool(playwright, new_session(email, password, link)) as pool,
+                HttpScraper(limit=HTTP_POOL_LIMIT) as http):
+
+        traffic_stats.reset()
+        stats = await run_pipeline(email, password, link, pool, http if HTTP_FIELD_GROUPS else None,
+                                   limiter=limiter, discover=discover, scrape_details=scrape_details,
+                                   high_water=high_water, deadline=deadline)
+
+        print("*" * 90)
+        logger.info(f"Нових посилань у черзі: {stats.links}, взято з черги: {stats.claimed}.",
+                    extra={'custom_color': True})
+        logger.info(f"Пропущено вже відомих: {stats.skipped} ({stats.skip_rate:.0%})", extra={'custom_color': True})
+        logger.info(f"Записано товарів у базу даних:  {stats.saved}, без site_id: {stats.invalid}, "
+                    f"не прийнято БД: {stats.rejected}", extra={'custom_color': True})
+        logger.info(f"Завантаження сторінок: {traffic_stats.summary()}", extra={'custom_color': True})
+        logger.info(f"Пул з'єднань БД: {pool_status()}", extra={'custom_color': True})
+        logger.info(f"Загальний час: {time.time() - stats.started_at:.2f} сек.", extra={'custom_color': True})
+        stats.summary.log()
+        print("*" * 90)
+
+        return stats
+
+
+async def worker_run(email, password, link, idle_sleep: float = WORKER_IDLE_SLEEP) -> None:
+    """
+    Режим воркера: власний пул браузерів на весь час життя процесу, сторінки товарів беруться
+    лише зі спільної crawl_queue (обхід списку робить координатор).
+    """
+    async with (async_playwright() as playwright,
+                new_browser_pool(playwright, new_session(email, password, link)) as pool,
+                HttpScraper(limit=HTTP_POOL_LIMIT) as http):
+
+        limiter = new_limiter(pool.capacity)
+        async with get_db_context() as db:
+            known_ids = await process_known_ids.load(db)
+
+        logger.info("Воркер запущено, очікуємо посилання в crawl_queue", extra={'custom_color': True})
+        while True:
+            run_id_var.set(uuid.uuid4().hex[:12])
+            stats = await run_pipeline(email, password, link, pool, http if HTTP_FIELD_GROUPS else None,
+                                       limiter=limiter, discover=False, known_ids=known_ids)
+            if stats.claimed:
+                logger.info(f"Воркер: взято {stats.claimed}, записано {stats.saved}, помилок {stats.failed} "
+                            f"за {time.time() - stats.started_at:.2f} сек.")
+                stats.summary.log()
+            else:
+                await asyncio.sleep(idle_sleep)
@@ -1,19 +1,32 @@
 import asyncio
-import random
-import re
 import time
-from pprint import pprint
 
-from playwright.async_api import async_playwright, Playwright
-
-from src.repository.save_to_db import save_data_to_db
-from src.utils.info import USER_AGENTS
-from src.utils.py_logger import get_logger
-from src.utils.scroll_page import scroll_to_element
-from src.db.session import get_db_context
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+from src.repository.known_ids import KnownIds, listing_id_from_url
+from src.services.browser_pool import BrowserPool
+from src.services.browser_session import COOKIES_BUTTON_SELECTOR, dismiss_cookies
+from src.services.concurrency import AdaptiveLimiter
+from src.services.extraction import FIELD_SPEC, Field, extract_record, missing_fields
+from src.services.http_service import HttpScraper
+from src.services.metrics import record_page, span
+from src.services.page_archive import ARCHIVE_PAGES, PageArchive
+from src.services.resilience import (BLOCKED_STATUSES, DEADLINE, ERROR, BlockedError, DeadlineExceededError,
+                                     SelectorMissingError, classify, with_retry)
+from src.utils.py_logger import get_logger, url_var
+from src.utils.waits import PAGE_TIME_BUDGET, PageBudget
 
 logger = get_logger(__name__)
 
+LIST_CARD_SELECTOR = 'div[data-cy="l-card"]'
+LIST_LINK_SELECTOR = 'div[data-cy="l-card"] a.css-qo0cxu'
+LIST_GRID_SELECTOR = 'div[data-testid="listing-grid"]'
+# Скільки чекати вікно cookies (сек.), якщо згоди ще немає в стані сесії
+COOKIES_WAIT_TIMEOUT = 5
+
+# Архів сирого HTML сторінок товарів (ARCHIVE_PAGES=1) для повторного розбору без мережі
+page_archive = PageArchive() if ARCHIVE_PAGES else None
+
 
 class PlaywrightAsyncRunner:
 
@@ -25,35 +38,27 @@ class PlaywrightAsyncRunner:
         self.password = password
         self.link = link
         self.headless = headless
-        self.browser = None
         self.page = None
-        self.logged_in = False
+        self.skipped = 0
+        self.seen_ids = set()
+        self.outcome = None
         self.data = {}
+        # HTML сторінки товару після розбору полів (лише якщо увімкнено архів)
+        self.capture_html = False
+        self.html = None
+        # Коли сторінку отримано з пулу (time.monotonic): затримка для AdaptiveLimiter - без очікування слота пулу
+        self.checked_out_at = None
 
-    async def _setup_browser(self, playwright) -> None:
+    async def _setup_page(self, pool: BrowserPool, page: Page) -> None:
         """
-        Налаштовує браузер і сторінку.
+        Прив'язує сторінку з пулу і відкриває посилання.
         """
-        user_agent = random.choice(USER_AGENTS)
-        firefox = playwright.firefox
-
-        self.browser = await firefox.launch(headless=self.headless)
-        context = await self.browser.new_context(user_agent=user_agent)
-        self.page = await context.new_page()
+        self.page = page
+        with span("navigation"):
+            response = await pool.goto(self.page, self.link)
 
-        # Маскування navigator.webdriver
-        await self.page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-        """)
-
-        await self.page.goto(self.link)
-
-    async def _close_browser(self):
-        """
-        Закриття браузера
-        """
-        if self.browser:
-            await self.browser.close()
+            if (response and response.status in BLOCKED_STATUSES) or "captcha" in self.page.url.lower():
+                raise BlockedError(f"{self.link}: HTTP {response.status if response else None}, url={self.page.url}")
 
     async def _log_user_agent(self):
         """
@@ -62,321 +67,283 @@ class PlaywrightAsyncRunner:
         user_agent = await self.page.evaluate("navigator.userAgent")
         logger.info(f"User-Agent: {user_agent}")
 
-    async def _accept_cookies(self):
+    async def _accept_cookies(self, consent_cached: bool = False, budget: PageBudget | None = None):
         """
         Натискає кнопку "Закрити" cookies, якщо з'являється відповідне вікно.
+        consent_cached - згода вже є в стані сесії, тож вікно не очікується: лише миттєва перевірка.
         """
-        try:
-            await self.page.wait_for_selector('div.css-e661z2 > button[data-cy="dismiss-cookies-overlay"]')
-            await self.page.click('div.css-e661z2 > button[data-cy="dismiss-cookies-overlay"]')
-        except Exception as e:
-            logger.warning(f"Failed to click 'Закрити': {e}")
+        if consent_cached:
+            button = await self.page.query_selector(COOKIES_BUTTON_SELECTOR)
+            if button:
+                await button.click()
+            return
 
-    async def _login(self):
-        """
-        Авторизація на сайті.
-        """
-        try:
-            if not self.logged_in:
-                await asyncio.sleep(random.randint(2, 3))
-                await self.page.locator('div.css-zs6l2q > a[data-cy="myolx-link"]').click()
+        timeout = budget.timeout(COOKIES_WAIT_TIMEOUT) if budget else COOKIES_WAIT_TIMEOUT
+        if not await dismiss_cookies(self.page, timeout * 1000):
+            logger.warning("Вікно cookies не з'явилося")
 
-                await asyncio.sleep(4)
-                await self.page.locator("input[name='username']").fill(self.email)
-                await self.page.locator("input[name='password']").fill(self.password)
-
-                await asyncio.sleep(random.randint(2, 3))
-                login_button = await self.page.wait_for_selector('button[data-testid="login-submit-button"]',
-                                                                 state='visible')
-                await login_button.scroll_into_view_if_needed()
-                await login_button.focus()
-                await login_button.click()
-
-                logger.info(f"{self.email} ==> Авторизація пройшла успішно!", extra={'custom_color': True})
-                self.logged_in = True
-
-                await asyncio.sleep(5)
-                await self.page.goto(self.link)
-
-                if self.page.url == self.link:
-                    logger.info(f"Успішно перейшли на сторінку: {self.link}")
-                else:
-                    logger.warning(f"Перехід на сторінку {self.link} завершився невдачею.",
-                                   extra={'custom_color': True})
-
-        except Exception as e:
-            logger.error(f"{self.email} | Login failed: {e}")
-            raise
-
-    async def _extract_text(self, selector: str, scroll: bool = False, is_digit: bool = False) -> str | None:
+    async def get_fields(self, spec: tuple[Field, ...] = FIELD_SPEC, budget: PageBudget | None = None) -> dict | None:
         """
-        Витягує текст з елемента за вказаним селектором
+        Витягує поля продавця і товару (spec) за один виклик page.evaluate.
         """
         try:
-            if scroll:
-                element = await scroll_to_element(self.page, selector)
-            else:
-                element = await self.page.query_selector(selector)
+            with span("extract_fields"):
+                record = await extract_record(self.page, spec, budget)
 
-            if not element:
-                return None
+            for group, values in record.items():
+                self.data[group] = {**self.data.get(group, {}), **values}
 
-            text = (await element.text_content()).strip()
+            return record
 
-            if is_digit:
-                match = re.search(r'\d+', text)
-                return match.group() if match else None
-            return text
         except Exception as e:
-            logger.error(f"Error extracting text from selector '{selector}': {e}")
+            logger.error(f"Помилка при скрапінгу полів: {e}")
             return None
 
-    async def get_seller(self) -> dict | None:
+    async def _scrape_list_page(self, pool: BrowserPool, page: Page, url: str) -> list[str]:
         """
-        Витягує ім'я, рейтинг, дата реєстр, остання дата, адресу та регіон
+        Відкриває одну сторінку списку і повертає посилання з карток за один roundtrip.
+        Порожня сітка оголошень - кінець списку ([]); блокування і сторінка без сітки - винятки,
+        їх класифікує with_retry.
         """
-        try:
-            seller_data = {
-                'name': await self._extract_text('h4[class="css-1lcz6o7"]'),
-                'rating': await self._extract_text('p[class="css-9pgvpt"]'),
-                'registered_date': await self._extract_text('p[class="css-23d1vy"]'),
-                'last_active_date': await self._extract_text('span[class="css-1p85e15"]'),
-                "location": await self._extract_text('p[class="css-1cju8pu"]'),
-                "region": await self._extract_text('div.css-13l8eec p.css-b5m1rv')
-            }
-
-            self.data['seller'] = {**self.data.get('seller', {}), **seller_data}
-
-            return seller_data
-
-        except Exception as e:
-            logger.error(f"Error scraping seller data: {e}")
-            return None
-
-    async def get_product(self) -> dict | None:
-        """
-        Витягує дату публікації, назву, ціну, опис, id, кількість переглядів
-        """
-        try:
-            items = {
-                "date_published": await self._extract_text('span[class="css-19yf5ek"]'),
-                "title": await self._extract_text('h4[class="css-1kc83jo"]'),
-                "price": await self._extract_text('h3[class="css-90xrc0"]'),
-                "description": await self._extract_text('div[class="css-1o924a9"]'),
-                "site_id": await self._extract_text('span[class="css-12hdxwj"]', is_digit=True),
-                "views_count": await self._extract_text('span[data-testid="page-view-counter"]', scroll=True,
-                                                        is_digit=True)
-            }
-
-            self.data['product'] = {**self.data.get('product', {}), **items}
-
-            return items
-
-        except Exception as e:
-            logger.error(f"Помилка при скрапінгу продукту: {e}")
-            return None
-
-    async def get_images(self) -> dict | None:
-        """
-        Витягує всі зображення зі сторінки.
-        """
-        try:
-            image_elements = await self.page.query_selector_all('div.swiper-wrapper div.swiper-zoom-container img')
-            image_urls = [
-                src for src in await asyncio.gather(*(img.get_attribute('src') for img in image_elements)) if src
-            ]
-
-            image_data = {"images": ", ".join(image_urls)}
-
-            self.data['product'] = {**self.data.get('product', {}), **image_data}
-
-            return image_data
-
-        except Exception as e:
-            logger.error(f"Помилка при скрапінгу картинок: {e}")
-            return None
-
-    async def get_info(self) -> dict | None:
-        try:
-            attributes_selector = 'ul.css-rn93um > li.css-1r0si1e > p.css-b5m1rv'
-            delivery_selector = 'ul.css-rn93um > div[data-testid="courier-btn"]'
-
-            attributes = await self.page.query_selector_all(attributes_selector)
-            olx_delivery = await self.page.query_selector(delivery_selector)
-
-            info = {}
-
-            if attributes:
-                type_item = await attributes[0].text_content()
-                type_item = type_item.strip() if type_item else None
-
-                for attribute in attributes[1:]:
-                    text = await attribute.text_content()
-                    if text and ":" in text:
-                        key, value = map(str.strip, text.split(":", 1))
-                        info[key] = value
-            else:
-                type_item = None
-            olx_delivery = "YES" if olx_delivery else "NO"
-
-            info = {"type_item": type_item, "info": info, "olx_delivery": olx_delivery}
-            self.data['product'] = {**self.data.get('product', {}), **info}
-
-            return info
-
-        except Exception as e:
-            logger.error(f"Помилка при скрапінгу info: {e}")
-            return None
-
-    async def get_phone(self) -> dict | None:
+        with span("list_page"):
+            response = await pool.goto(page, url)
+            if (response and response.status in BLOCKED_STATUSES) or "captcha" in page.url.lower():
+                raise BlockedError(f"{url}: HTTP {response.status if response else None}, url={page.url}")
+
+            try:
+                await page.wait_for_selector(LIST_CARD_SELECTOR, timeout=3000)
+            except PlaywrightTimeoutError:
+                if await page.query_selector(LIST_GRID_SELECTOR):
+                    return []
+                raise SelectorMissingError(f"{url}: немає карток оголошень") from None
+
+            hrefs = await page.eval_on_selector_all(LIST_LINK_SELECTOR,
+                                                    "els => els.map(el => el.getAttribute('href'))")
+        return list(dict.fromkeys(filter(None, hrefs)))
+
+    async def scrape_links(self, pool: BrowserPool, pages: int = 5, start_paths: tuple[str, ...] = ("/uk/list/",),
+                           concurrency: int = 5, queue: asyncio.Queue | None = None,
+                           known_ids: KnownIds | None = None, high_water: set[str] | None = None,
+                           wave_size: int = 2) -> set | None:
         """
-        Пошук телефону
+        Забирає посилання на товари з перших pages сторінок кожної категорії (окремі сторінки пулу).
+        Категорії обходяться паралельно, а сторінки однієї категорії - по порядку хвилями по wave_size;
+        одночасно відкрито не більше concurrency сторінок списку.
+        Якщо передано queue, нові посилання передаються в неї одразу після розбору кожної сторінки.
+        Посилання з known_ids (вже збережені в БД) відкидаються ще до відкриття сторінки товару.
+        high_water - ID оголошень, побачених попереднім проходом: якщо сторінка містить лише відомі
+        або вже побачені оголошення, наступні сторінки цієї категорії не відкриваються, а вже відкриті - скасовуються.
         """
-        try:
-            button_phone_selector = await self.page.query_selector('button.css-72jcbl')
-            if not button_phone_selector:
-                logger.warning("Не знайдена кнопка для показу телефону.")
-                return None
-
-            await button_phone_selector.click()
-
-            phone_selector = await self.page.wait_for_selector('a.css-1dvqodz', timeout=3000)
-            phone_number = None
-
-            if phone_selector:
-                phone_number = (await phone_selector.text_content()).strip()
-
-            phone = {"phone_number": phone_number}
-            self.data['seller'] = {**self.data.get('seller', {}), **phone}
-
-            return phone
+        high_water = high_water or set()
+        links = set()
+        semaphore = asyncio.Semaphore(concurrency)
+        start_time = time.time()
 
-        except Exception as e:
-            logger.error(f"Помилка при скрапінгу телефону: {e}")
-            return None
+        async def fetch(url: str) -> list[str] | None:
+            async def attempt() -> list[str]:
+                async with pool.page() as page:
+                    return await self._scrape_list_page(pool, page, url)
 
-    async def scrape_links(self, pages: int = 5) -> set | None:
+            async with semaphore:
+                try:
+                    return await with_retry(attempt, url)
+                except Exception as e:
+                    logger.error(f"Помилка під час скрапінгу посилань {url} ({classify(e)}): {e}")
+                    return None
+
+        async def collect(url: str, hrefs: list[str]) -> bool:
+            """
+            Передає нові посилання далі (поза семафором - backpressure черги не гальмує інші категорії).
+            Повертає True, якщо сторінка досягла high-water mark.
+            """
+            self.seen_ids.update(map(listing_id_from_url, hrefs))
+
+            new_links = [href for href in hrefs if href not in links]
+            if known_ids is not None:
+                known = [href for href in new_links if href in known_ids]
+                self.skipped += len(known)
+                new_links = [href for href in new_links if href not in known_ids]
+
+            links.update(new_links)
+            if queue is not None:
+                for href in new_links:
+                    await queue.put(href)
+
+            if all(listing_id_from_url(href) in high_water for href in new_links):
+                logger.info(f"{url}: лише відомі або вже побачені оголошення, зупиняємо обхід категорії.")
+                return True
+            return False
+
+        async def crawl(path: str) -> None:
+            separator = "&" if "?" in path else "?"
+            for wave_start in range(1, pages + 1, wave_size):
+                numbers = range(wave_start, min(wave_start + wave_size, pages + 1))
+                urls = {number: f"{self.link}{path}{separator}page={number}" for number in numbers}
+                tasks = {number: asyncio.create_task(fetch(url)) for number, url in urls.items()}
+                try:
+                    # Результати хвилі - в порядку сторінок: зупинка на сторінці N скасовує сторінки після неї
+                    for number in numbers:
+                        hrefs = await tasks[number]
+                        if hrefs is None:
+                            continue
+                        if not hrefs or await collect(urls[number], hrefs):
+                            return
+                finally:
+                    for task in tasks.values():
+                        task.cancel()
+
+        await asyncio.gather(*(crawl(path) for path in start_paths))
+
+        logger.info(f"Загальна кількість унікальних посилань: {len(links)}")
+        logger.info(f"scrape_links завершено час: {time.time() - start_time:.2f} сек.")
+
+        return links
+
+    async def main_get_pages(self, pool: BrowserPool, queue: asyncio.Queue | None = None,
+                             known_ids: KnownIds | None = None, pages: int = 5,
+                             start_paths: tuple[str, ...] = ("/uk/list/",), concurrency: int = 5,
+                             high_water: set[str] | None = None, wave_size: int = 2):
         """
-        Забирає посилання на товари з вказаної кількості сторінок.
+        Основний метод, для скрапінгу посилань.
         """
         try:
-            links = set()
-            start_time = time.time()
-
-            for page_number in range(1, pages + 1):
-                url = f"{self.link}/uk/list/?page={page_number}"
-                await self.page.goto(url)
-
-                try:
-                    await self.page.wait_for_selector(
-                        "#mainContent > div > div.css-1nvt13t > form > div:nth-child(5) > div > div.css-j0t2x2",
-                        timeout=3000
-                    )
-                except TimeoutError:
-                    logger.warning(f"Елементи не знайдено на сторінці: {url}. Пропускаємо.")
-                    continue
-
-                cards = await self.page.query_selector_all('div[data-cy="l-card"] a.css-qo0cxu')
-                hrefs = await asyncio.gather(*(card.get_attribute("href") for card in cards))
-
-                links.update(filter(None, hrefs))
-
-            logger.info(f"Загальна кількість унікальних посилань: {len(links)}")
-            logger.info(f"scrape_links завершено час: {time.time() - start_time:.2f} сек.")
-
-            return links
-
+            return await self.scrape_links(pool, pages=pages, start_paths=start_paths, concurrency=concurrency,
+                                           queue=queue, known_ids=known_ids, high_water=high_water,
+                                           wave_size=wave_size)
         except Exception as e:
-            logger.error(f"Помилка під час скрапінгу посилань: {e}")
+            logger.error(f"Error during operation: {e}")
             return None
 
-    async def main_get_pages(self, playwright: Playwright):
+    async def visit(self, pool: BrowserPool, spec: tuple[Field, ...] = FIELD_SPEC) -> None:
         """
-        Основний метод, для скрапінгу посилань.
+        Одна спроба обробити сторінку: відкриття, cookies і поля spec. Помилки не перехоплюються -
+        їх класифікує і за потреби повторює with_retry.
+        Час на сторінку (від отримання сторінки з пулу) обмежений PAGE_TIME_BUDGET.
         """
         try:
-            await self._setup_browser(playwright)
-            await self._log_user_agent()
-            await self._accept_cookies()
-            links = await self.scrape_links()
-
-            return links
-        except Exception as e:
-            logger.error(f"Error during operation: {e}")
-            return None
+            async with pool.page() as page:
+                self.checked_out_at = time.monotonic()
+                # Етап сторінки - без очікування вільного слота пулу
+                with span("product_page"):
+                    budget = PageBudget()
+                    async with asyncio.timeout(budget.seconds):
+                        await self._setup_page(pool, page)
+                        await self._log_user_agent()
+                        await self._accept_cookies(pool.session is not None and pool.session.state is not None,
+                                                   budget)
+                        record = await self.get_fields(spec, budget)
+                        if missing := missing_fields(record, spec):
+                            raise SelectorMissingError(f"{self.link}: немає полів {', '.join(missing)}")
+                        if self.capture_html:
+                            self.html = await self.page.content()
+        except TimeoutError as e:
+            raise TimeoutError(f"перевищено бюджет сторінки {PAGE_TIME_BUDGET:.0f} сек.") from e
         finally:
-            await self._close_browser()
+            self.page = None
 
-    async def main_run(self, playwright: Playwright):
+    async def main_run(self, pool: BrowserPool, spec: tuple[Field, ...] = FIELD_SPEC,
+                       deadline: float | None = None) -> bool:
         """
-        Основний метод, який запускає всі етапи процесу.
+        Основний метод, який запускає всі етапи процесу (з повторами). Повертає True, якщо сторінку оброблено;
+        клас результату - у self.outcome (deadline - повтор не вклався в deadline).
+        Телефон тут не відкривається - його окремо у фоні отримує PhoneResolver.
         """
         start_time = time.time()
 
         try:
-            await self._setup_browser(playwright)
-            await self._log_user_agent()
-            await self._accept_cookies()
-            # await self._login()
-            logger.info(f"Працює без логінізації на сайті!", extra={'custom_color': True})
-            await self.get_seller()
-            # await asyncio.sleep(random.randint(2, 3))
-            await self.get_product()
-            await self.get_images()
-            await self.get_info()
-            # await asyncio.sleep(random.randint(2, 3))
-            await self.get_phone()
-
-            logger.info(f"main_run завершено: {time.time() - start_time:.2f} сек.")
-
+            await with_retry(lambda: self.visit(pool, spec), self.link, deadline=deadline)
         except Exception as e:
-            logger.error(f"Error during operation: {e}")
-
-
-async def fetch_product_data(email, password, product_link, link, db, semaphore, playwright, success_count):
-    async with semaphore:
-        runner = None
-
+            self.outcome = classify(e)
+            logger.error(f"Сторінку не оброблено ({self.outcome}): {e}", exc_info=self.outcome == ERROR)
+            return False
+
+        logger.info(f"main_run завершено: {time.time() - start_time:.2f} сек.")
+        self.outcome = "ok"
+        return True
+
+
+async def fetch_product_data(email, password, product_link, link, pool, limiter: AdaptiveLimiter,
+                             http: HttpScraper | None = None, http_spec: tuple[Field, ...] = (),
+                             deadline: float | None = None) -> dict | None:
+    """
+    Скрапить одну сторінку товару і повертає дані для запису в БД.
+    Кожна спроба займає слот limiter і повертає йому затримку (від отримання сторінки з пулу) і результат;
+    пауза між спробами (with_retry) слот не тримає.
+    Поля з http_spec беруться через HTTP-рушій, решта (lazy-поля) - через браузер.
+    Браузер не відкривається, лише якщо http_spec покриває весь FIELD_SPEC; з поточним FIELD_SPEC цього не буває:
+    views_count - lazy-поле з окремого XHR, тож навіть HTTP_FIELD_GROUPS=seller,product лишає його браузеру.
+    Якщо пауза запобіжника чи перед повтором не вкладається в deadline, кидає DeadlineExceededError -
+    посилання треба повернути в чергу.
+    """
+    runner = PlaywrightAsyncRunner(email, password, link + product_link)
+    runner.capture_html = page_archive is not None
+    url_token = url_var.set(runner.link)
+    try:
+        return await _fetch_product_data(runner, pool, limiter, http, http_spec, deadline)
+    finally:
+        record_page(runner.outcome or ERROR)
+        url_var.reset(url_token)
+
+
+async def _http_fields(runner: PlaywrightAsyncRunner, http: HttpScraper | None,
+                       http_spec: tuple[Field, ...]) -> tuple[Field, ...]:
+    """
+    Бере поля http_spec через HTTP-рушій і повертає поля, які залишилися для браузера.
+    """
+    if not (http and http_spec):
+        return FIELD_SPEC
+
+    record = await http.fetch_record(runner.link, http_spec)
+    if not record or missing_fields(record, http_spec):
+        return FIELD_SPEC
+    for group, values in record.items():
+        runner.data[group] = {**runner.data.get(group, {}), **values}
+    return tuple(f for f in FIELD_SPEC if f not in http_spec)
+
+
+async def _fetch_product_data(runner: PlaywrightAsyncRunner, pool, limiter: AdaptiveLimiter,
+                              http: HttpScraper | None, http_spec: tuple[Field, ...],
+                              deadline: float | None) -> dict | None:
+    link_prod = {"link": runner.link}
+    runner.data['product'] = {**runner.data.get('product', {}), **link_prod}
+    browser_spec = None
+
+    async def attempt() -> None:
+        nonlocal browser_spec
+        async with limiter.slot():
+            start_time = time.monotonic()
+            runner.outcome = ERROR
+            runner.checked_out_at = None
+            try:
+                if browser_spec is None:
+                    browser_spec = await _http_fields(runner, http, http_spec)
+                # Усі поля вже отримано через HTTP - сторінка браузера не потрібна
+                if browser_spec:
+                    await runner.visit(pool, browser_spec)
+                runner.outcome = "ok"
+            except Exception as e:
+                runner.outcome = classify(e)
+                raise
+            finally:
+                await limiter.record(time.monotonic() - (runner.checked_out_at or start_time), runner.outcome)
+
+    try:
+        await with_retry(attempt, runner.link, deadline=deadline)
+    except DeadlineExceededError as e:
+        runner.outcome = DEADLINE
+        logger.warning(f"Сторінку {runner.link} відкладено: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Помилка під час обробки продукту {runner.link} ({runner.outcome}): {e}",
+                     exc_info=runner.outcome == ERROR)
+        return None
+
+    site_id = runner.data.get('product', {}).get('site_id')
+    if page_archive and runner.html and site_id:
         try:
-            runner = PlaywrightAsyncRunner(email, password, link + product_link)
-            link_prod = {"link": runner.link}
-            runner.data['product'] = {**runner.data.get('product', {}), **link_prod}
-
-            await runner.main_run(playwright)
-
-            pprint(runner.data)
-            await save_data_to_db(runner.data, db)
-
-            success_count[0] += 1
-
-        except Exception as e:
-            logger.error(f"Помилка під час обробки продукту {product_link}: {e}", exc_info=True)
-        finally:
-            await runner.browser.close()
-
-
-async def playwright_async_run(email, password, link):
-    async with async_playwright() as playwright, get_db_context() as db:
-
-        start_time = time.time()
+            await asyncio.to_thread(page_archive.put, site_id, runner.link, runner.html)
+        except OSError as e:
+            logger.warning(f"Архів: не вдалося зберегти {runner.link}: {e}")
 
-        # 1. Для збору посилань на продукти
-        runner = PlaywrightAsyncRunner(email, password, link)
-        product_links = await runner.main_get_pages(playwright)
-
-        # 2. Паралельна обробка з обмеженням кількості одночасних запитів
-        if product_links:
-            semaphore = asyncio.Semaphore(3)
-            success_count = [0]
-            tasks = [
-                fetch_product_data(email, password, product_link, link, db, semaphore, playwright, success_count)
-                for product_link in list(product_links)
-            ]
-
-            await asyncio.gather(*tasks)
-
-            print("*" * 90)
-            logger.info(f"Всього товарів: {len(product_links)}.", extra={'custom_color': True})
-            logger.info(f"Записано товарів у базу даних:  {success_count[0]}", extra={'custom_color': True})
-            logger.info(f"Загальний час: {time.time() - start_time:.2f} сек.", extra={'custom_color': True})
-            print("*" * 90)
+    logger.debug(f"Дані товару {runner.link}: {runner.data}")
+    return runner.data
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, update
+
+from src.db.models import Product, Seller
+from src.db.session import get_db_context
+from src.repository.save_to_db import _product_values, _seller_values
+from src.repository.sellers import rekey_sellers, seller_key
+from src.services.extraction import FIELD_SPEC, extract_record_from_html
+from src.services.page_archive import ARCHIVE_DIR, ArchiveEntry, PageArchive
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+REPARSE_CHUNK_SIZE = 200
+REPARSE_BATCH_SIZE = 2000
+
+# Колонки, які оновлює повторний розбір (ідентичність рядка - site_id/seller_key - не змінюється)
+PRODUCT_COLUMNS = ("title", "price", "type", "is_olx_delivery", "info", "views_count", "description", "image_urls",
+                   "published_date", "price_amount", "price_currency", "price_negotiable", "views", "published_at",
+                   "image_list")
+SELLER_COLUMNS = ("name", "profile_url", "rating", "registered_date", "last_active_date", "location", "region",
+                  "registered_at", "last_active_at")
+
+
+def _reparse_chunk(root: str, entries: list[dict]) -> tuple[list[tuple[dict, dict]], list[str]]:
+    """
+    Виконується в окремому процесі: читає HTML з архіву і витягує поля тим самим FIELD_SPEC, що й скрапер.
+    Повертає пари (значення продукту, значення продавця) для bulk UPDATE і описи сторінок, які не вдалося
+    розібрати: логує їх батьківський процес (потік запису логів після fork у дочірньому процесі не працює).
+    """
+    archive = PageArchive(root)
+    rows, failures = [], []
+    for raw in entries:
+        entry = ArchiveEntry(**raw)
+        try:
+            record = extract_record_from_html(archive.read(entry), FIELD_SPEC)
+        except Exception as e:
+            failures.append(f"{entry.sha256} ({entry.url}): {e}")
+            continue
+
+        record.setdefault('product', {})['site_id'] = record['product'].get('site_id') or entry.site_id
+        record['product']['link'] = entry.url
+        record.setdefault('seller', {})
+
+        # Відносні дати ("Сьогодні о 10:00") рахуються від часу завантаження сторінки, а не від часу розбору
+        fetched_at = datetime.fromisoformat(entry.fetched_at)
+        product = {column: value for column, value in _product_values(record, None, fetched_at).items()
+                   if column in PRODUCT_COLUMNS or column == "site_id"}
+        # Порожні значення не затирають те, що вже є в БД
+        product["image_list"] = product["image_list"] or None
+        product["info"] = product["info"] or None
+
+        seller = {column: value for column, value in _seller_values(record, fetched_at).items()
+                  if column in SELLER_COLUMNS}
+        seller["seller_key"] = seller_key(record['seller'])
+        rows.append((product, seller))
+    return rows, failures
+
+
+def _coalesce_update(table, key: str, columns: tuple[str, ...]):
+    """
+    UPDATE ... SET col = coalesce(:b_col, col) WHERE key = :b_key - для executemany.
+    """
+    return (
+        update(table)
+        .where(table.c[key] == bindparam(f"b_{key}"))
+        .values({column: func.coalesce(bindparam(f"b_{column}", type_=table.c[column].type), table.c[column])
+                 for column in columns})
+    )
+
+
+PRODUCT_UPDATE = _coalesce_update(Product.__table__, "site_id", PRODUCT_COLUMNS)
+SELLER_UPDATE = _coalesce_update(Seller.__table__, "seller_key", SELLER_COLUMNS)
+
+
+async def _apply(rows: list[tuple[dict, dict]]) -> None:
+    products = [{f"b_{column}": value for column, value in product.items()} for product, _ in rows]
+    sellers = {seller["seller_key"]: {f"b_{column}": value for column, value in seller.items()} for _, seller in rows}
+
+    async with get_db_context() as db:
+        await db.execute(PRODUCT_UPDATE, products)
+        # Продавці, збережені ще під ключем h:..., отримують olx-ключ - інакше UPDATE їх не знайде
+        await rekey_sellers(db, {seller["seller_key"]: seller for _, seller in rows})
+        await db.execute(SELLER_UPDATE, [sellers[key] for key in sorted(sellers)])
+        await db.commit()
+
+
+async def reparse_archive(root: str = ARCHIVE_DIR, since: str | None = None, workers: int | None = None,
+                          chunk_size: int = REPARSE_CHUNK_SIZE, batch_size: int = REPARSE_BATCH_SIZE,
+                          dry_run: bool = False) -> int:
+    """
+    Повторно розбирає останню збережену версію кожного оголошення з архіву пулом процесів
+    і пакетно оновлює products/sellers. Без мережі і браузера. Повертає кількість розібраних сторінок.
+    """
+    start_time = time.time()
+    entries = [asdict(entry) for entry in PageArchive(root).latest(since).values()]
+    logger.info(f"Reparse: сторінок в архіві: {len(entries)}, процесів: {workers or os.cpu_count()}")
+
+    loop = asyncio.get_running_loop()
+    parsed, failed, buffer = 0, 0, []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [loop.run_in_executor(executor, _reparse_chunk, root, entries[start:start + chunk_size])
+                   for start in range(0, len(entries), chunk_size)]
+
+        for future in asyncio.as_completed(futures):
+            rows, failures = await future
+            for failure in failures:
+                logger.warning(f"Reparse: не вдалося розібрати {failure}")
+            parsed += len(rows)
+            failed += len(failures)
+            buffer.extend(rows)
+            if len(buffer) >= batch_size:
+                if not dry_run:
+                    await _apply(buffer)
+                buffer = []
+
+    if buffer and not dry_run:
+        await _apply(buffer)
+
+    elapsed = time.time() - start_time
+    logger.info(f"Reparse: розібрано {parsed} сторінок за {elapsed:.2f} сек. "
+                f"({parsed / elapsed if elapsed else 0:.0f} стор./сек.), помилок розбору: {failed}",
+                extra={'custom_color': True})
+    return parsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Повторний розбір архіву сторінок і оновлення БД")
+    parser.add_argument("--archive", default=ARCHIVE_DIR, help="каталог архіву")
+    parser.add_argument("--since", help="лише сторінки, завантажені від дати (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, help="кількість процесів (за замовчуванням - кількість ядер)")
+    parser.add_argument("--chunk-size", type=int, default=REPARSE_CHUNK_SIZE, help="сторінок на задачу процесу")
+    parser.add_argument("--dry-run", action="store_true", help="лише розібрати, без запису в БД")
+    args = parser.parse_args()
+
+    asyncio.run(reparse_archive(args.archive, args.since, args.workers, args.chunk_size, dry_run=args.dry_run))
@@ -0,0 +1,254 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+from dotenv import load_dotenv
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from src.services.metrics import CIRCUIT_STATE, record_retry
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+load_dotenv()
+
+T = TypeVar("T")
+
+BLOCKED_STATUSES = {403, 429}
+
+# Класи помилок (вони ж - результати сторінки для AdaptiveLimiter і olx_product_pages_total)
+TIMEOUT = "timeout"
+NAVIGATION = "navigation"
+BLOCKED = "blocked"
+SELECTOR_MISSING = "selector_missing"
+DEADLINE = "deadline"
+ERROR = "error"
+
+# Повтори: скільки всього спроб для кожного класу і межі експоненційної паузи з jitter (сек.)
+RETRY_TIMEOUT_ATTEMPTS = int(os.getenv("RETRY_TIMEOUT_ATTEMPTS", 2))
+RETRY_NAVIGATION_ATTEMPTS = int(os.getenv("RETRY_NAVIGATION_ATTEMPTS", 3))
+RETRY_SELECTOR_ATTEMPTS = int(os.getenv("RETRY_SELECTOR_ATTEMPTS", 2))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", 1))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", 15))
+
+# Запобіжник: пауза, коли частка blocked серед спроб за BREAKER_WINDOW сек. сягає BREAKER_BLOCK_RATE
+BREAKER_BLOCK_RATE = float(os.getenv("BREAKER_BLOCK_RATE", 0.3))
+BREAKER_MIN_SAMPLES = int(os.getenv("BREAKER_MIN_SAMPLES", 10))
+BREAKER_WINDOW = float(os.getenv("BREAKER_WINDOW", 60))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", 60))
+BREAKER_MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", 600))
+
+# Помилки Playwright, що означають збій мережі або переходу, а не самої сторінки
+_NAVIGATION_MARKERS = ("NS_ERROR_", "NS_BINDING_ABORTED", "net::ERR_", "interrupted by another navigation")
+
+
+class BlockedError(Exception):
+    """
+    Сайт обмежив доступ: HTTP 403/429 або сторінка з captcha.
+    """
+
+
+class SelectorMissingError(Exception):
+    """
+    На сторінці немає обов'язкових елементів: вона не відрендерилася до кінця або змінилася верстка.
+    """
+
+
+class DeadlineExceededError(Exception):
+    """
+    Наступна спроба (пауза запобіжника або перед повтором) не вкладається в deadline прогону:
+    посилання не зіпсоване, його варто повернути в чергу без штрафу.
+    """
+
+
+def classify(error: BaseException) -> str:
+    """
+    Клас помилки спроби: timeout | navigation | blocked | selector_missing | deadline | error.
+    """
+    if isinstance(error, DeadlineExceededError):
+        return DEADLINE
+    if isinstance(error, BlockedError):
+        return BLOCKED
+    if isinstance(error, SelectorMissingError):
+        return SELECTOR_MISSING
+    # TimeoutError Playwright не є нащадком вбудованого TimeoutError (його кидає asyncio.timeout бюджету сторінки)
+    if isinstance(error, (PlaywrightTimeoutError, TimeoutError)):
+        return TIMEOUT
+    if isinstance(error, PlaywrightError) and any(marker in str(error) for marker in _NAVIGATION_MARKERS):
+        return NAVIGATION
+    return ERROR
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    attempts - загальна кількість спроб (1 - без повтору).
+    Пауза перед повтором: випадкова від 0 до base * 2^n, але не більше cap (full jitter),
+    щоб паралельні воркери не поверталися на сайт одночасно.
+    """
+    attempts: int
+    base: float = RETRY_BASE_DELAY
+    cap: float = RETRY_MAX_DELAY
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.cap, self.base * 2 ** retry))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+# blocked не повторюється одразу: паузу дає запобіжник, а посилання повертається в crawl_queue з backoff.
+# error - непередбачена помилка (найчастіше в нашому коді), повтор її не виправить
+RETRY_POLICIES: dict[str, RetryPolicy] = {
+    TIMEOUT: RetryPolicy(RETRY_TIMEOUT_ATTEMPTS),
+    NAVIGATION: RetryPolicy(RETRY_NAVIGATION_ATTEMPTS),
+    SELECTOR_MISSING: RetryPolicy(RETRY_SELECTOR_ATTEMPTS, base=RETRY_BASE_DELAY / 2),
+    BLOCKED: NO_RETRY,
+    ERROR: NO_RETRY,
+}
+
+
+class CircuitBreaker:
+    """
+    Запобіжник у межах процесу, спільний для сторінок списку і товарів.
+    Якщо серед спроб за останні window сек. (не менше min_samples) частка blocked сягла threshold,
+    нові спроби чекають cooldown. Після паузи проходить одна пробна спроба: успіх закриває запобіжник,
+    повторне блокування відкриває його знову з удвічі довшою паузою (не більше max_cooldown).
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+    _GAUGE = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+    def __init__(self, threshold: float = BREAKER_BLOCK_RATE, min_samples: int = BREAKER_MIN_SAMPLES,
+                 window: float = BREAKER_WINDOW, cooldown: float = BREAKER_COOLDOWN,
+                 max_cooldown: float = BREAKER_MAX_COOLDOWN, probe_interval: float = 1.0):
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.window = window
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_interval = probe_interval
+
+        self.state = self.CLOSED
+        self.trips = 0
+        self._samples: deque[tuple[float, bool]] = deque()
+        self._open_until = 0.0
+        self._probing = False
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.set(self._GAUGE[state])
+
+    def block_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, blocked in self._samples if blocked) / len(self._samples)
+
+    def _open(self, now: float, reason: str) -> None:
+        self.trips += 1
+        pause = min(self.max_cooldown, self.cooldown * 2 ** (self.trips - 1)) * random.uniform(1.0, 1.2)
+        self._open_until = now + pause
+        self._samples.clear()
+        self._set_state(self.OPEN)
+        logger.warning(f"Запобіжник: {reason}, пауза скрапінгу {pause:.0f} сек.", extra={'custom_color': True})
+
+    def _close(self) -> None:
+        self.trips = 0
+        self._set_state(self.CLOSED)
+        logger.info("Запобіжник: пробна сторінка пройшла, скрапінг продовжується", extra={'custom_color': True})
+
+    async def wait(self, deadline: float | None = None) -> None:
+        """
+        Чекає, поки спробу можна виконати. Після паузи пропускає лише одну пробну спробу.
+        Якщо пауза закінчиться не раніше deadline (time.monotonic), одразу кидає DeadlineExceededError.
+        """
+        while True:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now < self._open_until:
+                    _check_deadline(deadline, self._open_until, "пауза запобіжника")
+                    await asyncio.sleep(self._open_until - now)
+                    continue
+                self._set_state(self.HALF_OPEN)
+                self._probing = False
+            if not self._probing:
+                self._probing = True
+                return
+            _check_deadline(deadline, now + self.probe_interval, "очікування пробної спроби")
+            await asyncio.sleep(self.probe_interval)
+
+    def record(self, blocked: bool) -> None:
+        """
+        Результат однієї спроби: blocked - сайт обмежив доступ.
+        """
+        now = time.monotonic()
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+            if blocked:
+                self._open(now, "пробну сторінку знову заблоковано")
+            else:
+                self._close()
+            return
+        # Спроби, розпочаті до паузи, на неї вже не впливають
+        if self.state == self.OPEN:
+            return
+
+        self._samples.append((now, blocked))
+        while self._samples and self._samples[0][0] < now - self.window:
+            self._samples.popleft()
+        if blocked and len(self._samples) >= self.min_samples and self.block_rate() >= self.threshold:
+            self._open(now, f"заблоковано {self.block_rate():.0%} з {len(self._samples)} спроб "
+                            f"за {self.window:.0f} сек.")
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "trips": self.trips, "block_rate": round(self.block_rate(), 3)}
+
+
+def _check_deadline(deadline: float | None, until: float, what: str) -> None:
+    if deadline is not None and until >= deadline:
+        raise DeadlineExceededError(f"{what}: ще {until - time.monotonic():.0f} сек., довше за залишок прогону")
+
+
+circuit_breaker = CircuitBreaker()
+
+
+async def with_retry(operation: Callable[[], Awaitable[T]], what: str,
+                     breaker: CircuitBreaker | None = circuit_breaker,
+                     policies: dict[str, RetryPolicy] = RETRY_POLICIES, deadline: float | None = None) -> T:
+    """
+    Виконує operation з повторами за класом помилки (policies). Перед кожною спробою чекає на breaker
+    і повідомляє йому результат. Якщо спроби вичерпано, прокидає останній виняток.
+    deadline (time.monotonic): пауза запобіжника чи перед повтором, що закінчується після нього, не чекається -
+    кидається DeadlineExceededError.
+    """
+    attempt = 0
+    while True:
+        if breaker:
+            await breaker.wait(deadline)
+        try:
+            result = await operation()
+        except Exception as e:
+            error = classify(e)
+            if breaker:
+                breaker.record(error == BLOCKED)
+            attempt += 1
+            policy = policies.get(error, NO_RETRY)
+            if attempt >= policy.attempts:
+                raise
+            delay = policy.delay(attempt - 1)
+            try:
+                _check_deadline(deadline, time.monotonic() + delay, f"{what}: пауза перед повтором ({error})")
+            except DeadlineExceededError as deadline_error:
+                raise deadline_error from e
+            record_retry(error)
+            logger.warning(f"{what}: {error} ({e}), спроба {attempt + 1}/{policy.attempts} "
+                           f"через {delay:.1f} сек.")
+            await asyncio.sleep(delay)
+        else:
+            if breaker:
+                breaker.record(False)
+            return result
@@ -0,0 +1,234 @@
+import asyncio
+import os
+import time
+from contextlib import AsyncExitStack
+from datetime import date, datetime, timedelta
+
+from dotenv import load_dotenv
+from playwright.async_api import async_playwright
+
+from src.repository import observations
+from src.repository.observations import DueRevisit
+from src.services.browser_pool import BrowserPool
+from src.services.extraction import FIELD_SPEC, split_spec
+from src.services.http_service import HttpScraper
+from src.services.normalize import parse_int, parse_price
+from src.services.pipeline import BROWSER_HEADLESS, HTTP_POOL_LIMIT, LOAD_PROFILE, new_session
+from src.services.playwright_service import PlaywrightAsyncRunner
+from src.services.resilience import DEADLINE
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+load_dotenv()
+
+# Скільки оголошень переглядати повторно за хвилину (0 - вимкнено) і скільки одночасно
+REVISIT_BUDGET = int(os.getenv("REVISIT_BUDGET", 20))
+REVISIT_CONCURRENCY = int(os.getenv("REVISIT_CONCURRENCY", 4))
+# Час на один тік (сек.): не встигнуті продукти повертаються в розклад на наступний тік
+REVISIT_TIME_BUDGET = float(os.getenv("REVISIT_TIME_BUDGET", 50))
+# Інтервали між відвідуваннями (хв.) і вік оголошення, після якого воно випадає з розкладу (год.)
+REVISIT_MIN_INTERVAL = float(os.getenv("REVISIT_MIN_INTERVAL", 15))
+REVISIT_MAX_INTERVAL = float(os.getenv("REVISIT_MAX_INTERVAL", 24 * 60))
+REVISIT_MAX_AGE = float(os.getenv("REVISIT_MAX_AGE", 7 * 24))
+REVISIT_MAX_FAILURES = int(os.getenv("REVISIT_MAX_FAILURES", 3))
+# 0 - лише HTTP (ціна), без браузера; перегляди підвантажуються скриптом і потребують браузера
+REVISIT_BROWSER = os.getenv("REVISIT_BROWSER", "1") == "1"
+OBSERVATION_PARTITIONS_AHEAD = int(os.getenv("OBSERVATION_PARTITIONS_AHEAD", 2))
+
+REVISIT_SPEC = tuple(field for field in FIELD_SPEC if field.name in ("price", "views_count"))
+
+# Продукт не встигли відвідати в межах тіку - не помилка, просто переноситься на наступний
+_SKIPPED = "skipped"
+
+
+def plan_next(revisit: DueRevisit, views: int | None, now: datetime, min_interval: timedelta,
+              max_interval: timedelta) -> dict:
+    """
+    Новий розклад після успішного спостереження.
+    Свіжі оголошення та ті, що швидко набирають перегляди, отримують коротший інтервал і вищий пріоритет.
+    now - час БД (observations.db_now), як і решта дат розкладу.
+    """
+    views_per_hour = revisit.views_per_hour
+    if views is not None and revisit.last_views is not None and revisit.last_observed_at:
+        hours = (now - revisit.last_observed_at).total_seconds() / 3600
+        if hours > 0:
+            views_per_hour = max(views - revisit.last_views, 0) / hours
+
+    age_hours = max((now - (revisit.published_at or revisit.first_observed_at)).total_seconds() / 3600, 0)
+    growth = views_per_hour or 0
+    interval = min_interval * (1 + age_hours / 6) / (1 + growth / 10)
+
+    return {
+        "product_id": revisit.product_id,
+        "next_revisit_at": now + min(max(interval, min_interval), max_interval),
+        "priority": growth + 100 / (1 + age_hours),
+        "last_observed_at": now,
+        "last_views": views if views is not None else revisit.last_views,
+        "views_per_hour": views_per_hour,
+        "failures": 0,
+    }
+
+
+class RevisitScheduler:
+    """
+    Повторні відвідування вже збережених оголошень: записує перегляди і ціну в product_observations.
+    За тік бере не більше budget продуктів у порядку пріоритету. Ціна береться через HTTP-рушій,
+    браузер відкривається лише для переглядів (lazy-поле).
+    HTTP-клієнт і пул браузера запускаються на першому тіку і живуть між тіками; після помилки тіку
+    вони перезапускаються, а при зупинці застосунку їх закриває close().
+    Таблиця products не змінюється.
+    """
+
+    def __init__(self, email, password, link, budget: int = REVISIT_BUDGET, concurrency: int = REVISIT_CONCURRENCY,
+                 time_budget: float = REVISIT_TIME_BUDGET, use_browser: bool = REVISIT_BROWSER,
+                 min_interval: timedelta = timedelta(minutes=REVISIT_MIN_INTERVAL),
+                 max_interval: timedelta = timedelta(minutes=REVISIT_MAX_INTERVAL),
+                 max_age: timedelta = timedelta(hours=REVISIT_MAX_AGE),
+                 lease: timedelta = timedelta(minutes=5)):
+        self.email = email
+        self.password = password
+        self.link = link
+        self.budget = budget
+        self.concurrency = concurrency
+        self.time_budget = time_budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_age = max_age
+        self.lease = lease
+        self.http_spec, self.browser_spec = split_spec({"product"}, REVISIT_SPEC)
+        if not use_browser:
+            self.browser_spec = ()
+        self.seeded_up_to: int | None = None
+        self._partitions_day: date | None = None
+        self._lock = asyncio.Lock()
+        self._stack: AsyncExitStack | None = None
+        self._http: HttpScraper | None = None
+        self._pool: BrowserPool | None = None
+
+    async def tick(self) -> None:
+        if self._lock.locked():
+            logger.warning("Revisit: попередній тік ще триває, пропускаємо")
+            return
+
+        async with self._lock:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.error(f"Revisit: тік завершився з помилкою: {e}", exc_info=True)
+                await self._close()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close()
+
+    async def _close(self) -> None:
+        if self._stack:
+            stack, self._stack, self._http, self._pool = self._stack, None, None, None
+            try:
+                await stack.aclose()
+            except Exception as e:
+                logger.warning(f"Revisit: помилка при закритті браузера: {e}")
+
+    async def _resources(self) -> tuple[HttpScraper | None, BrowserPool | None]:
+        """
+        HTTP-клієнт і пул браузера, спільні для всіх тіків.
+        """
+        if self._stack is None:
+            stack = AsyncExitStack()
+            try:
+                if self.http_spec:
+                    self._http = await stack.enter_async_context(HttpScraper(limit=HTTP_POOL_LIMIT))
+                if self.browser_spec:
+                    playwright = await stack.enter_async_context(async_playwright())
+                    self._pool = await stack.enter_async_context(
+                        BrowserPool(playwright, size=1, contexts_per_browser=self.concurrency,
+                                    headless=BROWSER_HEADLESS, load_profile=LOAD_PROFILE,
+                                    session=new_session(self.email, self.password, self.link)))
+            except BaseException:
+                self._http = self._pool = None
+                await stack.aclose()
+                raise
+            self._stack = stack
+        return self._http, self._pool
+
+    async def _tick(self) -> None:
+        start_time = time.monotonic()
+
+        # Секції і розклад - за годинником БД, а не процесу
+        today = (await observations.db_now()).date()
+        if self._partitions_day != today:
+            await observations.ensure_partitions(OBSERVATION_PARTITIONS_AHEAD, today)
+            self._partitions_day = today
+
+        if self.seeded_up_to is None:
+            self.seeded_up_to = await observations.last_seeded_id()
+        self.seeded_up_to = await observations.seed_revisits(self.seeded_up_to, self.max_age)
+
+        due = await observations.claim_due(self.budget, self.lease)
+        if not due:
+            return
+
+        deadline = start_time + self.time_budget
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        http, pool = await self._resources()
+        results = await asyncio.gather(*(self._observe(revisit, http, pool, semaphore, deadline)
+                                          for revisit in due))
+
+        await self._save(due, results)
+        visited = sum(isinstance(result, dict) for result in results)
+        logger.info(f"Revisit: відвідано {visited}/{len(due)} "
+                    f"за {time.monotonic() - start_time:.2f} сек.", extra={'custom_color': True})
+
+    async def _observe(self, revisit: DueRevisit, http: HttpScraper | None, pool: BrowserPool | None,
+                       semaphore: asyncio.Semaphore, deadline: float) -> dict | str | None:
+        """
+        Найдешевший шлях: HTTP для звичайних полів, браузер лише для lazy-полів.
+        """
+        async with semaphore:
+            if time.monotonic() >= deadline:
+                return _SKIPPED
+
+            product = {}
+            if http:
+                record = await http.fetch_record(revisit.url, self.http_spec)
+                product.update((record or {}).get("product", {}))
+
+            if pool:
+                runner = PlaywrightAsyncRunner(self.email, self.password, revisit.url)
+                if await runner.main_run(pool, self.browser_spec, deadline):
+                    product.update(runner.data.get("product", {}))
+                elif runner.outcome == DEADLINE:
+                    return _SKIPPED
+
+            return product or None
+
+    async def _save(self, due: list[DueRevisit], results: list[dict | str | None]) -> None:
+        now = await observations.db_now()
+        rows, schedule, dropped = [], [], []
+
+        for revisit, product in zip(due, results):
+            if product == _SKIPPED:
+                schedule.append({"product_id": revisit.product_id, "next_revisit_at": now})
+                continue
+            if product is None:
+                failures = revisit.failures + 1
+                if failures >= REVISIT_MAX_FAILURES:
+                    dropped.append(revisit.product_id)
+                else:
+                    schedule.append({"product_id": revisit.product_id, "failures": failures,
+                                     "next_revisit_at": now + self.min_interval * 2 ** failures})
+                continue
+
+            views = parse_int(product.get("views_count"))
+            amount, currency, _ = parse_price(product.get("price"))
+            rows.append({"product_id": revisit.product_id, "observed_at": now, "views": views,
+                         "price_amount": amount, "price_currency": currency})
+
+            if now - (revisit.published_at or revisit.first_observed_at) > self.max_age:
+                dropped.append(revisit.product_id)
+            else:
+                schedule.append(plan_next(revisit, views, now, self.min_interval, self.max_interval))
+
+        await observations.record_observations(rows, schedule)
+        await observations.drop_revisits(dropped)
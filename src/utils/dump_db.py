@@ -1,54 +1,239 @@
-import psycopg2
+import asyncio
+import gzip
+import hashlib
+import json
 import os
+import shutil
+from datetime import datetime, timedelta
+
+import psycopg2
 from dotenv import load_dotenv
-from datetime import datetime
 from psycopg2 import sql
 
+from src.services.normalize import KYIV_TZ
 from src.utils.py_logger import get_logger
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 logger = get_logger(__name__)
 
 load_dotenv()
 
+DUMP_DIR = os.path.join(os.getcwd(), 'dumps')
+# zstd (потрібен пакет zstandard) або gzip
+DUMP_COMPRESSION = os.getenv("DUMP_COMPRESSION", "zstd")
+# Повний дамп раз на N днів, між ними - інкрементальні (лише змінені рядки)
+DUMP_FULL_EVERY_DAYS = int(os.getenv("DUMP_FULL_EVERY_DAYS", 7))
+# Скільки повних дампів зберігати; інкрементальні старші за найстаріший збережений повний видаляються
+DUMP_KEEP_FULL = int(os.getenv("DUMP_KEEP_FULL", 4))
+
+# Таблиці в порядку залежностей і колонка-watermark для інкрементальних дампів (None - завжди повністю)
+DUMP_TABLES = {
+    'sellers': 'updated_at',
+    'products': 'updated_at',
+    'product_observations': 'observed_at',
+    'product_revisits': None,
+    'crawl_queue': 'updated_at',
+}
+
+# Первинні ключі: за ними споживач застосовує інкрементальний дамп як upsert
+DUMP_KEYS = {
+    'sellers': ['id'],
+    'products': ['id'],
+    'product_observations': ['id', 'observed_at'],
+    'product_revisits': ['product_id'],
+    'crawl_queue': ['id'],
+}
+
+# Перекриття інкрементальних дампів (сек.): рядок, позначений до watermark, але закомічений після знімка,
+# потрапить у наступний дамп. Має бути більшим за найдовшу транзакцію запису
+DUMP_WATERMARK_OVERLAP = float(os.getenv("DUMP_WATERMARK_OVERLAP", 600))
+
+MANIFEST_NAME = 'manifest.json'
+
 
-async def create_dump():
+class _HashingWriter:
+    """
+    Файл-обгортка: рахує sha256 і розмір стиснених даних під час запису.
+    """
 
-    connection = psycopg2.connect(
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.raw.write(data)
+
+    def flush(self) -> None:
+        self.raw.flush()
+
+
+def _compression() -> str:
+    if DUMP_COMPRESSION == "zstd" and zstandard is None:
+        logger.warning("Пакет zstandard не встановлено, дамп стискається gzip")
+        return "gzip"
+    return DUMP_COMPRESSION if DUMP_COMPRESSION in ("zstd", "gzip") else "gzip"
+
+
+def _open_compressed(writer: _HashingWriter, compression: str):
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).stream_writer(writer, closefd=False)
+    return gzip.GzipFile(fileobj=writer, mode='wb', compresslevel=6)
+
+
+def connect():
+    return psycopg2.connect(
         dbname=os.getenv('POSTGRES_DB_NAME'),
         user=os.getenv('POSTGRES_USER'),
         password=os.getenv('POSTGRES_PASSWORD'),
         host=os.getenv('POSTGRES_DOMAIN'),
-        port=os.getenv('POSTGRES_PORT')
+        port=os.getenv('POSTGRES_PORT'),
+        # Та сама часова зона сесії, що й у застосунку: watermark (localtimestamp) порівнюється з updated_at
+        options=f"-c timezone={KYIV_TZ.key}"
+    )
+
+
+def _manifests(dump_dir: str = DUMP_DIR) -> list[tuple[str, dict]]:
+    """
+    Маніфести наявних дампів, від найстарішого до найновішого.
+    """
+    if not os.path.isdir(dump_dir):
+        return []
+
+    manifests = []
+    for name in sorted(os.listdir(dump_dir)):
+        path = os.path.join(dump_dir, name, MANIFEST_NAME)
+        try:
+            with open(path) as manifest_file:
+                manifests.append((os.path.join(dump_dir, name), json.load(manifest_file)))
+        except (OSError, ValueError):
+            continue
+    return sorted(manifests, key=lambda item: item[1]['started_at'])
+
+
+def _copy_table(cursor, table: str, where: sql.Composable, params: tuple, path: str, compression: str) -> dict:
+    """
+    Стрімить COPY таблиці у стиснений CSV і повертає запис для маніфесту.
+    """
+    query = sql.SQL("COPY (SELECT * FROM {table}{where}) TO STDOUT WITH CSV HEADER").format(
+        table=sql.Identifier(table), where=where,
     )
+    with open(path, 'wb') as raw:
+        writer = _HashingWriter(raw)
+        with _open_compressed(writer, compression) as compressed:
+            cursor.copy_expert(cursor.mogrify(query, params).decode(), compressed)
+
+    return {"file": os.path.basename(path), "rows": cursor.rowcount, "bytes": writer.size,
+            "sha256": writer.sha256.hexdigest()}
+
+
+def create_dump(full: bool | None = None, dump_dir: str = DUMP_DIR) -> str:
+    """
+    Синхронно створює дамп усіх таблиць у dumps/<full|incremental>_<час>/ з маніфестом.
+    full=None - повний, якщо останній повний старший за DUMP_FULL_EVERY_DAYS днів (або його немає),
+    інакше інкрементальний: рядки, змінені після watermark попереднього дампу мінус DUMP_WATERMARK_OVERLAP.
+    Всі таблиці читаються в одній REPEATABLE READ транзакції (узгоджений знімок). Watermark - час БД
+    на початку цієї транзакції (тим самим годинником пишуться updated_at), а не час процесу.
+    Рядки з перекриття можуть повторюватися в сусідніх дампах - споживач застосовує їх як upsert за "key".
+    Видалення інкрементальні дампи не фіксують: рядки, прибрані очищенням crawl_queue (frontier.purge)
+    чи виключенням з розкладу product_revisits (drop_revisits), лишаються у споживача, який лише застосовує
+    upsert, доки він не завантажить наступний повний дамп.
+    Повертає шлях до дампу.
+    """
+    _check_keep_full(DUMP_KEEP_FULL)
+    started_at = datetime.now()
+    manifests = _manifests(dump_dir)
+    fulls = [manifest for _, manifest in manifests if manifest['kind'] == 'full']
+
+    if full is None:
+        full = not fulls or started_at - datetime.fromisoformat(fulls[-1]['started_at']) \
+            >= timedelta(days=DUMP_FULL_EVERY_DAYS)
+    since = None
+    if not full and manifests:
+        since = (datetime.fromisoformat(manifests[-1][1]['watermark'])
+                 - timedelta(seconds=DUMP_WATERMARK_OVERLAP)).isoformat()
 
-    cursor = connection.cursor()
+    kind = 'full' if full else 'incremental'
+    compression = _compression()
+    extension = 'csv.zst' if compression == 'zstd' else 'csv.gz'
+    path = os.path.join(dump_dir, f"{kind}_{started_at.strftime('%Y-%m-%d_%H-%M-%S')}")
+    os.makedirs(path, exist_ok=True)
 
-    dump_dir = os.path.join(os.getcwd(), 'dumps')
-    os.makedirs(dump_dir, exist_ok=True)
-    dump_file_path = os.path.join(dump_dir, f"db_dump_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.csv")
+    manifest = {"kind": kind, "started_at": started_at.isoformat(), "since": since, "watermark": None,
+                "overlap_seconds": DUMP_WATERMARK_OVERLAP, "compression": compression, "tables": {}}
 
+    connection = connect()
     try:
-        with open(dump_file_path, 'w', newline='') as dump_file:
-            cursor.copy_expert(
-                sql.SQL("COPY (SELECT * FROM products) TO STDOUT WITH CSV HEADER"),
-                dump_file
-            )
+        connection.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with connection.cursor() as cursor:
+            # Перший запит транзакції фіксує знімок; localtimestamp - той самий тип, що й колонки watermark
+            cursor.execute("SELECT localtimestamp")
+            manifest["watermark"] = cursor.fetchone()[0].isoformat()
 
-    except Exception as e:
-        print(f"Error during dump creation: {e}")
+            for table, column in DUMP_TABLES.items():
+                where, params = sql.SQL(""), ()
+                if since and column:
+                    where, params = sql.SQL(" WHERE {column} > %s").format(column=sql.Identifier(column)), (since,)
 
+                manifest["tables"][table] = _copy_table(
+                    cursor, table, where, params, os.path.join(path, f"{table}.{extension}"), compression
+                )
+                manifest["tables"][table]["key"] = DUMP_KEYS[table]
+        connection.rollback()
+    except Exception:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
     finally:
-        cursor.close()
         connection.close()
 
+    manifest["finished_at"] = datetime.now().isoformat()
+    with open(os.path.join(path, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    apply_retention(dump_dir)
+    return path
+
+
+def _check_keep_full(keep_full: int) -> None:
+    # Інкрементальні дампи застосовуються поверх повного: без жодного повного їх нема до чого застосувати
+    if keep_full < 1:
+        raise ValueError(f"DUMP_KEEP_FULL має бути не менше 1, отримано {keep_full}")
+
+
+def apply_retention(dump_dir: str = DUMP_DIR, keep_full: int = DUMP_KEEP_FULL) -> list[str]:
+    """
+    Залишає keep_full (не менше 1) останніх повних дампів і інкрементальні після найстарішого з них.
+    Повертає видалені шляхи.
+    """
+    _check_keep_full(keep_full)
+    manifests = _manifests(dump_dir)
+    fulls = [manifest for _, manifest in manifests if manifest['kind'] == 'full']
+    if len(fulls) <= keep_full:
+        return []
+
+    oldest_kept = fulls[-keep_full]['started_at']
+    removed = [path for path, manifest in manifests if manifest['started_at'] < oldest_kept]
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+    if removed:
+        logger.info(f"Дампи: видалено старих дампів: {len(removed)}")
+    return removed
+
+
 async def create_db_dump():
     """Функція для створення дампа бази даних"""
     try:
-        dump_file_path = await create_dump()
-        logger.info(f"Database dump created successfully at {dump_file_path}")
+        dump_path = await asyncio.to_thread(create_dump)
+        logger.info(f"Database dump created successfully at {dump_path}")
     except Exception as e:
         logger.error(f"Error creating database dump: {e}")
 
 
 if __name__ == "__main__":
-    create_dump()
+    print(create_dump())
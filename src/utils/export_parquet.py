@@ -0,0 +1,144 @@
+import argparse
+import os
+import time
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.dump_db import connect
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+EXPORT_DIR = os.path.join(os.getcwd(), 'exports')
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 20000))
+# Рядки без дати публікації (Hive-конвенція для порожнього ключа секції)
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+EXPORT_QUERY = """
+    SELECT p.id, p.site_id, p.title, p.type, p.description, p.product_url,
+           p.price, p.price_amount, p.price_currency, p.price_negotiable,
+           p.views, p.published_at, p.is_olx_delivery = 'YES' AS olx_delivery,
+           p.image_list, p.info, p.created_at,
+           s.id AS seller_id, s.name AS seller_name, s.phone_number AS seller_phone, s.rating AS seller_rating,
+           s.location AS seller_location, s.region AS seller_region,
+           s.registered_at AS seller_registered_at, s.last_active_at AS seller_last_active_at
+    FROM products p
+    JOIN sellers s ON s.id = p.seller_id
+    {where}
+    ORDER BY p.published_at NULLS LAST, p.id
+"""
+
+SCHEMA = pa.schema([
+    ("id", pa.int32()),
+    ("site_id", pa.string()),
+    ("title", pa.string()),
+    ("type", pa.string()),
+    ("description", pa.string()),
+    ("product_url", pa.string()),
+    ("price", pa.string()),
+    ("price_amount", pa.decimal128(14, 2)),
+    ("price_currency", pa.string()),
+    ("price_negotiable", pa.bool_()),
+    ("views", pa.int32()),
+    ("published_at", pa.timestamp("us")),
+    ("olx_delivery", pa.bool_()),
+    ("image_list", pa.list_(pa.string())),
+    ("info", pa.map_(pa.string(), pa.string())),
+    ("created_at", pa.timestamp("us")),
+    ("seller_id", pa.int32()),
+    ("seller_name", pa.string()),
+    ("seller_phone", pa.string()),
+    ("seller_rating", pa.string()),
+    ("seller_location", pa.string()),
+    ("seller_region", pa.string()),
+    ("seller_registered_at", pa.timestamp("us")),
+    ("seller_last_active_at", pa.timestamp("us")),
+])
+
+
+def _partition(published_at: datetime | None) -> str:
+    return published_at.date().isoformat() if published_at else NULL_PARTITION
+
+
+def _to_table(rows: list[tuple]) -> pa.Table:
+    """
+    Рядки курсора -> Arrow-таблиця; info (JSON) стає map<string, string>.
+    """
+    columns = list(zip(*rows))
+    info_index = SCHEMA.get_field_index("info")
+    columns[info_index] = [
+        [(str(key), None if value is None else str(value)) for key, value in info.items()]
+        if isinstance(info, dict) else None
+        for info in columns[info_index]
+    ]
+    return pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(columns, SCHEMA)],
+                                schema=SCHEMA)
+
+
+def export_parquet(out_dir: str | None = None, since: date | None = None,
+                   chunk_size: int = EXPORT_CHUNK_SIZE) -> str:
+    """
+    Експортує products + sellers у Parquet, секціонований за днем публікації: <out_dir>/published_day=YYYY-MM-DD/.
+    Дані читаються серверним курсором по chunk_size рядків у порядку published_at, тож одночасно
+    в пам'яті один пакет і відкритий лише один ParquetWriter - пам'ять не залежить від розміру таблиці.
+    since - лише оголошення, опубліковані від цієї дати.
+    """
+    start_time = time.time()
+    out_dir = out_dir or os.path.join(EXPORT_DIR, f"products_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    where, params = ("WHERE p.published_at >= %s", (since,)) if since else ("", ())
+    writer, current, total = None, None, 0
+
+    connection = connect()
+    try:
+        connection.set_session(readonly=True)
+        with connection.cursor(name="export_parquet") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(EXPORT_QUERY.format(where=where), params)
+
+            published_index = SCHEMA.get_field_index("published_at")
+            while rows := cursor.fetchmany(chunk_size):
+                # Рядки відсортовані за published_at, тож пакет ділиться на суцільні відрізки за днями
+                start = 0
+                while start < len(rows):
+                    day = _partition(rows[start][published_index])
+                    end = start
+                    while end < len(rows) and _partition(rows[end][published_index]) == day:
+                        end += 1
+
+                    if day != current:
+                        if writer:
+                            writer.close()
+                        partition_dir = os.path.join(out_dir, f"published_day={day}")
+                        os.makedirs(partition_dir, exist_ok=True)
+                        writer = pq.ParquetWriter(os.path.join(partition_dir, "part-0.parquet"), SCHEMA,
+                                                  compression="zstd")
+                        current = day
+
+                    writer.write_table(_to_table(rows[start:end]))
+                    start = end
+
+                total += len(rows)
+                logger.debug(f"Parquet: експортовано {total} рядків")
+    finally:
+        if writer:
+            writer.close()
+        connection.close()
+
+    logger.info(f"Parquet: експортовано {total} рядків у {out_dir} за {time.time() - start_time:.2f} сек.",
+                extra={'custom_color': True})
+    return out_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Експорт products + sellers у Parquet, секціонований за днем публікації")
+    parser.add_argument("--out", help="каталог експорту (за замовчуванням exports/products_<час>)")
+    parser.add_argument("--since", type=date.fromisoformat, help="лише оголошення, опубліковані від дати (YYYY-MM-DD)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="рядків на пакет курсора")
+    args = parser.parse_args()
+
+    export_parquet(args.out, args.since, args.chunk_size)
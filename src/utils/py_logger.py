@@ -1,5 +1,16 @@
+import atexit
+import copy
+import json
 import logging
+import multiprocessing
 import os
+import queue
+import socket
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from dotenv import load_dotenv
 
 # ANSI escape codes for colors
 RED = '\033[91m'
@@ -7,6 +18,10 @@ YELLOW = '\033[93m'
 RESET = '\033[0m'
 GREEN = '\033[92m'
 
+# Контекст запису: ID прогону і посилання, яке зараз обробляється (успадковується asyncio-задачами)
+run_id_var: ContextVar[str | None] = ContextVar("run_id", default=None)
+url_var: ContextVar[str | None] = ContextVar("url", default=None)
+
 
 class ColorFormatter(logging.Formatter):
     """ Custom formatter to add color to log levels """
@@ -21,21 +36,66 @@ class ColorFormatter(logging.Formatter):
         elif record.levelno == logging.ERROR or record.levelno == logging.CRITICAL:
             color = RED
 
-        record.msg = f'{color}{record.msg}{RESET}'
-        return super().format(record)
+        # Колір додається до готового рядка, record не змінюється - у файл ANSI-коди не потрапляють
+        message = super().format(record)
+        return f'{color}{message}{RESET}' if color else message
+
+
+class JsonFormatter(logging.Formatter):
+    """ JSON lines: один запис - один JSON-об'єкт з run_id і url """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "func": record.funcName,
+            "line": record.lineno,
+            "process": record.processName,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "url": getattr(record, "url", None),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ContextFilter(logging.Filter):
+    """ Додає run_id і url з contextvars у запис (на боці виклику, до передачі в чергу) """
+
+    def filter(self, record):
+        record.run_id = run_id_var.get()
+        record.url = url_var.get()
+        return True
 
 
+load_dotenv()
+
 _format = "[%(levelname)s] %(asctime)s - %(name)s - %(funcName)s(%(lineno)d) - %(message)s"
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# text - як у консолі, json - JSON lines для збору логів
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+# Вимога 9: 5 файлів по 1 ГБ (поточний + 4 архівних)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 1024 ** 3))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 4))
+
 log_dir = 'logs'
 # створення
 if not os.path.exists(log_dir):
     os.makedirs(log_dir)
-file = os.path.join(log_dir, 'logs.log')
+# Окремі процеси воркерів пишуть у власні файли, щоб ротація не конфліктувала між процесами.
+# Репліки worker у docker-compose мають однакові імена процесів і спільний ./logs, тому в імені - хост і pid
+_process_name = multiprocessing.current_process().name
+file = os.path.join(log_dir, 'logs.log' if _process_name == 'MainProcess'
+                    else f'{_process_name}-{socket.gethostname()}-{os.getpid()}.log')
 
-file_handler = logging.FileHandler(file)
-file_handler.setLevel(logging.INFO)
-file_handler.setFormatter(logging.Formatter(_format))
+file_handler = RotatingFileHandler(file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+file_handler.setLevel(LOG_LEVEL)
+file_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(_format))
 
 stream_handler = logging.StreamHandler()
 stream_handler.setLevel(logging.DEBUG)
@@ -43,9 +103,35 @@ stream_handler.setLevel(logging.DEBUG)
 stream_handler.setFormatter(ColorFormatter(_format))
 
 
+class _RecordQueueHandler(QueueHandler):
+    """ Кладе в чергу копію запису з готовим message і текстом винятку (без посилань на кадри стеку);
+    сам рядок формують обробники у фоновому потоці """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_exc_formatter = logging.Formatter()
+
+
+# Форматування і запис на диск - у фоновому потоці QueueListener, event loop лише кладе запис у чергу
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = _RecordQueueHandler(_log_queue)
+queue_handler.addFilter(ContextFilter())
+_listener = QueueListener(_log_queue, file_handler, stream_handler, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
+
 def get_logger(name):
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
-    return logger
\ No newline at end of file
+    if queue_handler not in logger.handlers:
+        logger.addHandler(queue_handler)
+    return logger
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import time
+
+from dotenv import load_dotenv
+from playwright.async_api import ElementHandle, Page
+
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+load_dotenv()
+
+# Загальний бюджет однієї сторінки товару (сек.): навігація, поля, lazy-поля
+PAGE_TIME_BUDGET = float(os.getenv("PAGE_TIME_BUDGET", 20))
+# Стандартні таймаути Playwright для контекстів пулу (мс) замість 30 сек. за замовчуванням
+PAGE_ACTION_TIMEOUT = float(os.getenv("PAGE_ACTION_TIMEOUT", 5000))
+PAGE_NAVIGATION_TIMEOUT = float(os.getenv("PAGE_NAVIGATION_TIMEOUT", 15000))
+# Найдовше очікування lazy-поля (сек.) і скільки чекати рендеру після відповіді його XHR
+LAZY_WAIT_TIMEOUT = float(os.getenv("LAZY_WAIT_TIMEOUT", 5))
+XHR_RENDER_GRACE = float(os.getenv("XHR_RENDER_GRACE", 0.5))
+
+# Один evaluate: прокрутка до якоря (або покроково до низу сторінки, щоб спрацювали IntersectionObserver сайту)
+# і очікування елемента через MutationObserver. Повертає true, якщо елемент з'явився до timeout (мс).
+_LAZY_LOAD_JS = """
+([selector, anchor, timeout]) => new Promise(resolve => {
+    const found = () => document.querySelector(selector) !== null;
+    if (found()) return resolve(true);
+
+    let stepper = null;
+    const target = anchor && document.querySelector(anchor);
+    if (target) {
+        target.scrollIntoView({block: 'center'});
+    } else {
+        stepper = setInterval(() => {
+            window.scrollBy(0, window.innerHeight);
+            if (window.scrollY + window.innerHeight >= document.body.scrollHeight) clearInterval(stepper);
+        }, 50);
+    }
+
+    const observer = new MutationObserver(() => { if (found()) finish(true); });
+    const timer = setTimeout(() => finish(found()), timeout);
+    function finish(result) {
+        observer.disconnect();
+        clearTimeout(timer);
+        if (stepper) clearInterval(stepper);
+        resolve(result);
+    }
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+})
+"""
+
+
+class PageBudget:
+    """
+    Дедлайн однієї сторінки: очікування всередині беруть лише залишок бюджету.
+    """
+
+    def __init__(self, seconds: float = PAGE_TIME_BUDGET):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def timeout(self, cap: float) -> float:
+        """
+        Таймаут (сек.) для чергового очікування: не більше cap і не більше залишку бюджету.
+        """
+        return min(cap, self.remaining())
+
+
+def _drain(tasks: set[asyncio.Task]) -> None:
+    for task in tasks:
+        if task.done():
+            if not task.cancelled():
+                task.exception()
+        else:
+            task.cancel()
+
+
+async def wait_for_lazy(page: Page, selector: str, anchor: str | None = None, xhr: str | None = None,
+                        timeout: float = LAZY_WAIT_TIMEOUT) -> ElementHandle | None:
+    """
+    Підвантажує lazy-елемент і чекає на нього не довше timeout (сек.).
+    anchor - елемент поруч із lazy-блоком, до якого прокрутити одразу (без покрокового скролу).
+    xhr - частина URL запиту, який приносить дані блоку: якщо він відповів помилкою або відповів,
+    а елемент не з'явився за XHR_RENDER_GRACE, очікування завершується раніше за timeout.
+    """
+    if timeout <= 0:
+        return None
+
+    tasks = set()
+    dom = asyncio.create_task(page.evaluate(_LAZY_LOAD_JS, [selector, anchor, int(timeout * 1000)]))
+    tasks.add(dom)
+    try:
+        if xhr:
+            response = asyncio.create_task(page.wait_for_event(
+                "response", predicate=lambda r: xhr in r.url, timeout=timeout * 1000))
+            tasks.add(response)
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if dom not in done and response in done and not response.exception():
+                if not response.result().ok:
+                    logger.debug(f"Lazy: XHR {xhr} - HTTP {response.result().status}, {selector} не буде")
+                    return None
+                await asyncio.wait({dom}, timeout=XHR_RENDER_GRACE)
+        else:
+            await asyncio.wait({dom}, timeout=timeout)
+
+        if dom.done() and not dom.exception() and dom.result():
+            return await page.query_selector(selector)
+        return None
+    finally:
+        _drain(tasks)
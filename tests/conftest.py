@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import pytest
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "olx"
+
+
+@pytest.fixture
+def olx_page():
+    """
+    HTML збереженої сторінки OLX з tests/fixtures/olx за ім'ям файлу без розширення.
+    """
+    def load(name: str) -> str:
+        return (FIXTURES_DIR / f"{name}.html").read_text(encoding="utf-8")
+
+    return load
@@ -0,0 +1,81 @@
+from src.services.extraction import (FIELD_SPEC, REQUIRED_FIELDS, extract_record_from_html, missing_fields,
+                                     split_spec)
+
+
+def test_private_seller_page(olx_page):
+    record = extract_record_from_html(olx_page("detail_private"))
+
+    assert record["seller"] == {
+        "name": "Олександр",
+        "profile_url": "/uk/list/user/3kPq9/",
+        "rating": "4.8",
+        "registered_date": "На OLX з березень 2016 р.",
+        "last_active_date": "Онлайн в 13:47",
+        "location": "Київ, Оболонський",
+        "region": "Київська область",
+    }
+    product = record["product"]
+    assert product["title"] == "Велосипед Cube Aim 29 рама L"
+    assert product["price"] == "14 500 грн."
+    assert product["date_published"] == "Сьогодні о 14:05"
+    assert product["site_id"] == "884215037"
+    assert product["description"].startswith("Продаю велосипед Cube Aim 29")
+    assert product["images"].count("olxcdn.com") == 3
+    assert product["type_item"] == "Приватна особа"
+    assert product["info"] == {"Стан": "Вживане", "Розмір рами": "L", "Діаметр колеса": '29"'}
+    assert product["olx_delivery"] == "YES"
+    # Лічильник переглядів приходить окремим XHR і в HTML сторінки його ще немає
+    assert product["views_count"] is None
+    assert missing_fields(record) == []
+
+
+def test_business_seller_page(olx_page):
+    record = extract_record_from_html(olx_page("detail_business"))
+
+    assert record["seller"]["name"] == "Ноутбук Центр"
+    assert record["seller"]["rating"] is None
+    product = record["product"]
+    assert product["title"] == "Ноутбук Lenovo ThinkPad T14 Gen 2 i5/16/512"
+    assert product["views_count"] == "1204"
+    assert product["type_item"] == "Бізнес"
+    assert product["info"]["Оперативна пам'ять"] == "16 ГБ"
+    assert product["olx_delivery"] == "NO"
+    assert product["images"] == "https://ireland.apollo.olxcdn.com/v1/files/f0e1d2-UA/image;s=1000x750"
+
+
+def test_removed_listing_has_no_required_fields(olx_page):
+    record = extract_record_from_html(olx_page("detail_removed"))
+
+    assert sorted(missing_fields(record)) == ["product.site_id", "product.title"]
+    assert record["product"]["type_item"] is None
+    assert record["product"]["images"] == ""
+
+
+def test_partial_spec(olx_page):
+    http_spec, _ = split_spec({"seller"})
+    record = extract_record_from_html(olx_page("detail_private"), http_spec)
+
+    assert set(record) == {"seller"}
+    assert record["seller"]["location"] == "Київ, Оболонський"
+    # Обов'язкові поля товару не входять у spec, тож їх відсутність не рахується
+    assert missing_fields(record, http_spec) == []
+
+
+def test_split_spec_keeps_lazy_fields_for_browser():
+    http_spec, browser_spec = split_spec({"seller", "product"})
+
+    assert [field.name for field in browser_spec] == ["views_count"]
+    assert all(not field.lazy for field in http_spec)
+    assert set(http_spec) | set(browser_spec) == set(FIELD_SPEC)
+
+
+def test_split_spec_by_group():
+    http_spec, browser_spec = split_spec({"seller"})
+
+    assert {field.group for field in http_spec} == {"seller"}
+    assert {field.group for field in browser_spec} == {"product"}
+    assert {(field.group, field.name) for field in browser_spec} >= REQUIRED_FIELDS
+
+
+def test_split_spec_without_groups():
+    assert split_spec(set()) == ((), FIELD_SPEC)
@@ -0,0 +1,57 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.services.extraction import split_spec
+from src.services.http_service import HttpScraper
+
+
+def run_with_server(olx_page, scenario):
+    """
+    Піднімає локальний aiohttp-сервер зі збереженими сторінками і виконує scenario(http, server).
+    """
+    async def detail(request: web.Request) -> web.Response:
+        return web.Response(text=olx_page(request.match_info["name"]), content_type="text/html")
+
+    async def blocked(request: web.Request) -> web.Response:
+        raise web.HTTPForbidden(text="blocked")
+
+    app = web.Application()
+    app.add_routes([web.get("/d/uk/obyavlenie/{name}.html", detail), web.get("/blocked.html", blocked)])
+
+    async def main():
+        async with TestServer(app) as server, HttpScraper(limit=2, timeout=5) as http:
+            return await scenario(http, server)
+
+    return asyncio.run(main())
+
+
+def test_fetch_record(olx_page):
+    async def scenario(http, server):
+        return await http.fetch_record(str(server.make_url("/d/uk/obyavlenie/detail_private.html")))
+
+    record = run_with_server(olx_page, scenario)
+
+    assert record["product"]["site_id"] == "884215037"
+    assert record["seller"]["profile_url"] == "/uk/list/user/3kPq9/"
+
+
+def test_fetch_record_with_http_spec(olx_page):
+    http_spec, _ = split_spec({"seller", "product"})
+
+    async def scenario(http, server):
+        return await http.fetch_record(str(server.make_url("/d/uk/obyavlenie/detail_business.html")), http_spec)
+
+    record = run_with_server(olx_page, scenario)
+
+    assert record["product"]["price"] == "18 999 грн."
+    assert "views_count" not in record["product"]
+
+
+def test_fetch_record_http_error(olx_page):
+    async def scenario(http, server):
+        return (await http.fetch_record(str(server.make_url("/blocked.html"))),
+                await http.fetch_record(str(server.make_url("/d/uk/missing"))))
+
+    assert run_with_server(olx_page, scenario) == (None, None)
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from src.repository.known_ids import BloomFilter, KnownIds, listing_id_from_url
+
+
+class FakeDb:
+    """
+    Таблиця products у пам'яті: рядки (id, product_url) для KnownIds.load/refresh.
+    """
+
+    def __init__(self, rows: list[tuple[int, str]]):
+        self.rows = rows
+
+    async def scalar(self, query):
+        return len(self.rows)
+
+    async def stream(self, query):
+        where = query.whereclause
+        after = where.right.value if where is not None else None
+
+        async def rows():
+            for row in self.rows:
+                if after is None or row[0] > after:
+                    yield row
+
+        return rows()
+
+
+def url(listing_id: str) -> str:
+    return f"https://www.olx.ua/d/uk/obyavlenie/tovar-ID{listing_id}.html"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("https://www.olx.ua/d/uk/obyavlenie/velosiped-cube-IDV1bQx.html?reason=extended_search", "V1bQx"),
+    ("/d/uk/obyavlenie/noutbuk-lenovo-ID17aAb2.html", "17aAb2"),
+    ("https://www.olx.ua/d/uk/obyavlenie/bez-id/?reason=list", "/d/uk/obyavlenie/bez-id"),
+    ("https://www.olx.ua/", None),
+    ("", None),
+    (None, None),
+])
+def test_listing_id_from_url(value, expected):
+    assert listing_id_from_url(value) == expected
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"key{n}" for n in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"other{n}" in bloom for n in range(10_000))
+    assert false_positives < 300
+
+
+def test_known_ids_matches_by_listing_id():
+    known = KnownIds()
+    asyncio.run(known.load(FakeDb([(1, url("AAA1"))])))
+
+    assert f"{url('AAA1')}?reason=observed_search" in known
+    assert url("BBB2") not in known
+    assert None not in known
+
+
+def test_refresh_reads_only_new_rows():
+    db = FakeDb([(1, url("AAA1")), (2, url("AAA2"))])
+    known = KnownIds(overlap=0)
+    asyncio.run(known.load(db))
+    assert known.last_id == 2
+
+    db.rows.append((3, url("AAA3")))
+    asyncio.run(known.refresh(db))
+
+    assert url("AAA3") in known
+    assert known.last_id == 3
+
+
+def test_refresh_picks_up_rows_committed_late():
+    db = FakeDb([(1, url("AAA1")), (3, url("AAA3"))])
+    known = KnownIds(overlap=10)
+    asyncio.run(known.load(db))
+
+    # Транзакція з id=2 закомітилась після того, як рядок з id=3 уже прочитано
+    db.rows.insert(1, (2, url("AAA2")))
+    asyncio.run(known.refresh(db))
+
+    assert url("AAA2") in known
+    assert known.last_id == 3
+
+
+def test_refresh_without_overlap_misses_late_rows():
+    db = FakeDb([(1, url("AAA1")), (3, url("AAA3"))])
+    known = KnownIds(overlap=0)
+    asyncio.run(known.load(db))
+
+    db.rows.insert(1, (2, url("AAA2")))
+    asyncio.run(known.refresh(db))
+
+    assert url("AAA2") not in known
+
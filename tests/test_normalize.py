@@ -0,0 +1,102 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.services.extraction import to_digits, yes_no
+from src.services.normalize import normalize_product, parse_int, parse_olx_date, parse_price, split_images
+
+NOW = datetime(2024, 10, 17, 15, 0)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("14 500 грн.", (Decimal("14500"), "UAH", False)),
+    ("12 500 грн.Договірна", (Decimal("12500"), "UAH", True)),
+    ("Договірна", (None, None, True)),
+    ("Договорная", (None, None, True)),
+    ("Безкоштовно", (Decimal(0), None, False)),
+    ("Обмін", (None, None, False)),
+    ("1 234,50 грн.", (Decimal("1234.50"), "UAH", False)),
+    ("5 000 ₴", (Decimal("5000"), "UAH", False)),
+    ("1 200 $", (Decimal("1200"), "USD", False)),
+    ("99 у.о.", (Decimal("99"), "USD", False)),
+    ("300 €", (Decimal("300"), "EUR", False)),
+    ("250", (Decimal("250"), None, False)),
+    ("", (None, None, False)),
+    (None, (None, None, False)),
+])
+def test_parse_price(value, expected):
+    assert parse_price(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Сьогодні о 12:30", datetime(2024, 10, 17, 12, 30)),
+    ("Сегодня в 09:00", datetime(2024, 10, 17, 9, 0)),
+    ("Вчора о 08:05", datetime(2024, 10, 16, 8, 5)),
+    ("Вчера в 23:59", datetime(2024, 10, 16, 23, 59)),
+    ("5 хв тому", datetime(2024, 10, 17, 14, 55)),
+    ("2 години тому", datetime(2024, 10, 17, 13, 0)),
+    ("3 дні тому", datetime(2024, 10, 14, 15, 0)),
+    ("1 тиждень тому", datetime(2024, 10, 10, 15, 0)),
+    ("17 жовтня 2024 р.", datetime(2024, 10, 17)),
+    ("5 мая 2022 г.", datetime(2022, 5, 5)),
+    ("На OLX з лютий 2019 р.", datetime(2019, 2, 1)),
+    ("На OLX с марта 2018 г.", datetime(2018, 3, 1)),
+    ("Онлайн в 10:15", datetime(2024, 10, 17, 10, 15)),
+    ("2020", datetime(2020, 1, 1)),
+    ("31 лютого 2024 р.", None),
+    ("Онлайн", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_olx_date(value, expected):
+    assert parse_olx_date(value, NOW) == expected
+
+
+@pytest.mark.parametrize("month, genitive", list(enumerate(
+    ("січня", "лютого", "березня", "квітня", "травня", "червня", "липня", "серпня", "вересня", "жовтня",
+     "листопада", "грудня"), start=1)))
+def test_parse_olx_date_ukrainian_months(month, genitive):
+    assert parse_olx_date(f"3 {genitive} 2023 р.", NOW) == datetime(2023, month, 3)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Переглядів: 1 234", 1234),
+    ("1 204", 1204),
+    ("ID: 884215037", 884215037),
+    ("12,5", 12),
+    ("немає", None),
+    (None, None),
+])
+def test_parse_int(value, expected):
+    assert parse_int(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("ID: 884215037", "884215037"),
+    ("Переглядів: 1 234", "1234"),
+    ("", None),
+    (None, None),
+])
+def test_to_digits(value, expected):
+    assert to_digits(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [(True, "YES"), (False, "NO"), (None, "NO")])
+def test_yes_no(value, expected):
+    assert yes_no(value) == expected
+
+
+def test_normalize_product():
+    product = {"price": "14 500 грн.", "views_count": "1204", "date_published": "Вчора о 08:05",
+               "images": "https://img/1.jpg, https://img/2.jpg, "}
+
+    assert normalize_product(product, NOW) == {
+        "price_amount": Decimal("14500"),
+        "price_currency": "UAH",
+        "price_negotiable": False,
+        "views": 1204,
+        "published_at": datetime(2024, 10, 16, 8, 5),
+        "image_list": ["https://img/1.jpg", "https://img/2.jpg"],
+    }
+    assert split_images(None) == []
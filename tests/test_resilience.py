@@ -0,0 +1,193 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from src.services import resilience
+from src.services.resilience import (BLOCKED, DEADLINE, ERROR, NAVIGATION, SELECTOR_MISSING, TIMEOUT, BlockedError,
+                                     CircuitBreaker, DeadlineExceededError, RetryPolicy, SelectorMissingError,
+                                     classify, with_retry)
+
+
+class FakeClock:
+    """
+    Годинник для resilience: time.monotonic і asyncio.sleep без реального очікування.
+    """
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(resilience, "asyncio", SimpleNamespace(sleep=clock.sleep))
+    # Верхня межа jitter: паузи детерміновані
+    monkeypatch.setattr(resilience, "random", SimpleNamespace(uniform=lambda low, high: high))
+    return clock
+
+
+class Flaky:
+    """
+    Операція для with_retry: кидає помилки з errors по черзі, потім повертає result.
+    """
+
+    def __init__(self, *errors: Exception, result="ok"):
+        self.errors = list(errors)
+        self.result = result
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+@pytest.mark.parametrize("error, expected", [
+    (DeadlineExceededError("deadline"), DEADLINE),
+    (BlockedError("403"), BLOCKED),
+    (SelectorMissingError("no title"), SELECTOR_MISSING),
+    (PlaywrightTimeoutError("Timeout 5000ms exceeded"), TIMEOUT),
+    (TimeoutError(), TIMEOUT),
+    (PlaywrightError("net::ERR_CONNECTION_RESET at https://www.olx.ua/"), NAVIGATION),
+    (PlaywrightError("Navigation interrupted by another navigation"), NAVIGATION),
+    (PlaywrightError("Target page, context or browser has been closed"), ERROR),
+    (KeyError("site_id"), ERROR),
+])
+def test_classify(error, expected):
+    assert classify(error) == expected
+
+
+def test_breaker_opens_on_block_rate_and_closes_after_probe(clock):
+    breaker = CircuitBreaker(threshold=0.5, min_samples=4, window=60, cooldown=30)
+    for blocked in (False, False, True):
+        breaker.record(blocked)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.OPEN
+    # Спроби, розпочаті до паузи, на стан не впливають
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    asyncio.run(breaker.wait())
+    assert clock.sleeps == [pytest.approx(36)]
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.trips == 0
+
+
+def test_breaker_reopens_with_longer_cooldown(clock):
+    breaker = CircuitBreaker(threshold=0.5, min_samples=2, cooldown=30, max_cooldown=50)
+    breaker.record(True)
+    breaker.record(True)
+    asyncio.run(breaker.wait())
+
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 2
+    asyncio.run(breaker.wait())
+    # 30 * 2, але не більше max_cooldown; jitter * 1.2
+    assert clock.sleeps[-1] == pytest.approx(60)
+
+
+def test_breaker_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(threshold=0.5, min_samples=2, cooldown=10, probe_interval=1.0)
+    breaker.record(True)
+    breaker.record(True)
+
+    async def scenario():
+        await breaker.wait()
+        waiting = asyncio.get_running_loop().create_task(breaker.wait(deadline=clock.now + 0.5))
+        with pytest.raises(DeadlineExceededError):
+            await waiting
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_breaker_wait_respects_deadline(clock):
+    breaker = CircuitBreaker(threshold=0.5, min_samples=2, cooldown=30)
+    breaker.record(True)
+    breaker.record(True)
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(breaker.wait(deadline=clock.now + 10))
+    assert clock.sleeps == []
+
+
+def test_breaker_ignores_samples_outside_window(clock):
+    breaker = CircuitBreaker(threshold=0.5, min_samples=3, window=60)
+    breaker.record(True)
+    breaker.record(True)
+    clock.now += 120
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.block_rate() == 1.0
+
+
+def test_with_retry_retries_transient_errors(clock):
+    operation = Flaky(PlaywrightTimeoutError("timeout"), PlaywrightError("net::ERR_TIMED_OUT"))
+    policies = {TIMEOUT: RetryPolicy(2, base=1, cap=5), NAVIGATION: RetryPolicy(3, base=1, cap=5)}
+
+    result = asyncio.run(with_retry(operation, "page", breaker=None, policies=policies))
+
+    assert result == "ok"
+    assert operation.calls == 3
+    assert clock.sleeps == [1, 2]
+
+
+@pytest.mark.parametrize("error", [BlockedError("429"), KeyError("site_id")])
+def test_with_retry_fails_fast_without_policy(clock, error):
+    operation = Flaky(error)
+
+    with pytest.raises(type(error)):
+        asyncio.run(with_retry(operation, "page", breaker=None, policies={TIMEOUT: RetryPolicy(3)}))
+    assert operation.calls == 1
+    assert clock.sleeps == []
+
+
+def test_with_retry_gives_up_after_attempts(clock):
+    operation = Flaky(*(SelectorMissingError("no title") for _ in range(3)))
+
+    with pytest.raises(SelectorMissingError):
+        asyncio.run(with_retry(operation, "page", breaker=None,
+                               policies={SELECTOR_MISSING: RetryPolicy(2, base=1, cap=5)}))
+    assert operation.calls == 2
+
+
+def test_with_retry_stops_before_deadline(clock):
+    operation = Flaky(PlaywrightTimeoutError("timeout"))
+
+    with pytest.raises(DeadlineExceededError) as error:
+        asyncio.run(with_retry(operation, "page", breaker=None, policies={TIMEOUT: RetryPolicy(3, base=4, cap=8)},
+                               deadline=clock.now + 2))
+    assert isinstance(error.value.__cause__, PlaywrightTimeoutError)
+    assert operation.calls == 1
+    assert clock.sleeps == []
+
+
+def test_with_retry_reports_to_breaker(clock):
+    breaker = CircuitBreaker(threshold=0.5, min_samples=2, cooldown=30)
+    operation = Flaky(BlockedError("403"), BlockedError("403"))
+
+    for _ in range(2):
+        with pytest.raises(BlockedError):
+            asyncio.run(with_retry(operation, "page", breaker=breaker))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert asyncio.run(with_retry(operation, "page", breaker=breaker)) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,47 @@
+import hashlib
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.repository.sellers import REFRESHED_COLUMNS, SellerCache, hash_key, seller_key, upsert_statement
+
+
+@pytest.mark.parametrize("seller, expected", [
+    ({"profile_url": "/uk/list/user/3kPq9/", "name": "Олександр"}, "olx:3kPq9"),
+    ({"profile_url": "https://www.olx.ua/uk/list/user/bZ7tw/?reason=seller", "name": "Ноутбук Центр"}, "olx:bZ7tw"),
+    ({"profile_url": "https://shop.olx.ua/home/", "name": "Магазин", "location": "Львів"},
+     "h:" + hashlib.md5("магазин|львів".encode()).hexdigest()),
+    ({"profile_url": None, "name": "Олександр", "location": "Київ, Оболонський"},
+     "h:" + hashlib.md5("олександр|київ, оболонський".encode()).hexdigest()),
+])
+def test_seller_key(seller, expected):
+    assert seller_key(seller) == expected
+
+
+def test_hash_key_ignores_case_and_surrounding_spaces():
+    assert hash_key({"name": " Олександр ", "location": "КИЇВ"}) == hash_key({"name": "олександр", "location": "київ"})
+    assert hash_key({}) == "h:" + hashlib.md5(b"|").hexdigest()
+
+
+def test_upsert_refreshes_seller_columns():
+    rows = [{"seller_key": "olx:3kPq9", "name": "Олександр", "rating": "4.9", "phone_number": None}]
+    sql = str(upsert_statement(rows).compile(dialect=postgresql.dialect()))
+    on_conflict = sql.split("ON CONFLICT (seller_key) DO UPDATE SET", 1)[1]
+
+    for column in REFRESHED_COLUMNS:
+        assert f"{column} = coalesce(excluded.{column}, sellers.{column})" in on_conflict
+    # Телефон, отриманий етапом телефонів, не затирається
+    assert "phone_number = coalesce(sellers.phone_number, excluded.phone_number)" in on_conflict
+    assert "IS DISTINCT FROM" in on_conflict
+    assert sql.endswith("RETURNING sellers.seller_key, sellers.id")
+
+
+def test_seller_cache_misses_when_values_change():
+    cache = SellerCache()
+    values = {"name": "Олександр", "rating": "4.8", "last_active_date": "Онлайн в 13:47"}
+    cache.update({"olx:3kPq9": 7}, {"olx:3kPq9": values})
+
+    assert cache.get("olx:3kPq9", dict(values)) == 7
+    assert cache.get("olx:3kPq9", {**values, "rating": "4.9"}) is None
+    assert cache.get("olx:other", values) is None
+    assert len(cache) == 1
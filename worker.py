@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+
+from dotenv import dotenv_values
+
+from src.services.metrics import METRICS_PORT, start_metrics_server
+from src.services.pipeline import worker_run
+from src.utils.py_logger import get_logger
+
+logger = get_logger(__name__)
+config = dotenv_values(".env")
+
+MAIN_LINK = "https://www.olx.ua"
+EMAIL_OLX = config.get("EMAIL_OLX")
+PASSWORD_OLX = config.get("PASSWORD_OLX")
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", config.get("WORKER_PROCESSES") or 2))
+
+
+def run_process(index: int) -> None:
+    """
+    Точка входу процесу-воркера: окремий event loop і власний пул браузерів.
+    """
+    logger.info(f"Процес воркера #{index} (pid {os.getpid()}) стартував")
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT + index + 1)
+    try:
+        asyncio.run(worker_run(EMAIL_OLX, PASSWORD_OLX, MAIN_LINK))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    """
+    Запускає N процесів, які забирають посилання зі спільної crawl_queue (FOR UPDATE SKIP LOCKED).
+    Процеси можна запускати на кількох машинах з однією базою - координатор (main.py) лише один.
+    """
+    parser = argparse.ArgumentParser(description="Воркери сторінок товарів зі спільної crawl_queue")
+    parser.add_argument("-p", "--processes", type=int, default=WORKER_PROCESSES, help="кількість процесів")
+    args = parser.parse_args()
+
+    logger.info(f"Start workers: {args.processes}", extra={'custom_color': True})
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=run_process, args=(index,), name=f"worker-{index}")
+                 for index in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("Shutting down workers")
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == '__main__':
+    main()